@@ -3,70 +3,74 @@ import json
 import pandas as pd
 from pathlib import Path
 
-from eloUtilities import get_game_code
+from eloDates import game_codes
 
-# Seasons to run
-seasons = range(2003, 2019 + 1)
 
-# Root dir and name portions to join for reading/writing
-root = Path("data_raw", "cfb")
-# Path to ncaa scraped data
-old_root = Path("data_scraped", "ncaa_player")
+def convert(seasons=range(2003, 2019 + 1)):
+    """
+    Convert each season's scraped college player game statistics to the game-code files
+    used in computeElo
+    """
+    # Root dir and name portions to join for reading/writing
+    root = Path("data_raw", "cfb")
+    # Path to ncaa scraped data
+    old_root = Path("data_scraped", "ncaa_player")
 
-# output file format (used in computeElo)
-playerstatroot = "ncaa-player-game-statistics"
-# input file format
-playerroot = "ncaa_player_"
-extension = ".csv"
+    # output file format (used in computeElo)
+    playerstatroot = "ncaa-player-game-statistics"
+    # input file format
+    playerroot = "ncaa_player_"
+    extension = ".csv"
 
-# Read in configfile
-with open(Path("code_python/elo_config.json")) as file:
-    cfg = json.load(file)["convert_player_game_stats"]
+    # Read in configfile
+    with open(Path("code_python/elo_config.json")) as file:
+        cfg = json.load(file)["convert_player_game_stats"]
 
-config = cfg["college"]
+    config = cfg["college"]
 
-from tqdm import tqdm
+    from tqdm import tqdm
 
-tqdm.write("Beginning PlayerGameStats Conversion")
-seasons = tqdm(seasons)
-for season in seasons:
-    seasons.set_description(f"s: {season}")
+    tqdm.write("Beginning PlayerGameStats Conversion")
+    seasons = tqdm(seasons)
+    for season in seasons:
+        seasons.set_description(f"s: {season}")
 
-    infile = old_root.joinpath(f"{playerroot}{season}{extension}")
-    outfile = root.joinpath(f"{playerstatroot}{season}{extension}")
+        infile = old_root.joinpath(f"{playerroot}{season}{extension}")
+        outfile = root.joinpath(f"{playerstatroot}{season}{extension}")
 
-    playerstats = pd.read_csv(infile)
+        playerstats = pd.read_csv(infile)
 
-    # Remove players without a unique_id (should be rare)
-    playerall = playerstats.query("unique_id != 'none'").dropna(subset=["unique_id"])
+        # Remove players without a unique_id (should be rare)
+        playerall = playerstats.query("unique_id != 'none'").dropna(subset=["unique_id"])
 
-    # Strip spaces from unique_id
-    playerall["unique_id"] = playerall["unique_id"].str.strip()
+        # Strip spaces from unique_id
+        playerall["unique_id"] = playerall["unique_id"].str.strip()
 
-    # TODO: There are some player stat games that don't have the opponent connected to them (sometimes they do appear in the team stats). For now, since there's not programmatic confirmation, remove those games missing that data.
-    playerall = playerall.dropna(subset=["Team Code opp"])
+        # TODO: There are some player stat games that don't have the opponent connected to them (sometimes they do appear in the team stats). For now, since there's not programmatic confirmation, remove those games missing that data.
+        playerall = playerall.dropna(subset=["Team Code opp"])
 
-    # Also need to cast to int (because even though the zeroes are accounted for, the rest remain floats)
-    playerall["Team Code"] = playerall["Team Code"].apply(lambda x: int(float(x)))
-    playerall["Team Code opp"] = playerall["Team Code opp"].apply(
-        lambda x: int(float(x))
-    )
+        # Also need to cast to int (because even though the zeroes are accounted for, the rest remain floats)
+        playerall["Team Code"] = playerall["Team Code"].apply(lambda x: int(float(x)))
+        playerall["Team Code opp"] = playerall["Team Code opp"].apply(
+            lambda x: int(float(x))
+        )
 
-    # Do the game code calculation
-    playerall["Game Code"] = playerall.apply(
-        lambda x: get_game_code(
-            x["Loc"], x["Team Code"], x["Team Code opp"], x["Date"]
-        ),
-        axis=1,
-    )
+        # Do the game code calculation
+        playerall["Game Code"] = game_codes(
+            playerall["Loc"], playerall["Team Code"], playerall["Team Code opp"], playerall["Date"]
+        )
 
-    # Select columns & fill na values
-    playerout = (
-        playerall[config["keepcols"]]
-        .fillna("0")
-        .sort_values(["Game Code", "unique_id"])
-        .reset_index(drop=True)
-    )
+        # Select columns & fill na values
+        playerout = (
+            playerall[config["keepcols"]]
+            .fillna("0")
+            .sort_values(["Game Code", "unique_id"])
+            .reset_index(drop=True)
+        )
 
-    # Write final output to csv
-    playerout.to_csv(outfile, index=False)
+        # Write final output to csv
+        playerout.to_csv(outfile, index=False)
+
+
+if __name__ == "__main__":
+    convert()
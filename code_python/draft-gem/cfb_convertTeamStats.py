@@ -3,55 +3,59 @@ import json
 import pandas as pd
 from pathlib import Path
 
-from eloUtilities import get_game_code
-
-# Seasons to run
-seasons = range(2000, 2019 + 1)
-
-# Root dir and name portions to join for reading/writing
-elo_root = Path("data_raw", "cfb")
-# Path to ncaa scraped data
-old_root = Path("data_scraped", "ncaa_team")
-
-# output file format (used in computeElo)
-teamstatroot = "ncaa-team-game-statistics"
-# input file format
-teamroot = "ncaa_team_data_"
-extension = ".csv"
-
-# Read in configfile
-with open(Path("code_python/elo_config.json")) as file:
-    cfg = json.load(file)["convert_team_stats"]
-
-config = cfg["college"]
-
-from tqdm import tqdm
-
-tqdm.write("Beginning TeamStats Conversion")
-seasons = tqdm(seasons)
-for season in seasons:
-    seasons.set_description(f"s: {season}")
-
-    teamfile = old_root.joinpath(f"{teamroot}{season}{extension}")
-    outfile = elo_root.joinpath(f"{teamstatroot}{season}{extension}")
-
-    teamall = pd.read_csv(teamfile)
-
-    # Do the game code calculation
-    teamall["Game Code"] = teamall.apply(
-        lambda x: get_game_code(
-            x["Loc"], x["Team Code"], x["Team Code opp"], x["Date"]
-        ),
-        axis=1,
-    )
-
-    # Select columns & fill na values
-    teamout = (
-        teamall[config["keepcols"]]
-        .fillna("0")
-        .sort_values(["Game Code", "Team Code"])
-        .reset_index(drop=True)
-    )
-
-    # Write final output to csv
-    teamout.to_csv(outfile, index=False)
+from eloDates import game_codes
+
+
+def convert(seasons=range(2000, 2019 + 1)):
+    """
+    Convert each season's scraped college team game statistics to the game-code files
+    used in computeElo
+    """
+    # Root dir and name portions to join for reading/writing
+    elo_root = Path("data_raw", "cfb")
+    # Path to ncaa scraped data
+    old_root = Path("data_scraped", "ncaa_team")
+
+    # output file format (used in computeElo)
+    teamstatroot = "ncaa-team-game-statistics"
+    # input file format
+    teamroot = "ncaa_team_data_"
+    extension = ".csv"
+
+    # Read in configfile
+    with open(Path("code_python/elo_config.json")) as file:
+        cfg = json.load(file)["convert_team_stats"]
+
+    config = cfg["college"]
+
+    from tqdm import tqdm
+
+    tqdm.write("Beginning TeamStats Conversion")
+    seasons = tqdm(seasons)
+    for season in seasons:
+        seasons.set_description(f"s: {season}")
+
+        teamfile = old_root.joinpath(f"{teamroot}{season}{extension}")
+        outfile = elo_root.joinpath(f"{teamstatroot}{season}{extension}")
+
+        teamall = pd.read_csv(teamfile)
+
+        # Do the game code calculation
+        teamall["Game Code"] = game_codes(
+            teamall["Loc"], teamall["Team Code"], teamall["Team Code opp"], teamall["Date"]
+        )
+
+        # Select columns & fill na values
+        teamout = (
+            teamall[config["keepcols"]]
+            .fillna("0")
+            .sort_values(["Game Code", "Team Code"])
+            .reset_index(drop=True)
+        )
+
+        # Write final output to csv
+        teamout.to_csv(outfile, index=False)
+
+
+if __name__ == "__main__":
+    convert()
@@ -2,13 +2,26 @@
 import pandas as pd
 from pathlib import Path
 
-# Path holding team data
-root = Path("data_team")
-p5file = root.joinpath("teams_ncaa.csv")
 
-# Read in the team file and get Power Five teams
-indata = pd.read_csv(p5file)
+def get_power5teams(root=Path("data_team")):
+    """
+    Team codes of the Power Five teams
 
-p5 = indata[indata["Power5"] == True]
+    Input
+    ----------
+        root : path
+            folder holding teams_ncaa.csv
+    Returns
+    ----------
+        power5teams : list
+            team codes
+    """
+    p5file = root.joinpath("teams_ncaa.csv")
 
-power5teams = list(p5["TeamCode"])
+    # Read in the team file and get Power Five teams
+    indata = pd.read_csv(p5file)
+
+    p5 = indata[indata["Power5"] == True]
+
+    power5teams = list(p5["TeamCode"])
+    return power5teams
@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
 # PURPOSE: process passing and rushing statistics for first few seasons for the teams, to serve as initialized values that player Elo ratings build off from.
-import json
+#
+# Usage (compare the "replay" and "leastsquares" initializers -- run time and
+# the team predictions of the following seasons -- from the folder holding
+# code_python and data_raw):
+#     python3 code_python/draft-gem/cfb_runOldSeasons.py [2005 2006 ...]
+import sys
+import time
+from math import log
+
+import numpy as np
 import pandas as pd
-from copy import deepcopy
 from pathlib import Path
 
-from eloUtilities import get_start_date, readteamgamedata, updateElo
-from cfb_getPowerFive import power5teams
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import lsqr
+except ImportError:  # only the "leastsquares" initializer needs SciPy
+    sparse = None
+
+from eloGameIndex import GameIndex
+from eloHistory import EloHistory
+from eloTeamTable import TeamTable, conflict_batches
+from eloReplayCache import ReplayCache, config_hash, data_signature
+from eloUtilities import load_config, readteamgamedata, season_of
+from cfb_getPowerFive import get_power5teams
 
 # Run the code to convert stats needed for runOldSeasons
 #import cfb_convertPlayerGameStats as convertPlayerGameStats
@@ -18,32 +36,36 @@ LEAGUE = "college"
 BOOST_POWER_5 = True
 blowoutFactor = True
 
-with open(Path("code_python/elo_config.json")) as file:
-    cfg = json.load(file)
-
 # To determine how to read in the teamgame files
-nfl = True
-if LEAGUE == "college":
-    config = cfg["run_old_seasons"]["college"]
-    nfl = False
-elif LEAGUE == "nfl":
-    config = cfg["run_old_seasons"]["nfl"]
-elif LEAGUE == "fantasy":
-    config = cfg["run_old_seasons"]["fantasy"]
+nfl = LEAGUE != "college"
+
+# Baseline replays are cached by their settings and input files
+cache = ReplayCache(Path("data_cache"))
+
+
+def get_config(cfg=None):
+    """
+    The league's run_old_seasons settings (cfg: elo_config.json contents)
+    """
+    if cfg is None:
+        cfg = load_config()
+    return cfg["run_old_seasons"][LEAGUE]
 
 
 # SECTION: Setup of default dictionaries
-# Starter values
-initialEloList = [config["initialTeamElo"]]
-initialDateList = [config["initialDate"]]
-initialOppList = [0]
+def get_teams_default(config):
+    # Starter values
+    initialEloList = [config["initialTeamElo"]]
+    initialDateList = [config["initialDate"]]
+    initialOppList = [0]
 
-teams_default = {
-    "last": config["initialTeamElo"],
-    "elo": initialEloList,
-    "date": initialDateList,
-    "opp": initialOppList,
-}
+    teams_default = {
+        "last": config["initialTeamElo"],
+        "elo": initialEloList,
+        "date": initialDateList,
+        "opp": initialOppList,
+    }
+    return teams_default
 
 
 # SECTION: Process games for rushing and passing
@@ -57,10 +79,44 @@ def run_games(
     BOOST_POWER_5=False,
     power5teams=[],
     power5initialTeamElo=0,
+    config=None,
 ):
-    # Dictionaries for defense and offense
-    D_dicts = {}
-    O_dicts = {}
+    teams_default = get_teams_default(get_config() if config is None else config)
+
+    # Reuse a replay with the same seasons, settings and files if there is one
+    # (entries are pickled EloHistory objects: bump the version whenever
+    # EloHistory's layout or the replay changes)
+    key = config_hash(
+        "cfb run_games",
+        2,
+        teams_default,
+        data_signature(
+            Path("data_raw", "cfb", f"ncaa-team-game-statistics{season}.csv")
+            for season in seasons
+        ),
+        seasons=list(seasons),
+        blowoutFactor=blowoutFactor,
+        teamK=teamK,
+        opp_perf_var=opp_perf_var,
+        drawline=drawline,
+        yardFactor=yardFactor,
+        BOOST_POWER_5=BOOST_POWER_5,
+        power5teams=sorted(power5teams),
+        power5initialTeamElo=power5initialTeamElo,
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Histories for defense and offense
+    D_dicts = EloHistory(teams_default, id_name="Team Code")
+    O_dicts = EloHistory(teams_default, id_name="Team Code")
+
+    # Current ratings by Team Code
+    teams_table = TeamTable(
+        {"D": D_dicts, "O": O_dicts}, power5=power5teams if BOOST_POWER_5 else ()
+    )
+    boost = {"elo": power5initialTeamElo, "last": power5initialTeamElo}
 
     # Filename templates
     teamstatroot = "ncaa-team-game-statistics"
@@ -77,73 +133,179 @@ def run_games(
         teamstats = readteamgamedata(teamgamefile, nfl=nfl)
 
         # Loop over each date within the season - update Elo after each game
-        dates = list(teamstats["gamedate"].unique())
-
-        for date in dates:
-            # List of the date's games (both teams' perspectives)
-            teams = teamstats[teamstats["gamedate"] == date].to_dict("records")
-
-            # Evaluate team rush D and rush O (overall)
-            for row in teams:
-                # Codes for the defensive and offensive teams
-                us_id = row["Team Code"]
-                them_id = row["Team Code opp"]
-
-                # Initialize team dictionary if not already present
-                if us_id not in D_dicts:
-                    D_dicts[us_id] = deepcopy(teams_default)
-                    D_dicts[us_id]["Team Code"] = us_id
-                    if BOOST_POWER_5 and us_id in power5teams:
-                        D_dicts[us_id]["elo"][0] = power5initialTeamElo
-                        D_dicts[us_id]["last"] = power5initialTeamElo
-
-                if them_id not in O_dicts:
-                    O_dicts[them_id] = deepcopy(teams_default)
-                    O_dicts[them_id]["Team Code"] = them_id
-                    if BOOST_POWER_5 and them_id in power5teams:
-                        O_dicts[them_id]["elo"][0] = power5initialTeamElo
-                        O_dicts[them_id]["last"] = power5initialTeamElo
-
-                # Get teams' latest Elo ratings
-                lastDelo = D_dicts[us_id]["elo"][-1]
-                lastOelo = O_dicts[them_id]["elo"][-1]
-
-                # Team performance based on yards per game
-                # Calculate point differential - in this case yards
-                opperf = row[opp_perf_var]
-                ptdiff = abs(opperf - drawline) / yardFactor
-                win = opperf < drawline
-
-                dElo, oElo = updateElo(
-                    lastDelo, lastOelo, ptdiff, win, blowoutFactor, teamK, both=True
+        games = GameIndex(teamstats)
+
+        for date in games.dates:
+            # The date's games (both teams' perspectives): codes for the
+            # defensive and offensive teams and the offense's performance
+            codes = games.arrays(date, ["Team Code", "Team Code opp", opp_perf_var])
+            us = codes["Team Code"]
+            them = codes["Team Code opp"]
+
+            # Initialize team histories not already present
+            teams_table.add(us, names=["D"], boost=boost)
+            teams_table.add(them, names=["O"], boost=boost)
+
+            # Team performance based on yards per game
+            # Calculate point differential - in this case yards
+            opperf = codes[opp_perf_var]
+            ptdiff = np.abs(opperf - drawline) / yardFactor
+            win = opperf < drawline
+
+            # Evaluate team rush D and rush O (overall): update Elo, last Elo,
+            # opponent and date histories for all the date's games at once
+            # (games sharing a team go in later batches, in order)
+            # (the first date is set to the day before the first game)
+            for rows in conflict_batches(us, them):
+                teams_table.update(
+                    ("D", "O"), us[rows], them[rows], {"elo": (ptdiff[rows], win[rows])},
+                    teamK, blowoutFactor, date, last={"elo": "last"},
                 )
 
-                # Update last Elo rating
-                D_dicts[us_id]["last"] = dElo
-                O_dicts[them_id]["last"] = oElo
+    # Completed histories
+    cache.put(key, (D_dicts, O_dicts))
+    return D_dicts, O_dicts
+
+# SECTION: Least-squares team strengths
+def fit_games(teamstats, opp_perf_var, drawline, weights, ridge=2.0):
+    """
+    Team offense and defense strengths from one sparse least-squares solve
 
-                # Update Elo array
-                D_dicts[us_id]["elo"] = D_dicts[us_id]["elo"] + [dElo]
-                O_dicts[them_id]["elo"] = O_dicts[them_id]["elo"] + [oElo]
+    Every game row (defense "Team Code" against offense "Team Code opp") is
+    modelled as `mean + offense - defense` yards. The design matrix has one
+    +1 (offense) and one -1 (defense) per row; `ridge` pulls teams with few
+    games toward the average. The strengths are then put on the Elo scale:
+    with normal residuals (standard deviation `sigma`) the defense holds the
+    offense under the drawline with probability Phi((drawline - expected) /
+    sigma), and Phi(z) ~ logistic(1.702 z) gives
+        D - O = 400 * 1.702 / (ln(10) * sigma) * (drawline - expected)
+    (the drawline's offset is split between D and O).
 
-                # Update opponents array
-                D_dicts[us_id]["opp"] = D_dicts[us_id]["opp"] + [them_id]
-                O_dicts[them_id]["opp"] = O_dicts[them_id]["opp"] + [us_id]
+    Input
+    ----------
+        teamstats : dataframe
+            team game rows (readteamgamedata) of the warm-up seasons
+        opp_perf_var : string
+            offense's stat column (e.g., "Rush Yard opp")
+        drawline : number
+            defense wins if the offense is held under it
+        weights : array of floats
+            weight of each row (e.g., recent seasons count more)
+        ridge : number
+            pseudo-games at the average per team
+    Returns
+    ----------
+        codes : array of integers
+            team codes
+        defense, offense : arrays of floats
+            Elo offsets from the initial team Elo
+    """
+    if sparse is None:
+        raise ImportError("The leastsquares initializer needs SciPy (pip install scipy)")
+    d = teamstats["Team Code"].to_numpy()
+    o = teamstats["Team Code opp"].to_numpy()
+    codes, which = np.unique(np.r_[d, o], return_inverse=True)
+    n, nTeams = len(d), len(codes)
 
-                # Update dates
+    # Weighted least squares: rows scaled by the square root of their weight
+    y = teamstats[opp_perf_var].to_numpy(dtype=np.float64)
+    mean = np.average(y, weights=weights)
+    root = np.sqrt(weights)
+    rows = np.r_[np.arange(n), np.arange(n)]
+    design = sparse.csr_matrix(
+        (np.r_[-root, root], (rows, np.r_[which[:n], nTeams + which[n:]])),
+        shape=(n, 2 * nTeams),
+    )
+    x = lsqr(design, root * (y - mean), damp=np.sqrt(ridge))[0]
+    defense, offense = x[:nTeams], x[nTeams:]
 
-                # Add the date (if first time, add a date for the first date)
-                if len(D_dicts[us_id]["date"]) == 1:
-                    D_dicts[us_id]["date"][0] = get_start_date(date)
-                if len(O_dicts[them_id]["date"]) == 1:
-                    O_dicts[them_id]["date"][0] = get_start_date(date)
-                D_dicts[us_id]["date"] = D_dicts[us_id]["date"] + [date]
-                O_dicts[them_id]["date"] = O_dicts[them_id]["date"] + [date]
+    residual = y - mean - offense[which[n:]] + defense[which[:n]]
+    sigma = np.sqrt(np.average(residual ** 2, weights=weights))
+    scale = 400 * 1.702 / (log(10) * sigma)
+    offset = (drawline - mean) / 2
+    return codes, scale * (defense + offset), scale * (offense - offset)
 
-    # Completed dictionaries
-    return D_dicts, O_dicts
 
-def set_baselines():
+def fit_baselines(config, seasons):
+    """
+    Rush and pass D/O team histories fitted by least squares (`fit_games`)
+    from the team game files of the seasons, each read once
+
+    Each team gets the starting row, then its fitted Elo dated on its last
+    warm-up game. The fit's settings are "leastsquares" in elo_config.json:
+    "seasonWeight" (a season's weight relative to the next one) and "ridge".
+
+    Power-5 teams get no starting boost (BOOST_POWER_5 and
+    "power5initialTeamElo" only apply to the replay): the boost is a head
+    start for ratings that begin equal and need several seasons to separate,
+    while the fit already measures the gap between conferences from the
+    games, so a boost on top would count it twice. Teams first seen after the
+    warm-up seasons still get the boost in cfb_computeElo.
+
+    Returns
+    ----------
+        rushD, rushO, passD, passO : EloHistory
+    """
+    settings = config["leastsquares"]
+    teams_default = get_teams_default(config)
+    teamstats = pd.concat(
+        [
+            readteamgamedata(Path("data_raw", "cfb", f"ncaa-team-game-statistics{season}.csv"), nfl=nfl)
+            for season in seasons
+        ],
+        ignore_index=True,
+    )
+    # (games in January belong to the previous season)
+    season = season_of(teamstats["gamedate"].to_numpy())
+    weights = settings["seasonWeight"] ** (season.max() - season).astype(np.float64)
+
+    # Each team's last warm-up date
+    lastDate = pd.concat(
+        [teamstats[["Team Code", "gamedate"]],
+         teamstats[["Team Code opp", "gamedate"]].set_axis(["Team Code", "gamedate"], axis=1)]
+    ).groupby("Team Code")["gamedate"].max()
+
+    histories = []
+    for side in ("rushing", "passing"):
+        codes, defense, offense = fit_games(
+            teamstats,
+            config[side]["opp_perf_var"],
+            config[side]["drawline"],
+            weights,
+            settings["ridge"],
+        )
+        for values in (defense, offense):
+            history = EloHistory(teams_default, id_name="Team Code")
+            elo = np.rint(config["initialTeamElo"] + values).astype(int)
+            for code, rating in zip(codes.tolist(), elo.tolist()):
+                history.add(code, last=rating)
+                history.append(code, elo=rating, date=int(lastDate[code]), opp=0)
+            histories.append(history)
+    return tuple(histories)
+
+
+def set_baselines(cfg=None):
+    """
+    Rush and pass D/O team histories from the 2000-2004 seasons, replayed
+    game by game or, with "initializer": "leastsquares" in elo_config.json,
+    fitted in one solve per side (`fit_baselines`)
+
+    Input
+    ----------
+        cfg : dictionary [optional]
+            elo_config.json contents (read from file if not given)
+    Returns
+    ----------
+        rushD, rushO, passD, passO : EloHistory
+    """
+    config = get_config(cfg)
+    initializer = config.get("initializer", "replay")
+    if initializer == "leastsquares":
+        return fit_baselines(config, range(2000, 2004 + 1))
+    if initializer != "replay":
+        raise ValueError(f"Unknown initializer {initializer!r} (expected replay or leastsquares)")
+    power5teams = get_power5teams()
+
     # Make and save dataframes
     rushD, rushO = run_games(
         range(2000, 2004 + 1),
@@ -155,6 +317,7 @@ def set_baselines():
         BOOST_POWER_5,
         power5teams,
         config["power5initialTeamElo"],
+        config,
     )
     
     passD, passO = run_games(
@@ -167,6 +330,66 @@ def set_baselines():
         BOOST_POWER_5,
         power5teams,
         config["power5initialTeamElo"],
+        config,
     )
     
     return rushD, rushO, passD, passO
+
+
+# SECTION: Benchmark of the initializers
+def benchmark(seasons=range(2005, 2007 + 1), cfg=None):
+    """
+    Run both initializers (without the replay cache), then cfb_computeElo on
+    `seasons` from each, and compare run time and the team units' prediction
+    scores (eloCalibration)
+
+    Nothing is written: replays are cached in memory only, and the runs take
+    no checkpoints or leaderboards and keep their player IDs in memory.
+
+    Returns
+    ----------
+        results : dataframe
+            per initializer: baseline seconds, then each team unit's count,
+            Brier score and log loss over the seasons
+    """
+    global cache
+    import cfb_computeElo
+    from eloPlayerIds import PlayerIds
+
+    if cfg is None:
+        cfg = load_config()
+    # (no weekly boards)
+    cfg = dict(cfg, computeElo=dict(cfg["computeElo"]))
+    cfg["computeElo"]["college"] = dict(cfg["computeElo"]["college"], leaderboards=[])
+    rows = []
+    saved = cache
+    try:
+        for initializer in ("replay", "leastsquares"):
+            config = dict(cfg, run_old_seasons=dict(cfg["run_old_seasons"]))
+            config["run_old_seasons"][LEAGUE] = dict(get_config(cfg), initializer=initializer)
+            # (timed with an empty cache, kept in memory for the run below)
+            cache = ReplayCache()
+            start = time.perf_counter()
+            set_baselines(config)
+            seconds = time.perf_counter() - start
+
+            results = cfb_computeElo.compute_elo(
+                seasons, config, checkpoint_every=None, ids=PlayerIds()
+            )
+            table = results["calibration"]
+            table = table[table["source"].isin(["rushD", "passD"])]
+            row = {"initializer": initializer, "seconds": seconds}
+            for source, frame in table.groupby("source"):
+                count = frame["count"].sum()
+                row[f"count_{source}"] = count
+                row[f"brier_{source}"] = (frame["brier"] * frame["count"]).sum() / count
+                row[f"logloss_{source}"] = (frame["logLoss"] * frame["count"]).sum() / count
+            rows.append(row)
+    finally:
+        cache = saved
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    seasons = [int(x) for x in sys.argv[1:]] or range(2005, 2007 + 1)
+    print(benchmark(seasons).to_string(index=False))
@@ -1,38 +1,63 @@
 # PURPOSE: Write processed data to files for UI use
+import sys
 import pandas as pd
 from pathlib import Path
 
 from eloUtilities import save_elo_output
-from cfb_computeElo import (
-    rushers,
-    receivers,
-    passers,
-    defense,
-    rushD,
-    rushO,
-    passD,
-    passO,
-)
-
-# Path to use for final data writing. Will create it if it doesn't already exist.
-root = Path("data_raw")
-if not root.exists():
-    root.mkdir(parents=True)
-
-# Acscending "To" and descending "last"
-tl = [["last", "unique_id"], [False, True]]
-
-# # # Potential restrictor query for rushers/receivers/passers/defense
-# # # e.g., query=rc_0, query=rc_10, etc.
-# rc_10 = "count > 10"
-
-save_elo_output(rushers, root.joinpath("cfb_RB.csv"), tl[0], tl[1])
-save_elo_output(receivers, root.joinpath("cfb_WR.csv"), tl[0], tl[1])
-save_elo_output(passers, root.joinpath("cfb_QB.csv"), tl[0], tl[1])
-save_elo_output(
-    defense, root.joinpath("cfb_DEF.csv"), ["lastTackles", "unique_id"], tl[1]
-)
-save_elo_output(rushD, root.joinpath("team_cfb_rushDefense.csv"), ["last"], [False])
-save_elo_output(rushO, root.joinpath("team_cfb_rushOffense.csv"), ["last"], [False])
-save_elo_output(passD, root.joinpath("team_cfb_passDefense.csv"), ["last"], [False])
-save_elo_output(passO, root.joinpath("team_cfb_passOffense.csv"), ["last"], [False])
+from cfb_computeElo import compute_elo
+
+
+def save_output(results, root=Path("data_raw")):
+    """
+    Write the results of cfb_computeElo.compute_elo to csv files
+
+    Input
+    ----------
+        results : dictionary
+            name -> dataframe, from `compute_elo`
+        root : path
+            folder to write to (created if it doesn't exist)
+    """
+    # Path to use for final data writing. Will create it if it doesn't already exist.
+    if not root.exists():
+        root.mkdir(parents=True)
+
+    # Acscending "To" and descending "last"
+    tl = [["last", "unique_id"], [False, True]]
+
+    # # # Potential restrictor query for rushers/receivers/passers/defense
+    # # # e.g., query=rc_0, query=rc_10, etc.
+    # rc_10 = "count > 10"
+
+    save_elo_output(results["rushers"], root.joinpath("cfb_RB.csv"), tl[0], tl[1])
+    save_elo_output(results["receivers"], root.joinpath("cfb_WR.csv"), tl[0], tl[1])
+    save_elo_output(results["passers"], root.joinpath("cfb_QB.csv"), tl[0], tl[1])
+    save_elo_output(
+        results["defense"],
+        root.joinpath("cfb_DEF.csv"),
+        ["lastTackles", "unique_id"],
+        tl[1],
+    )
+    save_elo_output(
+        results["rushD"], root.joinpath("team_cfb_rushDefense.csv"), ["last"], [False]
+    )
+    save_elo_output(
+        results["rushO"], root.joinpath("team_cfb_rushOffense.csv"), ["last"], [False]
+    )
+    save_elo_output(
+        results["passD"], root.joinpath("team_cfb_passDefense.csv"), ["last"], [False]
+    )
+    save_elo_output(
+        results["passO"], root.joinpath("team_cfb_passOffense.csv"), ["last"], [False]
+    )
+
+    # Prediction scores of the replay (see eloCalibration.py)
+    for name in ("calibration", "reliability"):
+        if name in results:
+            results[name].to_csv(root.joinpath(f"cfb_{name}.csv"), index=False)
+
+
+if __name__ == "__main__":
+    # "update" resumes from the latest checkpoint (see cfb_computeElo)
+    update = any(x.lower() == "update" for x in sys.argv)
+    save_output(compute_elo(update=update))
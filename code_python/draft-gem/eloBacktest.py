@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# PURPOSE: Backtest team Elo against the betting lines in Data/Betting Odds: join each line to its game (by game code) and result, rate both teams at kickoff from the team units, and score the model's win probabilities and spreads (accuracy, record against the spread, Brier score, calibration) for every season in one vectorized pass.
+#
+# Usage (from the folder holding Data, data_raw and data_team, after saving college Elo output):
+#     python3 code_python/draft-gem/eloBacktest.py [homeField=65] [eloPerPoint=25]
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import eloUtilities as eu
+from eloDates import game_codes
+from eloQuery import RatingIndex
+from eloSimulate import read_schedule, read_units
+
+
+# SECTION: Inputs
+def team_codes(teamsfile, replace=None):
+    """
+    Team name -> team code, for every spelling in the teams file (the "Team"
+    and "Name1", "Name2", ... columns)
+
+    Input
+    ----------
+        teamsfile : path
+            teams_ncaa.csv
+        replace : dictionary [optional]
+            extra spellings: name -> standardized "Team" name
+    Returns
+    ----------
+        codes : dictionary
+    """
+    teams = pd.read_csv(teamsfile)
+    columns = ["Team"] + [c for c in teams.columns if re.fullmatch(r"Name\d+", c)]
+    codes = {}
+    for column in columns:
+        for name, code in zip(teams[column], teams["TeamCode"]):
+            if pd.notna(name):
+                codes.setdefault(str(name).strip(), int(code))
+    for name, team in (replace or {}).items():
+        codes[name] = codes[team]
+    return codes
+
+
+def read_odds(root, codes):
+    """
+    Every season's lines ("<season> - Odds.csv" and weekly
+    "<season>_week_<n>.csv" files), with team codes and game codes
+
+    Input
+    ----------
+        root : path
+            folder of the odds files
+        codes : dictionary
+            team name -> team code (`team_codes`)
+    Returns
+    ----------
+        odds : dataframe
+            season, date, away/home code, homeSpread, overUnder (missing if
+            not posted) and "Game Code" (home team at home)
+    """
+    frames = []
+    for path in sorted(root.glob("*.csv")):
+        season = int(re.match(r"\d{4}", path.name).group())
+        frame = pd.read_csv(path, skipinitialspace=True)
+        frame["season"] = season
+        frames.append(frame)
+    odds = pd.concat(frames, ignore_index=True)
+
+    names = pd.concat([odds["Vis Team"], odds["Home Team"]]).str.strip()
+    unknown = sorted(set(names) - set(codes))
+    if unknown:
+        print(f"Dropping lines with unknown teams: {unknown}")
+    known = odds["Vis Team"].str.strip().isin(codes) & odds["Home Team"].str.strip().isin(codes)
+    odds = odds[known].copy()
+
+    odds["away"] = odds["Vis Team"].str.strip().map(codes)
+    odds["home"] = odds["Home Team"].str.strip().map(codes)
+    odds["date"] = odds["Date"].str.replace("-", "").astype(int)
+    odds["homeSpread"] = odds["Home Spread"]
+    # A total of 0 is a line that wasn't posted
+    odds["overUnder"] = odds["Over Under"].where(odds["Over Under"] != 0)
+    odds["Game Code"] = game_codes(np.full(len(odds), ""), odds["home"], odds["away"], odds["Date"])
+    # The same game as a neutral-site game code
+    odds["Neutral Code"] = game_codes(np.full(len(odds), "N"), odds["home"], odds["away"], odds["Date"])
+    odds = odds.drop_duplicates(subset=["Game Code"])
+    return odds[["season", "date", "away", "home", "homeSpread", "overUnder", "Game Code", "Neutral Code"]]
+
+
+def read_results(seasons, league, root):
+    """
+    Final scores of every game of the seasons (regular season and
+    postseason), by game code
+
+    Input
+    ----------
+        seasons : iterable of integers
+        league : string
+            schedule file name ("ncaa")
+        root : path
+            folder of the schedule files
+    Returns
+    ----------
+        results : dataframe
+            "Game Code", neutral, home/away points (home team at home)
+    """
+    frames = []
+    for season in seasons:
+        path = root.joinpath(f"schedule_{league}_{season}.csv")
+        if path.exists():
+            frames.append(read_schedule(league, season, root, postseason=True))
+    schedule = pd.concat(frames, ignore_index=True)
+    schedule = schedule.dropna(subset=["home_points", "away_points"])
+    schedule["Game Code"] = game_codes(
+        np.where(schedule["neutral_site"].astype(bool), "N", ""),
+        schedule["home_code"].astype(np.int64),
+        schedule["away_code"].astype(np.int64),
+        schedule["date"].astype(str),
+    )
+    schedule = schedule.rename(
+        columns={"neutral_site": "neutral", "home_points": "homePoints", "away_points": "awayPoints"}
+    )
+    return schedule.drop_duplicates(subset=["Game Code"])[
+        ["Game Code", "home_code", "neutral", "homePoints", "awayPoints"]
+    ]
+
+
+def load_games(config, league="cfb"):
+    """
+    Lines joined to their games' results (read once, then scored by
+    `backtest` as often as needed)
+
+    Input
+    ----------
+        config : dictionary
+            elo_config.json contents (the league's "backtest" section)
+        league : string
+            "cfb"
+    Returns
+    ----------
+        games : dataframe
+            season, date, away, home (codes), neutral, homeSpread, overUnder,
+            homeMargin, "Game Code"; lines without a result are dropped
+    """
+    cfg = config["computeElo"]["college" if league == "cfb" else league]["backtest"]
+    codes = team_codes(Path(cfg["teamsfile"]), cfg["namereplace"])
+    odds = read_odds(Path(cfg["odds"]), codes)
+    results = read_results(odds["season"].unique(), cfg["schedule"], Path(cfg["schedules"]))
+
+    # Match the game code as listed, else as a neutral-site game
+    games = odds.merge(results, on="Game Code", how="left")
+    missing = games["homePoints"].isna()
+    neutral = odds[missing.to_numpy()].merge(
+        results, left_on="Neutral Code", right_on="Game Code", suffixes=("", " result")
+    )
+    games = pd.concat([games[~missing], neutral.drop(columns="Game Code result")], ignore_index=True)
+
+    # Points from the line's home team's side
+    flipped = games["home_code"] != games["home"]
+    margin = games["homePoints"] - games["awayPoints"]
+    games["homeMargin"] = np.where(flipped, -margin, margin)
+    games["neutral"] = games["neutral"].astype(bool)
+    print(f"{len(games)} of {len(odds)} lines matched to a result")
+    games = games.sort_values(["date", "Game Code"]).reset_index(drop=True)
+    return games[["season", "date", "away", "home", "neutral", "homeSpread", "overUnder", "homeMargin", "Game Code"]]
+
+
+# SECTION: Scoring
+def unit_indexes(units):
+    """
+    RatingIndex of each team unit (an EloHistory or a compute_elo frame)
+    """
+    indexes = {}
+    for name, unit in units.items():
+        if isinstance(unit, pd.DataFrame):
+            indexes[name] = RatingIndex.from_frame(unit, "Team Code", ["elo"])
+        else:
+            indexes[name] = RatingIndex.from_history(unit, ["elo"])
+    return indexes
+
+
+def backtest(games, indexes, weights, homeField=65, eloPerPoint=25, bins=10):
+    """
+    Score the model against the lines
+
+    Each team's rating is the weighted mean of its unit Elos before the
+    game's date (as in eloSimulate); the home win probability is
+    `eloUtilities.probabilityBatch` with home field (none at neutral sites)
+    and the model spread is the rating difference over `eloPerPoint`.
+    Against the spread, the model takes the side its spread favours more
+    than the line does (no pick when they agree).
+
+    Input
+    ----------
+        games : dataframe
+            `load_games` output
+        indexes : dictionary
+            unit name -> RatingIndex (`unit_indexes`)
+        weights : dictionary
+            unit name -> weight
+        homeField : number
+            Elo points for the home team
+        eloPerPoint : number
+            Elo points per point of spread
+        bins : integer
+            calibration bins over [0, 1]
+    Returns
+    ----------
+        result : dictionary
+            "summary": per season and "all" (games, accuracy, Brier score,
+            spread error, ATS wins/losses/pushes and win share);
+            "calibration": per bin mean probability and home win share;
+            "games": `games` with the model's columns
+    """
+    total = sum(weights.values())
+    teams = np.stack([games["home"].to_numpy(), games["away"].to_numpy()])
+    dates = games["date"].to_numpy()
+    rating = np.zeros(teams.shape)
+    for name, weight in weights.items():
+        rating += weight * indexes[name].ratings(teams, dates, "elo", pregame=True) / total
+    home, away = rating
+    field = np.where(games["neutral"].to_numpy(), 0.0, homeField)
+
+    rated = ~np.isnan(home) & ~np.isnan(away)
+    prob = eu.probabilityBatch(away, home + field)
+    spread = -(home + field - away) / eloPerPoint
+    margin = games["homeMargin"].to_numpy()
+    line = games["homeSpread"].to_numpy()
+    decided = rated & (margin != 0)
+    homeWin = (margin > 0).astype(np.float64)
+
+    # Against the spread: +1 model side covers, -1 it doesn't, 0 push
+    side = np.sign(line - spread)
+    cover = np.sign(margin + line)
+    picked = rated & (side != 0) & ~np.isnan(line)
+    ats = side * cover
+
+    # Every season at once: sums per season position (bincount), plus all
+    seasons, which = np.unique(games["season"].to_numpy(), return_inverse=True)
+    n = len(seasons)
+
+    def per_season(values, mask):
+        sums = np.bincount(which[mask], weights=values[mask], minlength=n)
+        return np.r_[sums, sums.sum()]
+
+    count = per_season(np.ones(len(games)), decided)
+    correct = per_season(((prob > 0.5) == (margin > 0)).astype(np.float64), decided)
+    squared = per_season((prob - homeWin) ** 2, decided)
+    error = per_season(np.abs(spread + margin), rated)
+    wins = per_season((ats > 0).astype(np.float64), picked)
+    losses = per_season((ats < 0).astype(np.float64), picked)
+    pushes = per_season((ats == 0).astype(np.float64), picked)
+    summary = pd.DataFrame(
+        {
+            "games": count.astype(int),
+            "accuracy": correct / count,
+            "brier": squared / count,
+            "spreadError": error / per_season(np.ones(len(games)), rated),
+            "atsWins": wins.astype(int),
+            "atsLosses": losses.astype(int),
+            "atsPushes": pushes.astype(int),
+            "atsShare": wins / (wins + losses),
+        },
+        index=pd.Index(list(seasons) + ["all"], name="season"),
+    )
+
+    # Calibration: probability bins of the decided games
+    edges = np.linspace(0, 1, bins + 1)
+    b = np.clip(np.searchsorted(edges, prob[decided], side="right") - 1, 0, bins - 1)
+    games_in = np.bincount(b, minlength=bins)
+    calibration = pd.DataFrame(
+        {
+            "low": edges[:-1],
+            "high": edges[1:],
+            "games": games_in,
+            "probability": np.bincount(b, weights=prob[decided], minlength=bins) / games_in,
+            "homeWins": np.bincount(b, weights=homeWin[decided], minlength=bins) / games_in,
+        }
+    )
+
+    scored = games.assign(
+        homeRating=home,
+        awayRating=away,
+        probability=prob,
+        modelSpread=spread,
+        ats=np.where(picked, ats, np.nan),
+    )
+    return {"summary": summary, "calibration": calibration, "games": scored}
+
+
+if __name__ == "__main__":
+    options = dict(x.split("=", 1) for x in sys.argv[1:] if "=" in x)
+    config = eu.load_config()
+    cfg = config["computeElo"]["college"]
+    games = load_games(config, "cfb")
+    indexes = unit_indexes(read_units(config, "cfb"))
+    result = backtest(
+        games,
+        indexes,
+        cfg["simulate"]["units"],
+        float(options.get("homeField", cfg["simulate"]["homeField"])),
+        float(options.get("eloPerPoint", cfg["backtest"]["eloPerPoint"])),
+        cfg["backtest"]["bins"],
+    )
+    print(result["summary"].to_string())
+    print(result["calibration"].to_string(index=False))
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# PURPOSE: Bootstrap bands for NFL player ratings: B replays in which each player's games of a season are resampled with replacement, run as the variants of ensemble replays (eloEnsemble.py) spread over a process pool that reads the game data from shared memory, then percentiles of every player's final metric Elos.
+#
+# Usage (from the folder holding code_python and data_raw; settings under
+# "bootstrap" in elo_config.json):
+#     python3 code_python/draft-gem/eloBootstrap.py [replicates=200] [workers=8] [seed=0] [first=1999] [last=2019]
+import multiprocessing
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import eloUtilities as eu
+import nfl_computeElo
+from eloEnsemble import EnsembleReplay
+from eloGameIndex import GameIndex
+from eloPlayerIds import PlayerIds
+from eloShared import SharedArrays
+
+# Position groups replayed (as in nfl_computeElo.EloEnsemble)
+GROUPS = ["rushers", "wide_receivers", "tight_ends", "passers", "defense"]
+
+# Columns every frame keeps (dates, teams and players)
+KEYS = ["gamedate", "awayteam", "hometeam", "Team Code", "Team Code opp", "unique_id"]
+
+
+# SECTION: Shared game data
+def season_arrays(season, teamstats, playerstats, positions):
+    """
+    A season's team rows and each position group's rows (nfl_computeElo
+    group_stats) as numeric columns named "<season>/<frame>/<column>": the
+    keys and the columns the metrics read
+
+    Input
+    ----------
+        season : integer
+        teamstats, playerstats : dataframes
+            from nfl_computeElo.load_season, with integer player IDs
+        positions : dictionary
+            group name -> spec
+    Returns
+    ----------
+        arrays : dictionary
+    """
+    arrays = {f"{season}/dates/gamedate": np.unique(playerstats["gamedate"].to_numpy())}
+    stats = [m["stat"] for m in nfl_computeElo.TEAM_METRICS]
+    frames = {"teams": (teamstats, stats)}
+    for name, frame in nfl_computeElo.group_stats(playerstats).items():
+        if name in positions:
+            names = [c for m in positions[name]["metrics"] for c in re.findall(r"`([^`]+)`", m["stat"])]
+            frames[name] = (frame, names)
+    for name, (frame, names) in frames.items():
+        for c in dict.fromkeys(KEYS + names):
+            if c in frame:
+                arrays[f"{season}/{name}/{c}"] = frame[c].to_numpy()
+    return arrays
+
+
+def season_frames(arrays, season):
+    """
+    The season's frames back from `season_arrays` columns (frame -> dataframe)
+    """
+    columns = {}
+    for key, values in arrays.items():
+        s, name, c = key.split("/", 2)
+        if s == str(season):
+            columns.setdefault(name, {})[c] = values
+    return {name: pd.DataFrame(frame) for name, frame in columns.items()}
+
+
+# SECTION: Resampling
+def resample_rows(ids, rng):
+    """
+    A bootstrap draw of a season's rows: each row takes the stats of a
+    random row (with replacement) of the same player
+
+    Input
+    ----------
+        ids : array of integers
+            player of each row
+        rng : numpy Generator
+    Returns
+    ----------
+        draws : array of integers
+            row to read each row's stats from
+    """
+    order = np.argsort(ids, kind="stable")
+    grouped = ids[order]
+    first = np.searchsorted(grouped, grouped, side="left")
+    games = np.searchsorted(grouped, grouped, side="right") - first
+    pick = first + (rng.random(len(ids)) * games).astype(np.int64)
+    draws = np.empty(len(ids), dtype=np.int64)
+    draws[order] = order[pick]
+    return draws
+
+
+# SECTION: Replays (in the workers)
+_shared = None
+_job = None
+
+
+def _attach(spec, job):
+    global _shared, _job
+    _shared = SharedArrays.attach(spec)
+    _job = job
+
+
+def _replay(seeds):
+    """
+    One chunk of replicates as the variants of an ensemble replay (each
+    replicate draws from its own generator, so results don't depend on the
+    chunks)
+
+    Returns
+    ----------
+        ratings : dictionary
+            group name -> (players, {metric Elo -> players x replicates})
+    """
+    job = _job
+    rngs = [np.random.default_rng(s) for s in seeds]
+    replay = EnsembleReplay(
+        job["positions"], job["units"], nfl_computeElo.TEAM_METRICS, [job["parameters"]] * len(rngs)
+    )
+    for season in job["seasons"]:
+        frames = season_frames(_shared.arrays, season)
+        teamgames = GameIndex(frames["teams"])
+        playergames = {name: GameIndex(frames[name]) for name in replay.groups}
+        draws = {
+            name: np.stack(
+                [resample_rows(games.frame["unique_id"].to_numpy(), rng) for rng in rngs], axis=1
+            )
+            for name, games in playergames.items()
+        }
+        replay.load(teamgames, playergames, draws)
+
+        for date in frames["dates"]["gamedate"].tolist():
+            teams = teamgames.teams(date)
+            for games in playergames.values():
+                teams = teams.union(games.teams(date))
+            replay.add(teams)
+            replay.run(date)
+
+    ratings = {}
+    for name, group in replay.groups.items():
+        players = np.flatnonzero(group.seen)
+        ratings[name] = (players - 1, {elo: values[players] for elo, values in group.elos.items()})
+    return ratings
+
+
+# SECTION: Driver
+def bootstrap(
+    parameters=None,
+    seasons=range(1999, 2019 + 1),
+    replicates=200,
+    seed=None,
+    workers=None,
+    chunk=25,
+    percentiles=(5, 50, 95),
+    config=None,
+    data=None,
+    baselines=None,
+):
+    """
+    Percentile bands of every player's final metric Elos over bootstrap
+    replays of the seasons
+
+    In each replicate, every row of a position group takes the stats of a
+    random game (with replacement) of the same player in the same season;
+    dates, opponents and team updates are unchanged. The replicates run in
+    chunks of `chunk` as the variants of one EnsembleReplay, and the chunks
+    are spread over `workers` processes that read the seasons from shared
+    memory.
+
+    Input
+    ----------
+        parameters : dictionary [optional]
+            EloWithDrawlines parameters (default_parameters() if not given)
+        seasons : iterable of integers
+        replicates : integer
+            number of bootstrap replays (B)
+        seed : integer [optional]
+            random seed (same seed, same bands whatever the chunks and workers)
+        workers : integer [optional]
+            processes to spread the chunks over (default: this process)
+        chunk : integer
+            replicates per ensemble replay (bounds memory: rows x chunk stats)
+        percentiles : list of numbers
+        config : dictionary [optional]
+            elo_config.json contents
+        data, baselines :
+            as in nfl_computeElo.EloWithDrawlines
+    Returns
+    ----------
+        bands : dataframe
+            one row per player and metric: group, unique_id, metric, games
+            (rows over the seasons) and a "p<q>" column per percentile
+    """
+    import nfl_runOldSeasons
+
+    if config is None:
+        config = eu.load_config()
+    if parameters is None:
+        parameters = nfl_computeElo.default_parameters()
+    if baselines is None:
+        baselines = nfl_runOldSeasons.set_baselines(config)
+    rushD, rushO, passD, passO = baselines
+    # Same groups as EloEnsemble
+    positions = {name: config["computeElo"]["nfl"]["positions"][name] for name in GROUPS}
+    playerIds = PlayerIds()
+
+    # Every season's game data, once, in shared memory
+    seasons = list(seasons)
+    arrays = {}
+    for season in seasons:
+        if data is None:
+            teamstats, playerstats = nfl_computeElo.load_season(season)
+        else:
+            teamstats, playerstats = data[season]
+        playerstats = playerstats.assign(unique_id=playerIds.encode(playerstats["unique_id"]))
+        arrays.update(season_arrays(season, teamstats, playerstats, positions))
+    shared = SharedArrays(arrays)
+    del arrays
+
+    job = {
+        "parameters": parameters,
+        "positions": positions,
+        "units": {"rushD": rushD, "rushO": rushO, "passD": passD, "passO": passO},
+        "seasons": seasons,
+    }
+    seeds = np.random.SeedSequence(seed).spawn(replicates)
+    chunks = [seeds[i:i + chunk] for i in range(0, replicates, chunk)]
+    try:
+        if workers is not None and workers > 1 and len(chunks) > 1:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(workers, initializer=_attach, initargs=(shared.spec, job)) as pool:
+                parts = pool.map(_replay, chunks)
+        else:
+            _attach(shared.spec, job)
+            parts = [_replay(c) for c in chunks]
+            _shared.close()
+        # Rows of each player over the seasons
+        games = {}
+        for key, values in shared.arrays.items():
+            _, name, c = key.split("/", 2)
+            if c == "unique_id" and name in positions:
+                games[name] = games.get(name, 0) + np.bincount(values + 1, minlength=len(playerIds.keys) + 1)
+    finally:
+        shared.close()
+
+    frames = []
+    for name, (players, _) in parts[0].items():
+        for elo in parts[0][name][1]:
+            values = np.concatenate([p[name][1][elo] for p in parts], axis=1)
+            frame = {
+                "group": name,
+                "unique_id": playerIds.decode(players),
+                "metric": elo,
+                "games": games[name][players + 1],
+            }
+            for q, band in zip(percentiles, np.percentile(values, percentiles, axis=1)):
+                frame[f"p{q:g}"] = band
+            frames.append(pd.DataFrame(frame))
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    options = dict(x.split("=", 1) for x in sys.argv[1:] if "=" in x)
+    config = eu.load_config()
+    cfg = config["computeElo"]["nfl"]["bootstrap"]
+    bands = bootstrap(
+        seasons=range(int(options.get("first", 1999)), int(options.get("last", 2019)) + 1),
+        replicates=int(options.get("replicates", cfg["replicates"])),
+        seed=int(options["seed"]) if "seed" in options else None,
+        workers=int(options["workers"]) if "workers" in options else None,
+        chunk=cfg["chunk"],
+        percentiles=cfg["percentiles"],
+        config=config,
+    )
+    out = Path("data_raw", "nfl_bootstrap.csv")
+    bands.to_csv(out, index=False)
+    print(f"{len(bands)} player metrics written to {out}")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# PURPOSE: Prediction diagnostics accumulated during the replay: every Elo update's pre-game win probability is scored (Brier score, log loss, reliability bins) per unit or position group, metric and season, in a fixed amount of memory per bucket.
+#
+# Usage (print a saved table, from the folder holding data_raw):
+#     python3 code_python/draft-gem/eloCalibration.py data_raw/nfl_calibration.csv
+import sys
+
+import numpy as np
+import pandas as pd
+
+import eloUtilities as eu
+
+# Probabilities are kept this far from 0 and 1 for the log loss
+EPSILON = 1e-15
+
+
+class Calibration:
+    """
+    Online scores of pre-game win probabilities.
+
+    A bucket per (source, metric, season) holds the number of predictions,
+    the Brier and log loss sums and, per probability bin, the number of
+    predictions, their probability sum and their wins. Sums are added one
+    value at a time in row order (`np.add.at`), so they don't depend on how
+    the rows are split into calls (a date at a time or a whole season).
+
+    Usage:
+        calibration = Calibration()
+        for season in seasons:
+            calibration.begin(season)
+            ...
+            calibration.add("rushers", "elo", prob, win)   # each update
+        calibration.summary()        # one row per bucket
+        calibration.reliability()    # one row per bucket and bin
+
+    Input
+    ----------
+        bins : integer
+            reliability bins over [0, 1]
+    """
+
+    def __init__(self, bins=10):
+        self.bins = bins
+        self.season = None
+        self.buckets = {}
+
+    def begin(self, season):
+        """
+        Score the following predictions under `season`
+        """
+        self.season = season
+
+    def _bucket(self, key):
+        if key not in self.buckets:
+            # sums: Brier, log loss, then each bin's probability sum;
+            # counts: predictions, then each bin's predictions and wins
+            self.buckets[key] = (
+                np.zeros(2 + self.bins, dtype=np.float64),
+                np.zeros(1 + 2 * self.bins, dtype=np.int64),
+            )
+        return self.buckets[key]
+
+    def add(self, source, metric, prob, win):
+        """
+        Score predictions
+
+        Input
+        ----------
+            source : string
+                position group or team unit (e.g., "rushers", "rushD")
+            metric : string
+                rating column (e.g., "elo", "eloYPC")
+            prob : array of floats
+                pre-game probabilities that the rated side wins
+            win : array of booleans
+                whether it won
+        """
+        prob = np.asarray(prob, dtype=np.float64)
+        n = len(prob)
+        if n == 0:
+            return
+        won = np.asarray(win, dtype=np.float64)
+        sums, counts = self._bucket((source, metric, self.season))
+        clipped = np.clip(prob, EPSILON, 1 - EPSILON)
+        loss = -(won * np.log(clipped) + (1 - won) * np.log1p(-clipped))
+        b = np.minimum((prob * self.bins).astype(np.int64), self.bins - 1)
+        np.add.at(
+            sums,
+            np.r_[np.zeros(n, dtype=np.int64), np.ones(n, dtype=np.int64), 2 + b],
+            np.r_[(won - prob) ** 2, loss, prob],
+        )
+        counts[0] += n
+        counts[1:1 + self.bins] += np.bincount(b, minlength=self.bins)
+        counts[1 + self.bins:] += np.bincount(b[won > 0], minlength=self.bins)
+
+    def merge(self, other):
+        """
+        Add another Calibration's buckets (e.g., team scores kept in a cache)
+        """
+        if other.bins != self.bins:
+            raise ValueError(f"Can't merge {other.bins} bins into {self.bins}")
+        for key, (sums, counts) in other.buckets.items():
+            mine, mineCounts = self._bucket(key)
+            mine += sums
+            mineCounts += counts
+
+    def summary(self):
+        """
+        One row per bucket: source, metric, season, count, brier, logLoss and
+        calibrationError (mean gap between each bin's probability and wins)
+        """
+        rows = []
+        for (source, metric, season), (sums, counts) in self.buckets.items():
+            n = counts[0]
+            gap = np.abs(sums[2:] - counts[1 + self.bins:]).sum()
+            rows.append(
+                {
+                    "source": source,
+                    "metric": metric,
+                    "season": season,
+                    "count": n,
+                    "brier": sums[0] / n,
+                    "logLoss": sums[1] / n,
+                    "calibrationError": gap / n,
+                }
+            )
+        columns = ["source", "metric", "season", "count", "brier", "logLoss", "calibrationError"]
+        return pd.DataFrame(rows, columns=columns)
+
+    def reliability(self):
+        """
+        One row per bucket and bin: the bin's bounds, predictions, mean
+        probability and share won
+        """
+        edges = np.linspace(0, 1, self.bins + 1)
+        frames = []
+        for (source, metric, season), (sums, counts) in self.buckets.items():
+            n = counts[1:1 + self.bins]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                frames.append(
+                    pd.DataFrame(
+                        {
+                            "source": source,
+                            "metric": metric,
+                            "season": season,
+                            "low": edges[:-1],
+                            "high": edges[1:],
+                            "count": n,
+                            "probability": sums[2:] / n,
+                            "wins": counts[1 + self.bins:] / n,
+                        }
+                    )
+                )
+        if not frames:
+            return pd.DataFrame(
+                columns=["source", "metric", "season", "low", "high", "count", "probability", "wins"]
+            )
+        return pd.concat(frames, ignore_index=True)
+
+    def scores(self):
+        """
+        Log loss of each source over all its metrics and seasons, as summary
+        entries ("logloss_<source>")
+        """
+        totals = {}
+        for (source, _, _), (sums, counts) in self.buckets.items():
+            total = totals.setdefault(source, [0.0, 0])
+            total[0] += float(sums[1])
+            total[1] += int(counts[0])
+        return {f"logloss_{s}": t / n if n else np.nan for s, (t, n) in totals.items()}
+
+
+def add_batches(calibration, source, metric, batches, win):
+    """
+    Score a date's team updates made in conflict batches (TeamTable.update),
+    in game order
+
+    Input
+    ----------
+        calibration : Calibration
+        source, metric : strings
+            defense unit and rating column
+        batches : list of (rows, (defense, offense)) pairs
+            each batch's game rows and pre-game ratings
+        win : array of booleans
+            the date's defense wins (all rows)
+    """
+    n = len(win)
+    defense = np.zeros(n, dtype=np.int64)
+    offense = np.zeros(n, dtype=np.int64)
+    for rows, (d, o) in batches:
+        defense[rows] = d
+        offense[rows] = o
+    calibration.add(source, metric, eu.probabilityBatch(offense, defense), win)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: eloCalibration.py <league>_calibration.csv")
+        exit()
+    table = pd.read_csv(sys.argv[1])
+    # Every season together, per source and metric
+    totals = table.assign(
+        brier=table["brier"] * table["count"],
+        logLoss=table["logLoss"] * table["count"],
+    ).groupby(["source", "metric"])[["count", "brier", "logLoss"]].sum()
+    totals["brier"] /= totals["count"]
+    totals["logLoss"] /= totals["count"]
+    print(totals.to_string())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# PURPOSE: Save and restore the full Elo state (team units and player histories) so a run can resume from the last processed date instead of replaying every season.
+import os
+import pickle
+from pathlib import Path
+
+
+# Bump when the layout of the saved state changes (older checkpoints are refused)
+CHECKPOINT_VERSION = 3
+
+
+def checkpoint_path(directory, league, season):
+    """
+    File holding a league's checkpoint for one season
+    """
+    return Path(directory, f"{league}_{season}.pkl")
+
+
+def save_checkpoint(directory, league, season, date, state, settings=None):
+    """
+    Write the state after `date` to the season's checkpoint file.
+
+    The file is written next to its destination and then renamed over it, so
+    an interrupted run never leaves a half-written checkpoint behind.
+
+    Input
+    ----------
+        directory : string or path
+            folder for checkpoint files (created if needed)
+        league : string
+            "cfb", "nfl" or "fantasy"
+        season : integer
+            season the date belongs to
+        date : integer
+            last processed game date (YYYYMMDD)
+        state : dictionary
+            name -> EloHistory (or anything picklable)
+        settings : string [optional]
+            hash of the settings the state depends on (eloReplayCache.config_hash)
+    Returns
+    ----------
+        path : path
+            the checkpoint file
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = checkpoint_path(directory, league, season)
+    temp = path.with_suffix(".tmp")
+    payload = {
+        "version": CHECKPOINT_VERSION,
+        "league": league,
+        "season": season,
+        "date": date,
+        "settings": settings,
+        "state": state,
+    }
+    with open(temp, "wb") as file:
+        pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+    return path
+
+
+def latest_checkpoint(directory, league):
+    """
+    Most recent checkpoint file of a league (None if there is none)
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return None
+    seasons = []
+    for path in directory.glob(f"{league}_*.pkl"):
+        season = path.stem[len(league) + 1 :]
+        if season.isdigit():
+            seasons.append(int(season))
+    if len(seasons) == 0:
+        return None
+    return checkpoint_path(directory, league, max(seasons))
+
+
+def load_checkpoint(path, league=None, settings=None):
+    """
+    Read a checkpoint written by `save_checkpoint`.
+
+    Input
+    ----------
+        path : string or path
+            checkpoint file
+        league : string [optional]
+            expected league (raises ValueError on a mismatch)
+        settings : string [optional]
+            expected settings hash (raises ValueError if the state was
+            computed with other settings)
+    Returns
+    ----------
+        checkpoint : dictionary
+            "season", "date" (last processed date) and "state"
+    """
+    with open(path, "rb") as file:
+        payload = pickle.load(file)
+    if payload.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"{path} is checkpoint version {payload.get('version')}, "
+            f"expected {CHECKPOINT_VERSION} (rerun the full replay)"
+        )
+    if league is not None and payload["league"] != league:
+        raise ValueError(f"{path} holds {payload['league']} state, not {league}")
+    if settings is not None and payload["settings"] != settings:
+        raise ValueError(
+            f"{path} was computed with other settings (elo_config.json, drawlines "
+            f"or initializer): rerun the full replay"
+        )
+    return payload
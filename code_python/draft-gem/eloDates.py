@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# PURPOSE: Array versions of the date and game code helpers in eloUtilities (away_and_home, get_game_code, get_start_date): YYYYMMDD integer arithmetic and numpy datetime64 over whole columns instead of one strptime or format call per row, with `check` comparing them to the scalar helpers.
+#
+# Usage:
+#     teamstats["Game Code"] = game_codes(teamstats["Loc"], teamstats["Team Code"], teamstats["Team Code opp"], teamstats["Date"])
+#     starts = start_dates(dates)  # the day before each YYYYMMDD date
+#
+# Check every helper against its eloUtilities counterpart:
+#     python3 code_python/draft-gem/eloDates.py
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# SECTION: Dates
+def to_datetime64(dates):
+    """
+    YYYYMMDD dates (integers or digit strings) as datetime64[D]
+
+    Raises ValueError on dates that don't exist (e.g., 20190230), as
+    `datetime.strptime(str(date), "%Y%m%d")` does.
+    """
+    dates = np.asarray(dates).astype(np.int64)
+    years, months, days = dates // 10000, dates // 100 % 100, dates % 100
+    valid = (months >= 1) & (months <= 12) & (days >= 1) & (days <= 31)
+    # Months since 1970-01, then days into the month
+    elapsed = (years - 1970) * 12 + np.where(valid, months - 1, 0)
+    out = elapsed.astype("datetime64[M]").astype("datetime64[D]") + np.where(valid, days - 1, 0)
+    # A day past the end of its month rolls into the next one
+    valid &= from_datetime64(out) == dates
+    if not valid.all():
+        raise ValueError(f"time data '{dates[~valid][0]}' does not match format '%Y%m%d'")
+    return out
+
+
+def from_datetime64(days):
+    """
+    datetime64 dates as YYYYMMDD integers
+    """
+    days = np.asarray(days).astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    elapsed = months.astype(np.int64)
+    years = elapsed // 12 + 1970
+    month = elapsed % 12 + 1
+    day = (days - months.astype("datetime64[D]")).astype(np.int64) + 1
+    return years * 10000 + month * 100 + day
+
+
+def start_dates(dates):
+    """
+    The day before each YYYYMMDD date (eloUtilities.get_start_date over an
+    array)
+    """
+    return from_datetime64(to_datetime64(dates) - 1)
+
+
+def day_numbers(dates):
+    """
+    Days since 1970-01-01 of YYYYMMDD dates (differences match
+    `date.toordinal()` differences)
+    """
+    return to_datetime64(dates).astype(np.int64)
+
+
+def last_dates(lists, default=19000101):
+    """
+    Last YYYYMMDD date of each list of dates as datetime64[D] (`default` for
+    empty or missing lists)
+    """
+    last = [x[-1] if isinstance(x, (list, tuple)) and len(x) > 0 else default for x in lists]
+    return to_datetime64(np.asarray(last, dtype=np.int64))
+
+
+# SECTION: Game codes
+def _padded(codes):
+    """
+    Team codes as strings zero-padded to 4 characters (f"{code:04}")
+    """
+    return pd.Series(np.asarray(codes)).astype(str).str.zfill(4).to_numpy(dtype=object)
+
+
+def away_and_home(loc, team_code, opp_team_code):
+    """
+    eloUtilities.away_and_home over arrays
+
+    Input
+    ----------
+        loc : array of strings
+            "@" when the team is away, "N" at a neutral site (the larger code
+            is then the away team), anything else (including missing) at home
+        team_code, opp_team_code : arrays of integers
+    Returns
+    ----------
+        codes : array of strings
+            away then home code, each padded to 4 digits
+    """
+    loc = pd.Series(np.asarray(loc, dtype=object))
+    team_code = np.asarray(team_code)
+    opp_team_code = np.asarray(opp_team_code)
+    away = ((loc == "@") | ((loc == "N") & (team_code > opp_team_code))).to_numpy()
+    team_f = _padded(team_code)
+    opp_f = _padded(opp_team_code)
+    return np.where(away, team_f, opp_f) + np.where(away, opp_f, team_f)
+
+
+def game_codes(loc, team_code, opp_team_code, date):
+    """
+    eloUtilities.get_game_code over arrays: away_and_home followed by the date
+    with any dashes removed
+
+    Returns
+    ----------
+        codes : array of strings
+    """
+    dates = pd.Series(np.asarray(date, dtype=object)).astype(str).str.replace("-", "", regex=False)
+    return away_and_home(loc, team_code, opp_team_code) + dates.to_numpy(dtype=object)
+
+
+# SECTION: Check
+def check(first=18991225, last=20310110, games=100000, seed=0):
+    """
+    Compare every helper with its scalar version in eloUtilities and raise if
+    any value differs
+
+    Input
+    ----------
+        first, last : integers
+            range of YYYYMMDD dates compared (every day in it)
+        games : integer
+            random loc/team code/date combinations compared
+        seed : integer
+    Returns
+    ----------
+        counts : dictionary
+            helper -> values compared
+    """
+    from datetime import datetime
+
+    import eloUtilities as eu
+
+    counts = {}
+    differ = []
+    # Every day of the range, as YYYYMMDD
+    days = np.arange(to_datetime64(first), to_datetime64(last) + 1)
+    dates = from_datetime64(days)
+    expected = [int(d.strftime("%Y%m%d")) for d in days.astype(object)]
+    if dates.tolist() != expected:
+        differ.append("from_datetime64")
+    if start_dates(dates).tolist() != [eu.get_start_date(d) for d in dates.tolist()]:
+        differ.append("start_dates")
+    if not np.array_equal(to_datetime64(dates.astype(str)), days):
+        differ.append("to_datetime64")
+    ordinals = np.array([datetime.strptime(str(d), "%Y%m%d").toordinal() for d in dates.tolist()])
+    if not np.array_equal(day_numbers(dates) - day_numbers(dates[:1]), ordinals - ordinals[0]):
+        differ.append("day_numbers")
+    counts.update(from_datetime64=len(dates), start_dates=len(dates), day_numbers=len(dates))
+
+    # Impossible dates are refused by both
+    for bad in (20190230, 20180229, 20191301, 20190100, 20190431, 2019010):
+        try:
+            to_datetime64([20190101, bad])
+        except ValueError:
+            continue
+        differ.append(f"to_datetime64({bad})")
+    counts["to_datetime64"] = len(dates) + 6
+
+    rng = np.random.default_rng(seed)
+    locs = np.array(["@", "N", "", np.nan, "H"], dtype=object)[rng.integers(0, 5, games)]
+    teams = rng.integers(-20, 12000, games)
+    # Some games between a team and itself (neutral-site ties)
+    opps = np.where(rng.random(games) < 0.05, teams, rng.integers(-20, 12000, games))
+    picks = rng.choice(dates, games)
+    dashed = [f"{d // 10000}-{d // 100 % 100:02}-{d % 100:02}" for d in picks.tolist()]
+    strings = np.where(rng.random(games) < 0.5, dashed, picks.astype(str)).tolist()
+    rows = list(zip(locs.tolist(), teams.tolist(), opps.tolist(), strings))
+    if away_and_home(locs, teams, opps).tolist() != [eu.away_and_home(l, t, o) for l, t, o, _ in rows]:
+        differ.append("away_and_home")
+    if game_codes(locs, teams, opps, strings).tolist() != [eu.get_game_code(*r) for r in rows]:
+        differ.append("game_codes")
+    counts.update(away_and_home=games, game_codes=games)
+
+    if differ:
+        raise AssertionError(f"Array and scalar date helpers differ: {differ}")
+    return counts
+
+
+if __name__ == "__main__":
+    options = dict(x.split("=", 1) for x in sys.argv[1:] if "=" in x)
+    counts = check(**{k: int(v) for k, v in options.items()})
+    print("Identical to the eloUtilities helpers: " + ", ".join(f"{k} ({v})" for k, v in counts.items()))
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+# PURPOSE: Shared engine for the per-position player Elo metrics declared in elo_config.json (computeElo -> <league> -> positions).
+import re
+from math import sqrt
+
+import numpy as np
+
+import eloUtilities as eu
+
+
+# Functions metric expressions may use (all work on whole columns)
+FUNCTIONS = {
+    "abs": np.abs,
+    "log": np.log,
+    "log10": np.log10,
+    "floor": np.floor,
+    "round": np.round,
+    "where": np.where,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "calcQBR": eu.calcQBR,
+}
+
+# How a stat beats its drawline
+WIN_OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+def compile_expression(expression):
+    """
+    Compile a metric expression. Statistics columns are written in backticks
+    (e.g., "`Rush Yard` + `Rec Yards`"), anything else is a function from
+    `FUNCTIONS` or a name given to `evaluate`.
+    """
+    source = re.sub(r"`([^`]*)`", lambda m: f"_col[{m.group(1)!r}]", expression)
+    return compile(source, expression, "eval")
+
+
+def evaluate(code, columns=None, **names):
+    """
+    Evaluate a compiled expression over numpy columns
+
+    Input
+    ----------
+        code : code object
+            from `compile_expression`
+        columns : dictionary [optional]
+            column name -> numpy array (the backtick names)
+        names : keyword arguments
+            other names used by the expression
+    Returns
+    ----------
+        values : np.ndarray
+    """
+    scope = dict(FUNCTIONS)
+    scope.update(names)
+    scope["_col"] = columns
+    # Guarded divisions (e.g., where(`Rec` > 0, `Rec Yards` / `Rec`, 0)) still
+    # compute the unused branch
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.asarray(eval(code, {"__builtins__": {}}, scope))
+
+
+def spec_columns(spec):
+    """
+    Statistics columns (the backtick names) a position group spec reads: its
+    metric stats, fields and error actuals, in order of first use
+    """
+    expressions = [m["stat"] for m in spec["metrics"]]
+    expressions += list(spec.get("fields", {}).values())
+    expressions += [e["actual"] for e in spec.get("errors", [])]
+    names = [c for expression in expressions for c in re.findall(r"`([^`]*)`", expression)]
+    return list(dict.fromkeys(names))
+
+
+def resolve(value, params):
+    """
+    A spec value is either a number or the name of a parameter (drawline,
+    factor, ...) in `params`
+    """
+    if isinstance(value, str):
+        return params[value]
+    return value
+
+
+class Metric:
+    """
+    One Elo metric of a position group, e.g. a running back's yards per game.
+
+    Spec keys (see elo_config.json):
+        elo         history column holding the metric's Elo
+        stat        expression for the game statistic
+        drawline    number or parameter name; the stat to beat
+        factor      [optional] ptdiff = abs(stat - drawline) * factor
+        divisor     [optional] ptdiff = abs(stat - drawline) / divisor
+        win         comparison of stat to drawline that counts as a win
+        opponent    team unit the player is rated against (e.g., "rushD")
+        opponentElo [optional] unit column to use (default "elo")
+        last        [optional] record key holding the latest Elo
+        wins/losses [optional] record keys counting wins and losses
+        predict     [optional] {"column", "formula", "min"} prediction made
+                    from the drawline and eDiff (player minus opponent Elo)
+                    before the update
+    """
+
+    def __init__(self, spec, params):
+        self.elo = spec["elo"]
+        self.stat = compile_expression(spec["stat"])
+        self.drawline = resolve(spec["drawline"], params)
+        self.factor = resolve(spec.get("factor"), params)
+        self.divisor = resolve(spec.get("divisor"), params)
+        self.win = WIN_OPERATORS[spec["win"]]
+        self.opponent = (spec["opponent"], spec.get("opponentElo", "elo"))
+        self.last = spec.get("last")
+        self.counters = (spec["wins"], spec["losses"]) if "wins" in spec else None
+
+        self.predict = spec.get("predict")
+        if self.predict is not None:
+            self.predict_column = self.predict["column"]
+            self.predict_formula = compile_expression(self.predict["formula"])
+            self.predict_min = self.predict.get("min")
+
+    def outcomes(self, columns, params):
+        """
+        Point differential and win of every row of a frame
+        """
+        n = len(next(iter(columns.values())))
+        stat = np.broadcast_to(evaluate(self.stat, columns, **params), (n,))
+        ptdiff = np.abs(stat - self.drawline)
+        if self.factor is not None:
+            ptdiff = ptdiff * self.factor
+        if self.divisor is not None:
+            ptdiff = ptdiff / self.divisor
+        return ptdiff, self.win(stat, self.drawline)
+
+    def prediction(self, mine, theirs):
+        """
+        Predicted stat from the current Elos (before this game's update)
+        """
+        pred = evaluate(self.predict_formula, drawline=self.drawline, eDiff=mine - theirs)
+        if self.predict_min is not None:
+            pred = np.maximum(pred, self.predict_min)
+        return pred
+
+
+class PositionGroup:
+    """
+    Runs every metric of one position group (RBs, WRs, QBs, ...) for a date's
+    players at once.
+
+    The statistics, point differentials and wins only depend on the box score,
+    so they are computed for the whole season as columns in `load`. `run` then
+    reads the players' current Elos and their opponents' team unit Elos as
+    arrays and updates all metrics with `eu.updateEloBatch`, which gives the
+    same numbers as updating player by player. A player listed twice on one
+    date is handled in a second pass so the later row sees the earlier update.
+
+    Usage (one group per history, through `build_groups`):
+        units = {"rushD": rushD, "rushO": rushO, "passD": passD, "passO": passO}
+        params = {"rushPdrawline": 83.5, "yardFactor": 1, ...}  # names the specs use
+        groups = build_groups(cfg["positions"], {"rushers": rushers}, units, params,
+                              playerK, blowoutFactor, demos, calibration)
+        groups["rushers"].load(rbgames)     # once per season (GameIndex)
+        groups["rushers"].run(date)         # once per date, before the team updates
+
+    Input
+    ----------
+        spec : dictionary
+            position group spec: "metrics" (list of `Metric` specs) and
+            optionally "composite" ({"column", "last", "formula"} over the
+            metric Elos), "fields" (history column -> stat expression copied
+            from the box score), "derived" (history column -> formula over the
+            game's values, e.g. fantasy points) and "errors" (list of
+            {"pred", "actual", "minLength"} tracked for `rmse`)
+        history : EloHistory
+            the players' histories
+        units : dictionary
+            unit name -> team unit EloHistory
+        params : dictionary
+            values of the drawline/factor names used in `spec`
+        K : number
+            player K-factor
+        blowoutFactor : boolean
+            whether to scale wins by ptdiff
+        demos : list
+            demographic columns copied onto new players
+        id_name : string
+            player id column
+        opp_name : string
+            opponent team code column
+        name : string [optional]
+            group name the predictions are scored under
+        calibration : Calibration [optional]
+            collects the pre-game win probabilities (see eloCalibration.py)
+    """
+
+    def __init__(
+        self,
+        spec,
+        history,
+        units,
+        params,
+        K,
+        blowoutFactor=True,
+        demos=(),
+        id_name="unique_id",
+        opp_name="Team Code opp",
+        name=None,
+        calibration=None,
+    ):
+        self.history = history
+        self.name = name
+        self.calibration = calibration
+        self.units = units
+        self.params = params
+        self.K = K
+        self.blowoutFactor = blowoutFactor
+        self.demos = list(demos)
+        self.id_name = id_name
+        self.opp_name = opp_name
+
+        self.metrics = [Metric(m, params) for m in spec["metrics"]]
+        composite = spec.get("composite")
+        self.composite = None
+        if composite is not None:
+            self.composite = (
+                composite["column"],
+                composite.get("last"),
+                compile_expression(composite["formula"]),
+            )
+        self.fields = {k: compile_expression(v) for k, v in spec.get("fields", {}).items()}
+        self.derived = {k: compile_expression(v) for k, v in spec.get("derived", {}).items()}
+        self.errors = [
+            {
+                "pred": e["pred"],
+                "actual": compile_expression(e["actual"]),
+                "minLength": e.get("minLength", 0),
+                "sqError": 0,
+                "count": 0,
+            }
+            for e in spec.get("errors", [])
+        ]
+
+        # Every record key the spec writes must already be in the defaults
+        keys = [m.last for m in self.metrics if m.last is not None]
+        keys += [c for m in self.metrics if m.counters is not None for c in m.counters]
+        if self.composite is not None and self.composite[1] is not None:
+            keys.append(self.composite[1])
+        missing = [k for k in keys if k not in history.scalars]
+        if missing:
+            raise KeyError(f"Not in the default dictionary: {missing}")
+        self.counted = "count" in history.scalars
+        self.games = None
+
+        # Squared errors of the pre-game win probabilities (Brier score)
+        self.scores = {m.elo: [0.0, 0] for m in self.metrics}
+
+    def load(self, games):
+        """
+        Compute every row's stats, ptdiffs and wins for a (season's) GameIndex
+        """
+        self.games = games
+        columns = {c: games.frame[c].to_numpy() for c in games.names}
+        n = len(games.frame)
+        self._ids = columns[self.id_name]
+        self._opps = columns[self.opp_name]
+        self._demos = {d: columns[d] for d in self.demos}
+        self._outcomes = [m.outcomes(columns, self.params) for m in self.metrics]
+        self._fields = {
+            k: np.broadcast_to(evaluate(code, columns, **self.params), (n,))
+            for k, code in self.fields.items()
+        }
+        self._actuals = [
+            np.broadcast_to(evaluate(e["actual"], columns, **self.params), (n,))
+            for e in self.errors
+        ]
+
+    def run(self, date, **constants):
+        """
+        Update the group's players for one date
+
+        Input
+        ----------
+            date : integer
+                game date (YYYYMMDD)
+            constants : keyword arguments
+                history columns with one value for the date (e.g., season)
+        """
+        start, end = self.games.span(date)
+        if start == end:
+            return
+        idx = self.register(slice(start, end))
+
+        # Team units don't change until the team updates, so read them once
+        opps = self._opps[start:end].tolist()
+        opponents = {}
+        for m in self.metrics:
+            if m.opponent not in opponents:
+                unit = self.units[m.opponent[0]]
+                opponents[m.opponent] = unit.lasts(unit.locate(opps), m.opponent[1])
+
+        # One pass per repeat of a player on this date (almost always one)
+        occurrence = np.zeros(len(idx), dtype=np.int64)
+        if len(np.unique(idx)) < len(idx):
+            seen = {}
+            for i, j in enumerate(idx.tolist()):
+                occurrence[i] = seen.get(j, 0)
+                seen[j] = occurrence[i] + 1
+        errors = [[] for _ in self.errors]
+        for n in range(occurrence.max() + 1):
+            rows = np.flatnonzero(occurrence == n)
+            self._update(date, idx[rows], rows, start + rows, opponents, constants, errors)
+
+        # Prediction errors, summed in row order (as the per-player loop did)
+        for e, parts in zip(self.errors, errors):
+            rows = np.concatenate([r for r, _ in parts])
+            error = np.concatenate([x for _, x in parts])[np.argsort(rows, kind="stable")]
+            for x in error.tolist():
+                e["sqError"] = e["sqError"] + (x ** 2)
+            e["count"] += len(error)
+
+    def register(self, rows):
+        """
+        Add the players of frame rows `rows` not seen before (in the order
+        they appear) and return the rows' player indices
+        """
+        history = self.history
+        keys = self._ids[rows]
+        new = np.flatnonzero(~history.contains(keys))
+        if len(new) > 0:
+            demos = {d: v[rows][new].tolist() for d, v in self._demos.items()}
+            for i, key in enumerate(keys[new].tolist()):
+                if key not in history:
+                    record = history.add(key)
+                    for demo in self.demos:
+                        record[demo] = demos[demo][i]
+        return history.locate(keys)
+
+    def commit(self, rows, idx, dates, mine, theirs, new, **constants):
+        """
+        Record Elo updates made elsewhere (eloKernel's compiled replay) for
+        frame rows spanning several dates. History rows, records, scores and
+        errors come out the same as from calling `run` date by date.
+
+        Input
+        ----------
+            rows : array of integers
+                frame rows, in date order (as `run` visits them)
+            idx : array of integers
+                the rows' player indices (from `register`)
+            dates : array of integers
+                the rows' game dates
+            mine, theirs, new : lists of arrays
+                for each metric, the player's and the opponent's Elo before
+                the game and the player's Elo after it
+            constants : keyword arguments
+                history columns with one value for all the rows (e.g., season)
+        """
+        if len(rows) == 0:
+            return
+        history = self.history
+        length = history.counts(idx) + _earlier(idx)
+        # Brier scores were summed per date and pass (repeat of a player)
+        occurrence = _earlier(dates, idx)
+        bounds = np.flatnonzero(np.diff(dates)) + 1
+        segments = list(zip(np.r_[0, bounds].tolist(), np.r_[bounds, len(rows)].tolist()))
+
+        values = {}
+        for m, (ptdiff, win), a, b, c in zip(self.metrics, self._outcomes, mine, theirs, new):
+            if m.predict is not None:
+                values[m.predict_column] = m.prediction(a, b)
+            score = self.scores[m.elo]
+            prob = eu.probabilityBatch(b, a)
+            squares = (win[rows] - prob) ** 2
+            for start, end in segments:
+                passes = occurrence[start:end]
+                if not passes.any():
+                    score[0] += float(squares[start:end].sum())
+                    continue
+                for n in range(passes.max() + 1):
+                    score[0] += float(squares[start:end][passes == n].sum())
+            score[1] += len(rows)
+            if self.calibration is not None:
+                # Row order within a date: each pass in turn, as `run` scores them
+                order = np.lexsort((occurrence, dates))
+                self.calibration.add(self.name, m.elo, prob[order], win[rows][order])
+            values[m.elo] = c
+        if self.composite is not None:
+            column, _, formula = self.composite
+            values[column] = evaluate(formula, **values).astype(np.int64)
+        for k, v in self._fields.items():
+            values[k] = v[rows]
+        for k, formula in self.derived.items():
+            values[k] = evaluate(formula, **values)
+        values.update(constants)
+        values["date"] = dates
+        history.extend(idx, **values)
+
+        # Per-player scalars: latest values and win/loss counts
+        players, inverse, games = np.unique(idx, return_inverse=True, return_counts=True)
+        last = np.zeros(len(players), dtype=np.int64)
+        np.maximum.at(last, inverse, np.arange(len(rows)))
+        updates = [(m.last, values[m.elo][last].tolist()) for m in self.metrics if m.last]
+        if self.composite is not None and self.composite[1] is not None:
+            updates.append((self.composite[1], values[self.composite[0]][last].tolist()))
+        counters = [
+            (m.counters, np.bincount(inverse, win[rows], len(players)).astype(np.int64).tolist())
+            for m, (_, win) in zip(self.metrics, self._outcomes)
+            if m.counters is not None
+        ]
+        games = games.tolist()
+        for i, key in enumerate(self._ids[rows][last].tolist()):
+            record = history[key]
+            for name, latest in updates:
+                record[name] = latest[i]
+            for (wins, losses), won in counters:
+                record[wins] += won[i]
+                record[losses] += games[i] - won[i]
+            if self.counted:
+                record["count"] += games[i]
+
+        # Prediction errors, summed in row order
+        for e, actual in zip(self.errors, self._actuals):
+            keep = length >= e["minLength"]
+            error = values[e["pred"]][keep] - actual[rows][keep]
+            for x in error.tolist():
+                e["sqError"] = e["sqError"] + (x ** 2)
+            e["count"] += len(error)
+
+    def _update(self, date, idx, local, rows, opponents, constants, errors):
+        """
+        Update players `idx` (all different) from frame rows `rows` (`local`
+        within the date), collecting prediction errors into `errors`
+        """
+        history = self.history
+        length = history.counts(idx)
+
+        values = {}
+        for m, (ptdiff, win) in zip(self.metrics, self._outcomes):
+            mine = history.lasts(idx, m.elo)
+            theirs = opponents[m.opponent][local]
+            if m.predict is not None:
+                values[m.predict_column] = m.prediction(mine, theirs)
+            score = self.scores[m.elo]
+            prob = eu.probabilityBatch(theirs, mine)
+            score[0] += float(((win[rows] - prob) ** 2).sum())
+            score[1] += len(rows)
+            if self.calibration is not None:
+                self.calibration.add(self.name, m.elo, prob, win[rows])
+            values[m.elo] = eu.updateEloBatch(
+                mine, theirs, ptdiff[rows], win[rows], self.blowoutFactor, self.K
+            )
+        if self.composite is not None:
+            column, _, formula = self.composite
+            values[column] = evaluate(formula, **values).astype(np.int64)
+        for k, v in self._fields.items():
+            values[k] = v[rows]
+        for k, formula in self.derived.items():
+            values[k] = evaluate(formula, **values)
+        values.update(constants)
+        values["date"] = date
+        history.extend(idx, **values)
+
+        # Per-player scalars: latest values and win/loss counts
+        updates = [(m.last, values[m.elo].tolist()) for m in self.metrics if m.last]
+        if self.composite is not None and self.composite[1] is not None:
+            updates.append((self.composite[1], values[self.composite[0]].tolist()))
+        counters = [
+            (m.counters, win[rows].tolist())
+            for m, (_, win) in zip(self.metrics, self._outcomes)
+            if m.counters is not None
+        ]
+        for i, key in enumerate(self._ids[rows].tolist()):
+            record = history[key]
+            for name, latest in updates:
+                record[name] = latest[i]
+            for (wins, losses), won in counters:
+                record[wins if won[i] else losses] += 1
+            if self.counted:
+                record["count"] += 1
+
+        # Prediction errors
+        for e, actual, parts in zip(self.errors, self._actuals, errors):
+            keep = length >= e["minLength"]
+            parts.append((local[keep], values[e["pred"]][keep] - actual[rows][keep]))
+
+    def rmse(self):
+        """
+        Root mean squared error of each tracked prediction (in spec order)
+        """
+        return [sqrt(e["sqError"] / e["count"]) for e in self.errors]
+
+    def brier(self, elo=None):
+        """
+        Brier score of the pre-game win probabilities of one metric (by Elo
+        column), or of all the group's metrics together
+        """
+        scores = [self.scores[elo]] if elo is not None else self.scores.values()
+        total = sum(s[0] for s in scores)
+        count = sum(s[1] for s in scores)
+        return total / count if count else float("nan")
+
+
+def _earlier(*keys):
+    """
+    Number of earlier rows with the same keys, for each row
+    """
+    order = np.lexsort(keys[::-1])
+    ordered = np.stack([k[order] for k in keys])
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (ordered[:, 1:] != ordered[:, :-1]).any(axis=0)
+    starts = np.flatnonzero(first)
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    earlier = np.empty(len(order), dtype=np.int64)
+    earlier[order] = rank
+    return earlier
+
+
+def build_groups(
+    positions, histories, units, params, K, blowoutFactor=True, demos=(), calibration=None
+):
+    """
+    One PositionGroup per history, using the spec of the same name
+
+    Input
+    ----------
+        positions : dictionary
+            group name -> spec (elo_config.json computeElo -> <league> -> positions)
+        histories : dictionary
+            group name -> players' EloHistory (only the groups to process)
+        calibration : Calibration [optional]
+            collects every group's predictions under its name
+    Returns
+    ----------
+        groups : dictionary
+            group name -> PositionGroup
+    """
+    return {
+        name: PositionGroup(
+            positions[name], history, units, params, K, blowoutFactor, demos,
+            name=name, calibration=calibration,
+        )
+        for name, history in histories.items()
+    }
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# PURPOSE: Replay many parameter variants (K-factors, drawlines, factors) at once: every current rating carries an ensemble axis, so N variants share one pass over the dates instead of N separate replays.
+import numpy as np
+import pandas as pd
+
+import eloUtilities as eu
+from eloEngine import Metric, _earlier, evaluate, resolve
+from eloTeamTable import conflict_batches
+
+
+# SECTION: Team units
+class EnsembleTable:
+    """
+    Current team unit ratings of every variant: one (teams x variants) array
+    per unit and column, indexed by Team Code like `TeamTable`.
+
+    Input
+    ----------
+        units : dictionary
+            unit name -> EloHistory keyed by Team Code (the starting ratings,
+            the same for every variant, e.g. the baselines)
+        initial : array of integers
+            each variant's rating of a team added later (initialTeamElo)
+        columns : list of strings
+            rating columns
+    """
+
+    def __init__(self, units, initial, columns=("elo",)):
+        self.initial = np.asarray(initial, dtype=np.int64)
+        n = len(self.initial)
+        keys = [np.asarray(unit.keys, dtype=np.int64) for unit in units.values()]
+        size = max([k.max() + 1 for k in keys if len(k) > 0], default=0)
+        self.ratings = {}
+        self.known = {}
+        for (name, unit), codes in zip(units.items(), keys):
+            self.known[name] = np.zeros(size, dtype=bool)
+            self.known[name][codes] = True
+            for c in columns:
+                values = np.zeros((size, n), dtype=np.int64)
+                if len(codes) > 0:
+                    values[codes] = unit.lasts(unit.locate(unit.keys), c)[:, None]
+                self.ratings[(name, c)] = values
+
+    def add(self, codes):
+        """
+        Register the teams in `codes` the units don't have yet (at each
+        variant's initial rating)
+        """
+        codes = np.fromiter(codes, dtype=np.int64)
+        if len(codes) == 0:
+            return
+        size = len(next(iter(self.known.values())))
+        if codes.max() >= size:
+            grow = codes.max() + 1 - size
+            for name, known in self.known.items():
+                self.known[name] = np.r_[known, np.zeros(grow, dtype=bool)]
+            for pair, values in self.ratings.items():
+                self.ratings[pair] = np.vstack(
+                    [values, np.zeros((grow, values.shape[1]), dtype=np.int64)]
+                )
+        for (name, c), values in self.ratings.items():
+            new = codes[~self.known[name][codes]]
+            values[new] = self.initial
+        for name, known in self.known.items():
+            known[codes] = True
+
+    def get(self, pair, codes):
+        """
+        Every variant's current ratings of teams `codes` (KeyError for a
+        team the unit doesn't have, like the history lookups)
+        """
+        known = self.known[pair[0]]
+        unknown = (codes < 0) | (codes >= len(known))
+        unknown[~unknown] = ~known[codes[~unknown]]
+        if unknown.any():
+            raise KeyError(codes[unknown][0].item())
+        return self.ratings[pair][codes]
+
+
+# SECTION: Position groups
+class EnsembleMetric:
+    """
+    A `Metric` with one drawline/factor/divisor per variant (as rows, so
+    they broadcast against a date's rows x variants)
+    """
+
+    def __init__(self, spec, variants):
+        metrics = [Metric(spec, params) for params in variants]
+        first = metrics[0]
+        self.elo = first.elo
+        self.stat = first.stat
+        self.win = first.win
+        self.opponent = first.opponent
+
+        def column(values):
+            return None if values[0] is None else np.array(values).reshape(1, -1)
+
+        self.drawline = column([m.drawline for m in metrics])
+        self.factor = column([m.factor for m in metrics])
+        self.divisor = column([m.divisor for m in metrics])
+        # Parameters of the stat expression that differ between variants
+        self.varying = [
+            name
+            for name in first.stat.co_names
+            if name in variants[0] and any(p[name] != variants[0][name] for p in variants)
+        ]
+
+    def stats(self, columns, variants):
+        """
+        The stat of every row of a frame: (rows x 1), or (rows x variants) if
+        the expression uses a parameter that differs between variants
+        """
+        n = len(next(iter(columns.values())))
+        if not self.varying:
+            return np.broadcast_to(evaluate(self.stat, columns, **variants[0]), (n,))[:, None]
+        return np.stack(
+            [np.broadcast_to(evaluate(self.stat, columns, **p), (n,)) for p in variants], axis=1
+        )
+
+    def outcomes(self, stat):
+        """
+        Point differentials and wins (rows x variants), as `Metric.outcomes`
+        """
+        ptdiff = np.abs(stat - self.drawline)
+        if self.factor is not None:
+            ptdiff = ptdiff * self.factor
+        if self.divisor is not None:
+            ptdiff = ptdiff / self.divisor
+        return ptdiff, self.win(stat, self.drawline)
+
+
+class EnsembleGroup:
+    """
+    The metric Elos of one position group for every variant, as (players x
+    variants) arrays indexed by player ID. Updates, passes for repeated players
+    and Brier scores follow `PositionGroup.run`; no histories are kept.
+
+    Input
+    ----------
+        spec : dictionary
+            position group spec (elo_config.json computeElo -> <league> -> positions)
+        variants : list of dictionaries
+            each variant's drawlines and factors by name
+        K : array of numbers
+            each variant's player K-factor
+        initial : array of integers
+            each variant's starting player Elo
+        blowoutFactor : boolean
+            whether to scale wins by ptdiff
+        id_name : string
+            player id column (dense integer IDs, see eloPlayerIds)
+        opp_name : string
+            opponent team code column
+    """
+
+    def __init__(
+        self, spec, variants, K, initial, blowoutFactor=True,
+        id_name="unique_id", opp_name="Team Code opp",
+    ):
+        self.variants = variants
+        self.K = np.asarray(K).reshape(1, -1)
+        self.initial = np.asarray(initial, dtype=np.int64).reshape(1, -1)
+        self.blowoutFactor = blowoutFactor
+        self.id_name = id_name
+        self.opp_name = opp_name
+        self.metrics = [EnsembleMetric(m, variants) for m in spec["metrics"]]
+
+        # Row j holds player ID j - 1 (so a missing ID, -1, has one too)
+        n = len(variants)
+        self.seen = np.zeros(0, dtype=bool)
+        self.elos = {m.elo: np.zeros((0, n), dtype=np.int64) for m in self.metrics}
+        self.scores = {m.elo: [np.zeros(n), 0] for m in self.metrics}
+        self.games = None
+
+    def load(self, games, draws=None):
+        """
+        A (season's) GameIndex of the group's rows
+
+        Input
+        ----------
+            games : GameIndex
+            draws : array of integers [optional]
+                (rows x variants) row whose stats each variant uses in place
+                of each row's own (e.g., bootstrap resamples, see
+                eloBootstrap.py); dates, players and opponents stay the same
+        """
+        self.games = games
+        columns = {c: games.frame[c].to_numpy() for c in games.names}
+        self._ids = np.asarray(columns[self.id_name], dtype=np.int64) + 1
+        self._opps = np.asarray(columns[self.opp_name], dtype=np.int64)
+        self._stats = [m.stats(columns, self.variants) for m in self.metrics]
+        if draws is not None:
+            self._stats = [
+                np.take_along_axis(np.broadcast_to(stat, draws.shape), draws, axis=0)
+                for stat in self._stats
+            ]
+        if len(self._ids) > 0 and self._ids.max() >= len(self.seen):
+            grow = self._ids.max() + 1 - len(self.seen)
+            self.seen = np.r_[self.seen, np.zeros(grow, dtype=bool)]
+            for elo, values in self.elos.items():
+                start = np.repeat(self.initial, grow, axis=0)
+                self.elos[elo] = np.vstack([values, start])
+
+    def run(self, date, teams):
+        """
+        Update the group's players for one date (before the team updates)
+
+        Input
+        ----------
+            date : integer
+                game date (YYYYMMDD)
+            teams : EnsembleTable
+                current team unit ratings
+        """
+        start, end = self.games.span(date)
+        if start == end:
+            return
+        idx = self._ids[start:end]
+        self.seen[idx] = True
+        opponents = {}
+        for m in self.metrics:
+            if m.opponent not in opponents:
+                opponents[m.opponent] = teams.get(m.opponent, self._opps[start:end])
+
+        occurrence = _earlier(idx)
+        for n in range(occurrence.max() + 1):
+            local = np.flatnonzero(occurrence == n)
+            rows = start + local
+            for m, stat in zip(self.metrics, self._stats):
+                elos = self.elos[m.elo]
+                mine = elos[idx[local]]
+                theirs = opponents[m.opponent][local]
+                ptdiff, win = m.outcomes(stat[rows])
+                ptdiff, win = np.broadcast_to(ptdiff, mine.shape), np.broadcast_to(win, mine.shape)
+                # Summed per variant over a contiguous row, as `run` sums its 1-D array
+                squares = (win - eu.probabilityBatch(theirs, mine)) ** 2
+                score = self.scores[m.elo]
+                score[0] += np.ascontiguousarray(squares.T).sum(axis=1)
+                score[1] += len(rows)
+                elos[idx[local]] = eu.updateEloBatch(
+                    mine, theirs, ptdiff, win, self.blowoutFactor, self.K
+                )
+
+    def brier(self):
+        """
+        Each variant's Brier score over all the group's metrics (as `PositionGroup.brier`)
+        """
+        total = sum(s[0] for s in self.scores.values())
+        count = sum(s[1] for s in self.scores.values())
+        return total / count if count else np.full(len(self.variants), np.nan)
+
+    def players(self):
+        """
+        Number of players seen
+        """
+        return int(self.seen.sum())
+
+    def to_frame(self, id_name="unique_id", ids=None):
+        """
+        Current Elos of every player seen, one row per player and variant
+
+        Input
+        ----------
+            id_name : string
+                name of the player column
+            ids : PlayerIds [optional]
+                registry to turn the player IDs back into strings
+        """
+        players = np.flatnonzero(self.seen)
+        keys = players - 1
+        n = len(self.variants)
+        frame = {
+            "variant": np.repeat(np.arange(n), len(players)),
+            id_name: np.tile(keys if ids is None else ids.decode(keys), n),
+        }
+        for elo, values in self.elos.items():
+            frame[elo] = values[players].T.ravel()
+        return pd.DataFrame(frame)
+
+
+# SECTION: Driver
+class EnsembleReplay:
+    """
+    Replays position groups and team units for N parameter variants together.
+
+    Which players and teams play on which dates doesn't depend on the
+    parameters, so a date's rows are read once and every rating array has a
+    trailing variant axis: (rows x variants) updates through
+    `eu.updateEloBatch` cost about the same as one variant's. Each variant
+    gets the ratings and Brier scores a separate run with its parameters
+    gets (team Brier scores use the scalar `eu.probability`, like the team
+    loop).
+
+    Usage:
+        replay = EnsembleReplay(positions, units, teamMetrics, variants)
+        for season in seasons:
+            replay.load(teamgames, {"rushers": rbgames, ...})
+            for date in dates:
+                replay.add(teams_to_check)
+                replay.run(date)
+        summaries = replay.summaries()
+
+    Input
+    ----------
+        positions : dictionary
+            group name -> spec (the groups to replay)
+        units : dictionary
+            unit name -> starting team unit EloHistory (e.g., the baselines)
+        teamMetrics : list of dictionaries
+            team updates, as `eloKernel.SeasonReplay` metrics, with
+            "drawline" and "divisor" numbers or parameter names
+        variants : list of dictionaries
+            each variant's full set of parameters (drawlines, factors,
+            playerK, teamK, initialPlayerElo, initialTeamElo)
+        blowoutFactor : boolean
+            whether to scale wins by ptdiff
+    """
+
+    def __init__(self, positions, units, teamMetrics, variants, blowoutFactor=True):
+        self.variants = list(variants)
+        if len(self.variants) == 0:
+            raise ValueError("An ensemble needs at least one variant")
+
+        def values(name):
+            return np.array([p[name] for p in self.variants])
+
+        self.teamK = values("teamK").reshape(1, -1)
+        self.blowoutFactor = blowoutFactor
+        self.teams = EnsembleTable(units, values("initialTeamElo"))
+        self.groups = {
+            name: EnsembleGroup(
+                spec, self.variants, values("playerK"), values("initialPlayerElo"), blowoutFactor
+            )
+            for name, spec in positions.items()
+        }
+        self.teamMetrics = []
+        for m in teamMetrics:
+            m = dict(m)
+            for key in ("drawline", "divisor"):
+                m[key] = np.array([resolve(m[key], p) for p in self.variants]).reshape(1, -1)
+            self.teamMetrics.append(m)
+        self.teamScores = {
+            m["score"]: [[0.0] * len(self.variants), 0] for m in self.teamMetrics if "score" in m
+        }
+        self.teamgames = None
+
+    def load(self, teamgames, playergames, draws=None):
+        """
+        A season's team games and each group's player games (GameIndex), and
+        optionally each group's resampled rows (see `EnsembleGroup.load`)
+        """
+        self.teamgames = teamgames
+        draws = draws or {}
+        for name, group in self.groups.items():
+            group.load(playergames[name], draws.get(name))
+
+    def add(self, codes):
+        """
+        Register teams (every date, before `run`)
+        """
+        self.teams.add(codes)
+
+    def run(self, date):
+        """
+        Replay one date: players first, then the team games
+        """
+        for group in self.groups.values():
+            group.run(date, self.teams)
+
+        names = ["Team Code", "Team Code opp"] + [m["stat"] for m in self.teamMetrics]
+        games = self.teamgames.arrays(date, names)
+        us = np.asarray(games["Team Code"], dtype=np.int64)
+        them = np.asarray(games["Team Code opp"], dtype=np.int64)
+        outcomes = []
+        for m in self.teamMetrics:
+            stat = games[m["stat"]][:, None]
+            outcomes.append(
+                (np.abs(stat - m["drawline"]) / m["divisor"], stat < m["drawline"])
+            )
+        brier = [np.zeros((len(self.variants), len(us))) for _ in self.teamMetrics]
+        for rows in conflict_batches(us, them):
+            for m, (ptdiff, win), scores in zip(self.teamMetrics, outcomes, brier):
+                column = m["column"]
+                my = self.teams.get((m["defense"], column), us[rows])
+                opp = self.teams.get((m["offense"], column), them[rows])
+                won = np.broadcast_to(win[rows], my.shape)
+                if "score" in m:
+                    # Scalar probabilities, as the team loop adds them
+                    for v, (w, o, d) in enumerate(zip(won.T.tolist(), opp.T.tolist(), my.T.tolist())):
+                        scores[v, rows] = [
+                            (wv - eu.probability(ov, dv)) ** 2 for wv, ov, dv in zip(w, o, d)
+                        ]
+                myNew, oppNew = eu.updateEloBatch(
+                    my, opp, np.broadcast_to(ptdiff[rows], my.shape), won,
+                    self.blowoutFactor, self.teamK, both=True,
+                )
+                self.teams.ratings[(m["defense"], column)][us[rows]] = myNew
+                self.teams.ratings[(m["offense"], column)][them[rows]] = oppNew
+
+        # Prediction scores, added in game order
+        for m, scores in zip(self.teamMetrics, brier):
+            if "score" not in m:
+                continue
+            total = self.teamScores[m["score"]]
+            for v, row in enumerate(scores.tolist()):
+                for x in row:
+                    total[0][v] += x
+            total[1] += len(us)
+
+    def summaries(self):
+        """
+        Each variant's summary metrics, as EloWithDrawlines fills `summary`
+        (team unit and player Brier scores, number of players)
+        """
+        rows = [{} for _ in self.variants]
+        for name, (totals, count) in self.teamScores.items():
+            for row, total in zip(rows, totals):
+                row[f"brier_{name}"] = total / count if count else np.nan
+        for name, group in self.groups.items():
+            scores = group.brier().tolist()
+            for row, score in zip(rows, scores):
+                row[f"brier_{name}"] = score
+                row[f"players_{name}"] = group.players()
+        return rows
+
+    def team_frame(self):
+        """
+        Current team unit ratings of every variant, one row per team and variant
+        """
+        frames = []
+        for (unit, column), values in self.teams.ratings.items():
+            codes = np.flatnonzero(self.teams.known[unit])
+            n = len(self.variants)
+            frames.append(pd.DataFrame({
+                "unit": unit,
+                "variant": np.repeat(np.arange(n), len(codes)),
+                "Team Code": np.tile(codes, n),
+                column: values[codes].T.ravel(),
+            }))
+        return pd.concat(frames, ignore_index=True)
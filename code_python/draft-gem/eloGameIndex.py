@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# PURPOSE: Per-date index over a season's (or several seasons') game rows, so the compute loops grab a date's games without re-scanning the whole frame.
+import numpy as np
+
+
+class GameIndex:
+    """
+    Date-partitioned view of a game/player statistics frame.
+
+    The frame is stably sorted on the date column once (rows keep their
+    original order within a date) and an offset table is kept for each
+    distinct date, so a date's rows are a contiguous slice of every column.
+    This replaces `frame[frame["gamedate"] == date]`, which scans all rows
+    for every date.
+
+    Usage:
+        rbgames = GameIndex(rbstats)
+        for date in rbgames.dates:
+            rbs = rbgames.records(date)          # was .to_dict("records")
+            rb_teams = rbgames.teams(date)       # away and home team codes
+            yards = rbgames.arrays(date, ["Rush Yard"])["Rush Yard"]
+
+    Input
+    ----------
+        frame : dataframe
+            game or player statistics with a date column
+        key : string
+            name of the date column
+    """
+
+    def __init__(self, frame, key="gamedate"):
+        self.key = key
+        keys = frame[key].to_numpy()
+        order = np.argsort(keys, kind="stable")
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self.names = list(self.frame.columns)
+        self._arrays = {c: self.frame[c].to_numpy() for c in self.names}
+
+        # Offset table: rows of dates[i] are starts[i]:ends[i]
+        dates, starts = np.unique(keys[order], return_index=True)
+        self.dates = dates.tolist()
+        self.starts = starts
+        self.ends = np.append(starts[1:], len(order))
+        self._pos = {d: i for i, d in enumerate(self.dates)}
+
+    def __contains__(self, date):
+        return date in self._pos
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __iter__(self):
+        return iter(self.dates)
+
+    def span(self, date):
+        """
+        First and one-past-last row of a date (an empty span if no games)
+        """
+        i = self._pos.get(date)
+        if i is None:
+            return 0, 0
+        return int(self.starts[i]), int(self.ends[i])
+
+    def arrays(self, date, names=None):
+        """
+        A date's rows as numpy column slices (views, not copies)
+
+        Input
+        ----------
+            date : integer
+                game date (YYYYMMDD)
+            names : list [optional]
+                columns to return (default all)
+        Returns
+        ----------
+            columns : dictionary
+                column name -> numpy array
+        """
+        start, end = self.span(date)
+        names = self.names if names is None else names
+        return {c: self._arrays[c][start:end] for c in names}
+
+    def records(self, date):
+        """
+        A date's rows as a list of dictionaries with Python values (same as
+        `frame[frame[key] == date].to_dict("records")`)
+        """
+        start, end = self.span(date)
+        if start == end:
+            return []
+        values = [self._arrays[c][start:end].tolist() for c in self.names]
+        return [dict(zip(self.names, row)) for row in zip(*values)]
+
+    def rows(self, date):
+        """
+        A date's rows as a dataframe slice
+        """
+        start, end = self.span(date)
+        return self.frame.iloc[start:end]
+
+    def teams(self, date, away="awayteam", home="hometeam"):
+        """
+        Set of team codes (away and home) playing in a date's games
+        """
+        start, end = self.span(date)
+        return set(self._arrays[away][start:end].tolist()).union(
+            set(self._arrays[home][start:end].tolist())
+        )
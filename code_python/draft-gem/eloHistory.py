@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# PURPOSE: Compact, growable storage for Elo rating histories (one typed column per tracked list, shared by every entity).
+import numpy as np
+import pandas as pd
+from copy import deepcopy
+
+from eloDates import start_dates
+from eloUtilities import get_start_date
+
+
+# Columns that hold YYYYMMDD dates or team codes
+INT_COLUMNS = ("date", "opp", "season", "game", "week")
+
+
+class EloHistory:
+    """
+    Collection of entities (players or team units) with their Elo histories.
+
+    Built from the same default dictionary the compute scripts have always
+    used: list-valued keys become history columns (their single element is the
+    starting value), everything else is a per-entity scalar (win/loss counters,
+    `last` values, `count`, ...). Rather than one Python list per entity and
+    metric, every column lives in one typed buffer for all entities, grown by
+    doubling, so appending a game is amortized O(1) and each value costs 4 or 8
+    bytes.
+
+    Usage mirrors the old dict-of-dicts:
+        hist = EloHistory(rushers_default, id_name="unique_id")
+        if me_id not in hist:
+            hist.add(me_id)
+        hist[me_id]["wYPG"] += 1                    # scalars
+        ypgElo = hist.last(me_id, "ypgElo")        # was ["ypgElo"][-1]
+        hist.append(me_id, ypgElo=Elo, date=date)  # was list + [x]
+        frame = hist.to_frame()                    # same columns as before
+
+    Input
+    ----------
+        default : dictionary
+            default entity dictionary (lists are history columns)
+        id_name : string
+            key added to each record holding the entity's key
+        start_date : boolean
+            replace the starting date with `get_start_date(date)` on an
+            entity's first appended row (as the compute scripts do)
+        dtypes : dictionary [optional]
+            column -> numpy dtype overrides. By default Elo columns and
+            dates/codes are int32 and anything else (stats, fantasy points) is
+            float64. Rows of a float64 column seeded with an integer that were
+            never given a value (the starting row, rows appended without the
+            column) export as that integer, as in the old lists.
+        capacity : integer
+            initial number of rows to allocate
+        ids : PlayerIds [optional]
+            registry the (int32) entity keys come from. Lookups then go through
+            an array indexed by ID, and exports translate the keys back to the
+            ID strings.
+    """
+
+    # Histories pickled before the registry existed have string keys
+    ids = None
+    # ... and no record of which rows were given a value
+    _given = {}
+
+    def __init__(
+        self,
+        default,
+        id_name="unique_id",
+        start_date=True,
+        dtypes=None,
+        capacity=1024,
+        ids=None,
+    ):
+        self.id_name = id_name
+        self.ids = ids
+        self.dtypes = dtypes or {}
+        self.start_date = start_date
+        self.template = list(default.keys())
+        self.scalars = {k: v for k, v in default.items() if not isinstance(v, list)}
+        self.seeds = {k: v[0] for k, v in default.items() if isinstance(v, list)}
+        self.columns = list(self.seeds.keys())
+
+        # One buffer per history column, plus the entity each row belongs to
+        self._data = {k: np.empty(capacity, dtype=self._dtype(k)) for k in self.columns}
+        self._entity = np.empty(capacity, dtype=np.int32)
+        self._n = 0
+        # Rows given a value, for the float columns seeded with an integer
+        self._given = {
+            k: np.zeros(capacity, dtype=bool)
+            for k, v in self.seeds.items()
+            if np.dtype(self._dtype(k)).kind == "f" and isinstance(v, (int, np.integer)) and not isinstance(v, bool)
+        }
+
+        # Per-entity bookkeeping (row of the latest value, number of rows)
+        self.keys = []
+        self.records = {}
+        self._index = {}
+        self._last = np.empty(capacity, dtype=np.int64)
+        self._count = np.empty(capacity, dtype=np.int32)
+        self._lookup = np.full(capacity if ids is not None else 0, -1, dtype=np.int64)
+
+    def _dtype(self, column):
+        if column in self.dtypes:
+            return self.dtypes[column]
+        if column in INT_COLUMNS or "elo" in column.lower():
+            return np.int32
+        return np.float64
+
+    def _grow_rows(self, needed):
+        capacity = len(self._entity)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for k, buf in self._data.items():
+            self._data[k] = np.resize(buf, capacity)
+        for k, given in self._given.items():
+            self._given[k] = np.resize(given, capacity)
+        self._entity = np.resize(self._entity, capacity)
+
+    def _grow_entities(self, needed):
+        capacity = len(self._last)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._last = np.resize(self._last, capacity)
+        self._count = np.resize(self._count, capacity)
+
+    def _grow_lookup(self, key):
+        capacity = max(len(self._lookup), 1)
+        if key < len(self._lookup):
+            return
+        while capacity <= key:
+            capacity *= 2
+        lookup = np.full(capacity, -1, dtype=np.int64)
+        lookup[: len(self._lookup)] = self._lookup
+        self._lookup = lookup
+
+    # Mapping-style access to the scalar records
+    def __contains__(self, key):
+        return key in self._index
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def index(self, key):
+        """
+        Dense integer index of an entity (in order of `add`)
+        """
+        return self._index[key]
+
+    def add(self, key, default=None, **overrides):
+        """
+        Register a new entity and write its starting history row.
+
+        Input
+        ----------
+            key : hashable
+                entity key (e.g., `unique_id` or `Team Code`)
+            default : dictionary [optional]
+                a different default dictionary to start from (same columns)
+            overrides : keyword arguments
+                starting values for history columns or scalars
+        Returns
+        ----------
+            record : dictionary
+                the entity's scalar record
+        """
+        if default is None:
+            scalars, seeds = self.scalars, self.seeds
+        else:
+            scalars = {k: v for k, v in default.items() if not isinstance(v, list)}
+            seeds = {k: v[0] for k, v in default.items() if isinstance(v, list)}
+
+        record = deepcopy(scalars)
+        record[self.id_name] = key
+        row = {k: seeds.get(k, self.seeds[k]) for k in self.columns}
+        for k, v in overrides.items():
+            if k in row:
+                row[k] = v
+            else:
+                record[k] = v
+
+        idx = len(self.keys)
+        self._grow_entities(idx + 1)
+        if self.ids is not None:
+            self._grow_lookup(key)
+            self._lookup[key] = idx
+        self._index[key] = idx
+        self.keys.append(key)
+        self.records[key] = record
+        self._count[idx] = 0
+        self._write(idx, row)
+        for k, given in self._given.items():
+            given[self._last[idx]] = k in overrides
+        return record
+
+    def _write(self, idx, values):
+        self._grow_rows(self._n + 1)
+        r = self._n
+        self._entity[r] = idx
+        for k in self.columns:
+            self._data[k][r] = values.get(k, 0)
+        for k, given in self._given.items():
+            given[r] = k in values
+        self._last[idx] = r
+        self._count[idx] += 1
+        self._n += 1
+
+    def append(self, key, **values):
+        """
+        Append one history row for an entity (columns not given are set to 0)
+        """
+        idx = self._index[key]
+        if self.start_date and self._count[idx] == 1 and "date" in values:
+            self._data["date"][self._last[idx]] = get_start_date(values["date"])
+        self._write(idx, values)
+
+    def last(self, key, column):
+        """
+        Latest value of a history column (was `dict[key][column][-1]`)
+        """
+        return self._data[column][self._last[self._index[key]]].item()
+
+    def set_last(self, key, column, value):
+        """
+        Overwrite the latest value of a history column (was `dict[key][column][-1] = value`)
+        """
+        self._data[column][self._last[self._index[key]]] = value
+        if column in self._given:
+            self._given[column][self._last[self._index[key]]] = True
+
+    def count(self, key):
+        """
+        Number of history rows an entity has (was `len(dict[key][column])`)
+        """
+        return int(self._count[self._index[key]])
+
+    # SECTION: Batch access (one call for all of a date's entities)
+    def locate(self, keys):
+        """
+        Dense integer indices of several entities
+        """
+        if self.ids is None:
+            return np.array([self._index[k] for k in keys], dtype=np.int64)
+        keys = np.asarray(keys, dtype=np.int64)
+        idx = self._lookup[np.minimum(keys, len(self._lookup) - 1)]
+        unknown = (idx < 0) | (keys >= len(self._lookup)) | (keys < 0)
+        if unknown.any():
+            raise KeyError(keys[unknown][0].item())
+        return idx
+
+    def contains(self, keys):
+        """
+        Whether each of several entities is registered
+        """
+        if self.ids is None:
+            return np.array([k in self._index for k in keys], dtype=bool)
+        keys = np.asarray(keys, dtype=np.int64)
+        inside = (keys >= 0) & (keys < len(self._lookup))
+        found = np.zeros(len(keys), dtype=bool)
+        found[inside] = self._lookup[keys[inside]] >= 0
+        return found
+
+    def lasts(self, idx, column):
+        """
+        Latest values of a history column for the entities at `idx`
+        """
+        return self._data[column][self._last[idx]]
+
+    def set_lasts(self, idx, column, values):
+        """
+        Overwrite the latest values of a history column for the entities at `idx`
+        """
+        self._data[column][self._last[idx]] = values
+        if column in self._given:
+            self._given[column][self._last[idx]] = True
+
+    def counts(self, idx):
+        """
+        Number of history rows of the entities at `idx`
+        """
+        return self._count[idx].copy()
+
+    def extend(self, idx, **values):
+        """
+        Append one history row for each entity at `idx` (same as calling
+        `append` for each in turn; an entity listed more than once gets its
+        rows in the order given)
+
+        Input
+        ----------
+            idx : array of integers
+                entity indices (see `locate`)
+            values : keyword arguments
+                column -> array (one value per row) or a single value
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        n = len(idx)
+        if n == 0:
+            return
+        entities, first, repeats = np.unique(idx, return_index=True, return_counts=True)
+        if self.start_date and "date" in values:
+            # Only an entity's first row replaces its starting date
+            first = first[self._count[entities] == 1]
+            if len(first) > 0:
+                dates = np.broadcast_to(values["date"], (n,))[first]
+                self._data["date"][self._last[idx[first]]] = start_dates(dates)
+
+        self._grow_rows(self._n + n)
+        rows = np.arange(self._n, self._n + n)
+        self._entity[rows] = idx
+        for k in self.columns:
+            self._data[k][rows] = values.get(k, 0)
+        for k, given in self._given.items():
+            given[rows] = k in values
+        if len(entities) == n:
+            self._last[idx] = rows
+        else:
+            _, last = np.unique(idx[::-1], return_index=True)
+            self._last[entities] = rows[n - 1 - last]
+        self._count[entities] += repeats.astype(np.int32)
+        self._n += n
+
+    def regress(self, keys, columns, weight=0.75, append=False, **values):
+        """
+        Season regression of several entities and columns at once: register
+        the entities not seen yet, then pull the latest values of those that
+        have played (scalar `count` > 0) toward their mean:
+        `round(weight * elo + (1 - weight) * mean)`
+
+        Input
+        ----------
+            keys : list
+                entities of the season (in order; new ones are added in this order)
+            columns : list of strings
+                history columns regressed
+            weight : float
+                share of the current rating that is kept
+            append : boolean
+                add the regressed values as a new history row (the entity's
+                latest date, zero for the rest); otherwise overwrite the latest row
+            values : keyword arguments
+                other columns of the appended rows (e.g., season)
+        """
+        if len(keys) == 0:
+            return
+        for key in np.asarray(keys)[~self.contains(keys)].tolist():
+            self.add(key)
+        idx = self.locate(keys)
+        played = np.array([self.records[self.keys[i]]["count"] > 0 for i in idx.tolist()], dtype=bool)
+        idx = idx[played]
+        if len(idx) == 0:
+            return
+
+        new = {}
+        for c in columns:
+            current = self.lasts(idx, c)
+            mean = current.sum(dtype=np.int64) / len(idx)
+            new[c] = np.rint(weight * current + (1 - weight) * mean).astype(np.int64)
+        if append:
+            self.extend(idx, **new, date=self.lasts(idx, "date"), **values)
+        else:
+            for c in columns:
+                self.set_lasts(idx, c, new[c])
+
+    def history(self, key, column):
+        """
+        Full history of one column for one entity as a numpy array
+        """
+        idx = self._index[key]
+        rows = np.flatnonzero(self._entity[: self._n] == idx)
+        return self._data[column][rows]
+
+    def _grouped(self):
+        """
+        Row order grouping every entity's rows together (in append order) and
+        the boundaries between entities
+        """
+        order = np.argsort(self._entity[: self._n], kind="stable")
+        bounds = np.cumsum(self._count[: len(self.keys)])[:-1]
+        return order, bounds
+
+    def to_dict(self):
+        """
+        Export to the nested dictionary layout the compute scripts used to build
+        (records with list-valued history columns)
+        """
+        order, bounds = self._grouped()
+        lists = {}
+        for k in self.columns:
+            column = self._data[k][order]
+            if k in self._given:
+                column = column.astype(object)
+                column[~self._given[k][order]] = self.seeds[k]
+            lists[k] = [x.tolist() for x in np.split(column, bounds)]
+        # Entity keys as ID strings (the keys themselves without a registry)
+        names = self.keys if self.ids is None else self.ids.decode(self.keys).tolist()
+        out = {}
+        for i, key in enumerate(self.keys):
+            record = self.records[key]
+            entity = {}
+            for k in self.template:
+                entity[k] = lists[k][i] if k in lists else record[k]
+            for k, v in record.items():
+                if k not in entity:
+                    entity[k] = v
+            entity[self.id_name] = names[i]
+            out[names[i]] = entity
+        return out
+
+    def to_frame(self):
+        """
+        Export to a dataframe, one row per entity, with the same columns (and
+        column order) as `pd.DataFrame.from_dict` of the old dictionaries
+        """
+        if len(self.keys) == 0:
+            return pd.DataFrame(columns=self.template + [self.id_name])
+        return pd.DataFrame.from_dict(self.to_dict(), orient="index").reset_index(
+            drop=True
+        )
+
+
+class EloTimeline:
+    """
+    Read-only view of a finished EloHistory as it stood before a given date.
+
+    Position groups only read team units (`locate`/`lasts`) before the date's
+    team updates, so a completed team replay can stand in for the live units:
+    `at(date)` moves the view to the start of `date` and `lasts` then returns,
+    for each entity, its latest value from an earlier date (or its starting
+    value). Used to replay players against cached team trajectories.
+
+    Input
+    ----------
+        history : EloHistory
+            completed history (entities' rows in date order)
+    """
+
+    def __init__(self, history):
+        self.history = history
+        order, _ = history._grouped()
+        entity = history._entity[order].astype(np.int64)
+        dates = history._data["date"][order].astype(np.int64)
+
+        # Starting rows always count, whatever their (start) date
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = entity[1:] != entity[:-1]
+        dates[first] = 0
+
+        # One sorted key per row: entity, then date
+        self._rows = order
+        self._keys = entity * 10 ** 9 + dates
+        self.date = 0
+
+    def at(self, date):
+        """
+        Move the view to the start of `date`
+        """
+        self.date = date
+        return self
+
+    def __contains__(self, key):
+        return key in self.history
+
+    def locate(self, keys):
+        return self.history.locate(keys)
+
+    def lasts(self, idx, column):
+        """
+        Values of a history column for the entities at `idx` as of the view's date
+        """
+        query = np.asarray(idx, dtype=np.int64) * 10 ** 9 + self.date
+        pos = np.searchsorted(self._keys, query, side="left") - 1
+        return self.history._data[column][self._rows[pos]]
@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+# PURPOSE: Optional compiled (Numba) replay of a run of game dates -- player metrics and team units together -- used by the computeElo scripts when Numba is installed, with the per-date Python engine as the fallback.
+#
+# Usage (check that both engines give identical results on random games of
+# every position group, or on a league's seasons from the folder the league
+# expects -- see eloPipeline.py):
+#     python3 code_python/draft-gem/eloKernel.py [dates=12 teams=10 players=40 seed=0]
+#     python3 code_python/draft-gem/eloKernel.py nfl [2015 2016 ...]
+import os
+import re
+import sys
+from math import log
+
+import numpy as np
+import pandas as pd
+
+import eloUtilities as eu
+
+try:
+    from numba import njit
+except ImportError:  # the Python engine is used instead
+    njit = None
+
+
+# SECTION: Backend selection
+def compiled(backend="auto"):
+    """
+    Whether a replay should use the compiled kernel
+
+    Input
+    ----------
+        backend : string
+            "numba" (the kernel; Numba must be installed), "python" (the
+            per-date engine) or "auto" (the kernel if Numba is installed,
+            unless the ELO_BACKEND environment variable says "python")
+    Returns
+    ----------
+        compiled : boolean
+    """
+    if backend == "auto":
+        backend = os.environ.get("ELO_BACKEND", "auto")
+    if backend == "auto":
+        return njit is not None
+    if backend == "python":
+        return False
+    if backend == "numba":
+        if njit is None:
+            raise ImportError("The numba backend needs Numba (pip install numba)")
+        return True
+    raise ValueError(f"Unknown backend {backend!r} (expected auto, numba or python)")
+
+
+# SECTION: Kernel (the same arithmetic as eloUtilities.updateElo, one row at a time)
+def _elo(Ra, Rb, K, win):
+    Pa = 1.0 / (1.0 + 10.0 ** ((Rb - Ra) / 400))
+    if win:
+        return np.rint(Ra + K * (1 - Pa))
+    return np.rint(Ra + K * (0 - Pa))
+
+
+def _effectiveK(my, opp, ptdiff, win, scale, K):
+    if not scale:
+        return 1.0 * K
+    if win:
+        elodiff = my - opp
+    else:
+        elodiff = opp - my
+    return log(ptdiff + 1) * (2.2 / (elodiff * 0.001 + 2.2)) * K
+
+
+def _replay(
+    pStart, pEntity, pOpp, pDiff, pWin, pUnit, pK, pScale, pOffset, pState,
+    tStart, tUs, tThem, tDiff, tWin, tD, tO, tK, tScale, tState,
+    aStart, aRow, aCode, aValue,
+    pMine, pTheirs, pNew, tOldD, tOldO, tNewD, tNewO, tScore,
+):
+    """
+    Replay dates in order: each date's player rows (stream by stream) read
+    the team units as they were before the date, then the date's team games
+    update the units. Team ratings set from outside (cached trajectories)
+    are assigned at the start of their date. `pState`/`tState` are updated
+    in place.
+    """
+    for d in range(tStart.shape[0] - 1):
+        for r in range(aStart[d], aStart[d + 1]):
+            tState[aRow[r], aCode[r]] = aValue[r]
+        for s in range(pStart.shape[0]):
+            for r in range(pStart[s, d], pStart[s, d + 1]):
+                e = pOffset[s] + pEntity[r]
+                mine = pState[e]
+                theirs = tState[pUnit[s], pOpp[r]]
+                K = _effectiveK(mine, theirs, pDiff[r], pWin[r], pScale[s], pK[s])
+                new = _elo(mine, theirs, K, pWin[r])
+                pMine[r] = mine
+                pTheirs[r] = theirs
+                pNew[r] = new
+                pState[e] = new
+        for r in range(tStart[d], tStart[d + 1]):
+            for s in range(tD.shape[0]):
+                my = tState[tD[s], tUs[r]]
+                opp = tState[tO[s], tThem[r]]
+                win = tWin[s, r]
+                # Brier score of the defense's pre-game win probability
+                p = 1.0 / (1.0 + 10.0 ** ((opp - my) / 400))
+                tScore[s] += ((1.0 if win else 0.0) - p) ** 2
+                K = _effectiveK(my, opp, tDiff[s, r], win, tScale, tK)
+                myNew = _elo(my, opp, K, win)
+                oppNew = _elo(opp, my, K, not win)
+                tState[tD[s], tUs[r]] = myNew
+                tState[tO[s], tThem[r]] = oppNew
+                tOldD[s, r] = my
+                tOldO[s, r] = opp
+                tNewD[s, r] = myNew
+                tNewO[s, r] = oppNew
+
+
+if njit is not None:
+    _elo = njit(cache=True)(_elo)
+    _effectiveK = njit(cache=True)(_effectiveK)
+    _replay = njit(cache=True)(_replay)
+
+
+# SECTION: Driver
+class SeasonReplay:
+    """
+    Queues game dates and replays them with the compiled kernel in one call.
+
+    The kernel keeps every current rating in arrays (the players' metric Elos
+    and the TeamTable columns) and runs the whole span of dates without going
+    back to Python. Afterwards the position groups (`PositionGroup.commit`)
+    and team units get the same history rows, records and scores as the
+    per-date Python loop writes. Anything that reads histories between dates
+    (regressions, checkpoints) has to `flush` first.
+
+    With `timelines` (cached team trajectories, see eloHistory.EloTimeline)
+    only the players are replayed: they read the units as the timelines had
+    them before each date, and `teams` and `metrics` go unused.
+
+    Usage:
+        replay = SeasonReplay(groups, teamRatings, teamMetrics, teamK, blowoutFactor)
+        replay.load(teamgames)             # with the groups' load
+        for date in dates:
+            teamRatings.add(...)           # registering teams stays per date
+            replay.add(date)
+        replay.flush(season=thisSeason)
+
+    Input
+    ----------
+        groups : dictionary
+            group name -> PositionGroup
+        teams : TeamTable
+            current team ratings (its units get the team history rows)
+        metrics : list of dictionaries
+            team updates, each {"defense", "offense", "column", "last", "stat",
+            "drawline", "divisor"} and optionally "score": the defense unit
+            wins when the offense's `stat` is below `drawline`, ptdiff is
+            abs(stat - drawline) / divisor, and `last` is the record key
+            holding the latest value of `column`
+        K : number
+            team K-factor
+        blowoutFactor : boolean
+            whether to scale team wins by ptdiff
+        scores : dictionary [optional]
+            score name -> [sum, count] of the team Brier scores to add to
+        calibration : Calibration [optional]
+            collects the team updates' pre-game win probabilities (the
+            groups' own go through their `calibration`)
+        timelines : dictionary [optional]
+            unit name -> EloTimeline of a finished team replay, in place of
+            `teams` and `metrics`
+    """
+
+    def __init__(
+        self, groups, teams, metrics, K, blowoutFactor=True, scores=None, calibration=None,
+        timelines=None,
+    ):
+        self.groups = groups
+        self.teams = teams
+        self.metrics = list(metrics) if timelines is None else []
+        self.timelines = timelines
+        self.K = K
+        self.blowoutFactor = blowoutFactor
+        self.scores = scores
+        self.calibration = calibration
+        self.games = None
+        self.dates = []
+
+    def load(self, games):
+        """
+        Team games (GameIndex) of the dates to come
+        """
+        self.games = games
+
+    def add(self, date):
+        """
+        Queue a date (after its teams are registered)
+        """
+        self.dates.append(date)
+
+    def flush(self, **constants):
+        """
+        Replay the queued dates
+
+        Input
+        ----------
+            constants : keyword arguments
+                history columns with one value for all the queued dates (e.g., season)
+        """
+        dates, self.dates = self.dates, []
+        if len(dates) == 0:
+            return
+        teams = self.teams
+
+        # Team ratings the kernel reads or writes, one state row per unit column
+        pairs = []
+        for m in self.metrics:
+            pairs += [(m["defense"], m["column"]), (m["offense"], m["column"])]
+        for group in self.groups.values():
+            pairs += [metric.opponent for metric in group.metrics]
+        pairs = list(dict.fromkeys(pairs))
+        state = {pair: i for i, pair in enumerate(pairs)}
+        if self.timelines is None:
+            tState = np.stack([teams.ratings[c][u] for u, c in pairs]).astype(np.int64)
+            aStart = np.zeros(len(dates) + 1, dtype=np.int64)
+            aRow = aCode = aValue = np.zeros(0, dtype=np.int64)
+        else:
+            tState, aStart, aRow, aCode, aValue = self._assignments(pairs, dates)
+
+        # Player rows: one stream per group metric, laid out one after another
+        nDates = len(dates)
+        players = []
+        pStart, pEntity, pOpp, pDiff, pWin = [], [], [], [], []
+        pUnit, pK, pScale, pOffset, pState = [], [], [], [], []
+        position = offset = 0
+        for group in self.groups.values():
+            spans = [group.games.span(d) for d in dates]
+            rows = np.concatenate([np.arange(a, b) for a, b in spans]).astype(np.int64)
+            counts = np.array([b - a for a, b in spans], dtype=np.int64)
+            idx = group.register(rows)
+            opps = np.asarray(group._opps[rows], dtype=np.int64)
+            everyone = np.arange(len(group.history))
+            for metric, (ptdiff, win) in zip(group.metrics, group._outcomes):
+                self._check(metric.opponent, opps)
+                pStart.append(position + np.r_[0, np.cumsum(counts)])
+                pEntity.append(idx)
+                pOpp.append(opps)
+                pDiff.append(np.asarray(ptdiff[rows], dtype=np.float64))
+                pWin.append(np.asarray(win[rows], dtype=bool))
+                pUnit.append(state[metric.opponent])
+                pK.append(group.K)
+                pScale.append(group.blowoutFactor)
+                pOffset.append(offset)
+                pState.append(group.history.lasts(everyone, metric.elo).astype(np.int64))
+                position += len(rows)
+                offset += len(everyone)
+            players.append((group, rows, idx, np.repeat(dates, counts)))
+
+        # Team rows (none when the units come from cached timelines)
+        if self.timelines is None:
+            spans = [self.games.span(d) for d in dates]
+        else:
+            spans = [(0, 0)] * nDates
+        tRows = np.concatenate([np.arange(a, b) for a, b in spans]).astype(np.int64)
+        counts = np.array([b - a for a, b in spans], dtype=np.int64)
+        tUs = tThem = np.zeros(0, dtype=np.int64)
+        if self.metrics:
+            frame = self.games.frame
+            tUs = frame["Team Code"].to_numpy()[tRows].astype(np.int64)
+            tThem = frame["Team Code opp"].to_numpy()[tRows].astype(np.int64)
+        tDiff, tWin = [], []
+        for m in self.metrics:
+            self._check((m["defense"], m["column"]), tUs)
+            self._check((m["offense"], m["column"]), tThem)
+            stat = frame[m["stat"]].to_numpy()[tRows]
+            tDiff.append(np.abs(stat - m["drawline"]) / m["divisor"])
+            tWin.append(stat < m["drawline"])
+        nTeam = len(self.metrics)
+        tScore = np.array(
+            [self.scores[m["score"]][0] if "score" in m else 0.0 for m in self.metrics],
+            dtype=np.float64,
+        )
+
+        # The kernel's log can't raise on a bad ptdiff, so check them here
+        for diff, scale in zip(pDiff, pScale):
+            if scale:
+                eu.checkPtdiff(diff)
+        if self.blowoutFactor:
+            for diff in tDiff:
+                eu.checkPtdiff(diff)
+
+        def flat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+        nRows = len(tRows)
+        pMine = np.zeros(position, dtype=np.int64)
+        pTheirs = np.zeros(position, dtype=np.int64)
+        pNew = np.zeros(position, dtype=np.int64)
+        tOldD = np.zeros((nTeam, nRows), dtype=np.int64)
+        tOldO = np.zeros((nTeam, nRows), dtype=np.int64)
+        tNewD = np.zeros((nTeam, nRows), dtype=np.int64)
+        tNewO = np.zeros((nTeam, nRows), dtype=np.int64)
+        _replay(
+            np.array(pStart, dtype=np.int64).reshape(-1, nDates + 1),
+            flat(pEntity, np.int64),
+            flat(pOpp, np.int64),
+            flat(pDiff, np.float64),
+            flat(pWin, np.bool_),
+            np.array(pUnit, dtype=np.int64),
+            np.array(pK, dtype=np.float64),
+            np.array(pScale, dtype=np.bool_),
+            np.array(pOffset, dtype=np.int64),
+            flat(pState, np.int64),
+            np.r_[0, np.cumsum(counts)].astype(np.int64),
+            tUs,
+            tThem,
+            np.array(tDiff, dtype=np.float64).reshape(nTeam, nRows),
+            np.array(tWin, dtype=np.bool_).reshape(nTeam, nRows),
+            np.array([state[(m["defense"], m["column"])] for m in self.metrics], dtype=np.int64),
+            np.array([state[(m["offense"], m["column"])] for m in self.metrics], dtype=np.int64),
+            float(self.K),
+            bool(self.blowoutFactor),
+            tState,
+            aStart,
+            aRow,
+            aCode,
+            aValue,
+            pMine,
+            pTheirs,
+            pNew,
+            tOldD,
+            tOldO,
+            tNewD,
+            tNewO,
+            tScore,
+        )
+
+        # Players: history rows, records, scores and errors
+        position = 0
+        for group, rows, idx, rowDates in players:
+            mine, theirs, new = [], [], []
+            for _ in group.metrics:
+                part = slice(position, position + len(rows))
+                mine.append(pMine[part])
+                theirs.append(pTheirs[part])
+                new.append(pNew[part])
+                position += len(rows)
+            group.commit(rows, idx, rowDates, mine, theirs, new, **constants)
+        if self.timelines is not None:
+            return
+
+        # Teams: current ratings, history rows and `last` records
+        for (unit, column), values in zip(pairs, tState):
+            teams.ratings[column][unit][:] = values
+        rowDates = np.repeat(dates, counts)
+        for side, codes, opps, out in (
+            ("defense", tUs, tThem, tNewD),
+            ("offense", tThem, tUs, tNewO),
+        ):
+            updates = {}
+            for s, m in enumerate(self.metrics):
+                updates.setdefault(m[side], []).append(s)
+            for unit, streams in updates.items():
+                history = teams.units[unit]
+                idx = history.locate(codes.tolist())
+                values = {self.metrics[s]["column"]: out[s] for s in streams}
+                history.extend(idx, **values, opp=opps, date=rowDates)
+                if len(codes) == 0:
+                    continue
+                latest, inverse = np.unique(codes, return_inverse=True)
+                last = np.zeros(len(latest), dtype=np.int64)
+                np.maximum.at(last, inverse, np.arange(len(codes)))
+                for s in streams:
+                    key = self.metrics[s]["last"]
+                    for code, value in zip(latest.tolist(), out[s][last].tolist()):
+                        history[code][key] = value
+        for s, m in enumerate(self.metrics):
+            if "score" in m:
+                self.scores[m["score"]][0] = float(tScore[s])
+                self.scores[m["score"]][1] += nRows
+        if self.calibration is not None:
+            for s, m in enumerate(self.metrics):
+                prob = eu.probabilityBatch(tOldO[s], tOldD[s])
+                self.calibration.add(m["defense"], m["column"], prob, tWin[s])
+
+    def _assignments(self, pairs, dates):
+        """
+        Team ratings of the cached timelines as kernel assignments: every
+        team's rating at the first date, then the ratings that changed by
+        each later date
+
+        Returns
+        ----------
+            tState : np.ndarray
+                zeros, one row per unit column, one column per team code
+            aStart, aRow, aCode, aValue : np.ndarrays
+                assignments of each date (aStart bounds them by date)
+        """
+        codes = [np.asarray(self.timelines[u].history.keys, dtype=np.int64) for u, _ in pairs]
+        size = max([c.max() + 1 for c in codes if len(c) > 0], default=1)
+        tState = np.zeros((len(pairs), size), dtype=np.int64)
+        aStart, aRow, aCode, aValue = [0], [], [], []
+        before = [None] * len(pairs)
+        for date in dates:
+            for i, ((unit, column), keys) in enumerate(zip(pairs, codes)):
+                timeline = self.timelines[unit].at(date)
+                values = timeline.lasts(timeline.locate(keys.tolist()), column).astype(np.int64)
+                changed = np.ones(len(keys), dtype=bool) if before[i] is None else values != before[i]
+                aRow += [i] * int(changed.sum())
+                aCode += keys[changed].tolist()
+                aValue += values[changed].tolist()
+                before[i] = values
+            aStart.append(len(aRow))
+        return (
+            tState,
+            np.array(aStart, dtype=np.int64),
+            np.array(aRow, dtype=np.int64),
+            np.array(aCode, dtype=np.int64),
+            np.array(aValue, dtype=np.int64),
+        )
+
+    def _check(self, pair, codes):
+        """
+        Raise like the Python engine does for a team a unit doesn't have
+        """
+        if self.timelines is not None:
+            history = self.timelines[pair[0]].history
+            known = np.zeros(max([*history.keys, -1]) + 1, dtype=bool)
+            known[np.asarray(history.keys, dtype=np.int64)] = True
+        else:
+            known = self.teams.known[pair[0]]
+        unknown = (codes < 0) | (codes >= len(known))
+        unknown[~unknown] = ~known[codes[~unknown]]
+        if unknown.any():
+            raise KeyError(codes[unknown][0].item())
+
+
+# SECTION: Identical-output check
+def _synthetic(positions, dates, teams, players, rng):
+    """
+    Random games for `check_games`: every position group's statistics
+    columns (players facing teams drawn from the date's games) and the
+    team games of each date, each game from both teams' side
+
+    Returns
+    ----------
+        params : dictionary
+            random values of the drawline/factor names the specs use
+        frames : dictionary
+            group name -> player rows
+        teamgames : dataframe
+    """
+    from eloEngine import FUNCTIONS, spec_columns
+
+    # Names the specs' numbers and expressions refer to
+    names = set()
+    for spec in positions.values():
+        expressions = [m["stat"] for m in spec["metrics"]]
+        expressions += list(spec.get("fields", {}).values())
+        expressions += [e["actual"] for e in spec.get("errors", [])]
+        for expression in expressions:
+            names.update(re.findall(r"[A-Za-z_]\w*", re.sub(r"`[^`]*`", "", expression)))
+        for m in spec["metrics"]:
+            names.update(m[k] for k in ("drawline", "factor", "divisor") if isinstance(m.get(k), str))
+    params = {n: round(float(rng.uniform(1, 20)), 1) for n in sorted(names - set(FUNCTIONS))}
+
+    days = np.arange(dates) + 20190901
+    codes = np.arange(1, teams + 1)
+    rows = []
+    for day in days.tolist():
+        pairs = rng.permutation(codes)[: teams // 2 * 2].reshape(-1, 2)
+        for a, b in pairs.tolist():
+            rows += [(day, a, b), (day, b, a)]
+    teamgames = pd.DataFrame(rows, columns=["gamedate", "Team Code", "Team Code opp"])
+    teamgames["Rush Yard opp"] = rng.integers(50, 250, len(teamgames))
+    teamgames["Pass Yard opp"] = rng.integers(100, 350, len(teamgames))
+    teamgames["Rush TD opp"] = rng.integers(0, 4, len(teamgames))
+    teamgames["Pass TD opp"] = rng.integers(0, 4, len(teamgames))
+
+    frames = {}
+    for name, spec in positions.items():
+        # Some players appear twice on a date (the second pass of `run`)
+        n = players * dates
+        picks = rng.integers(0, len(teamgames), n)
+        frame = pd.DataFrame(
+            {
+                "gamedate": teamgames["gamedate"].to_numpy()[picks],
+                "unique_id": rng.integers(0, players, n),
+                "Team Code opp": teamgames["Team Code opp"].to_numpy()[picks],
+            }
+        )
+        for column in spec_columns(spec):
+            if column not in frame:
+                frame[column] = rng.integers(1, 30, n)
+        frames[name] = frame
+    return params, frames, teamgames
+
+
+def _replay_games(positions, params, frames, teamgames, engine, timelines=None):
+    """
+    Replay `_synthetic` games with the Python engine ("python"), the kernel
+    ("kernel") or the kernel against cached team trajectories ("timelines",
+    the units of a finished replay)
+
+    Returns
+    ----------
+        outputs : dictionary
+            name -> dataframe or value (histories, scores, calibration)
+    """
+    from eloCalibration import Calibration, add_batches
+    from eloEngine import build_groups
+    from eloGameIndex import GameIndex
+    from eloHistory import EloHistory, EloTimeline
+    from eloTeamTable import TeamTable, conflict_batches
+
+    K = 20
+    # Team updates of every unit column the players face ("elo" from yards,
+    # the others, e.g. "eloTD", from touchdowns)
+    columns = ["elo"] + sorted(
+        {m["opponentElo"] for spec in positions.values() for m in spec["metrics"] if "opponentElo" in m} - {"elo"}
+    )
+    lasts = {c: "last" + c[len("elo"):] for c in columns}
+    teamMetrics = []
+    for unit, drawline, divisor in (("Rush", 150, 1), ("Pass", 218, 8)):
+        for c in columns:
+            stat, score = (f"{unit} Yard opp", unit.lower()) if c == "elo" else (f"{unit} TD opp", f"{unit.lower()} {c}")
+            teamMetrics.append(
+                {"defense": f"{unit.lower()}D", "offense": f"{unit.lower()}O", "column": c, "last": lasts[c],
+                 "stat": stat, "drawline": drawline if c == "elo" else 1.5, "divisor": divisor, "score": score}
+            )
+    teams_default = {lasts[c]: 1200 for c in columns}
+    teams_default.update({c: [1200] for c in columns}, date=[0], opp=[0])
+
+    # Player histories with every column and record key the specs write
+    histories = {}
+    for name, spec in positions.items():
+        default = {"count": 0}
+        for m in spec["metrics"]:
+            default[m["elo"]] = [1300]
+            if "last" in m:
+                default[m["last"]] = 1300
+            if "wins" in m:
+                default[m["wins"]] = default[m["losses"]] = 0
+            if "predict" in m:
+                default[m["predict"]["column"]] = [0]
+        composite = spec.get("composite")
+        if composite is not None:
+            default[composite["column"]] = [1300]
+            if "last" in composite:
+                default[composite["last"]] = 1300
+        for k in list(spec.get("fields", {})) + list(spec.get("derived", {})):
+            default[k] = [0]
+        default.update(date=[0], opp=[0])
+        histories[name] = EloHistory(default)
+
+    calibration = Calibration()
+    teamCalibration = Calibration()
+    scores = {m["score"]: [0.0, 0] for m in teamMetrics}
+    if engine == "timelines":
+        units = {name: EloTimeline(history) for name, history in timelines.items()}
+        teamRatings = None
+    else:
+        units = {name: EloHistory(teams_default) for name in ("rushD", "rushO", "passD", "passO")}
+        teamRatings = TeamTable(units, columns=columns)
+    groups = build_groups(positions, histories, units, params, K, True, (), calibration)
+    replay = None
+    if engine == "kernel":
+        replay = SeasonReplay(groups, teamRatings, teamMetrics, K, True, scores, teamCalibration)
+    elif engine == "timelines":
+        replay = SeasonReplay(groups, None, [], K, True, timelines=units)
+
+    games = GameIndex(teamgames)
+    for group in groups.values():
+        group.load(GameIndex(frames[group.name]))
+    if replay is not None:
+        replay.load(games)
+    dates = games.dates
+    for date in dates:
+        arrays = games.arrays(date, ["Team Code", "Team Code opp"] + [m["stat"] for m in teamMetrics])
+        us, them = arrays["Team Code"], arrays["Team Code opp"]
+        if teamRatings is not None:
+            # (the players' opponents are among the date's teams)
+            teamRatings.add(us.tolist(), teams_default)
+        if replay is not None:
+            replay.add(date)
+            # Two flushes, so state carries over between kernel calls
+            if date in (dates[len(dates) // 2], dates[-1]):
+                replay.flush(season=2019)
+            continue
+
+        for group in groups.values():
+            group.run(date, season=2019)
+        # One update per defense/offense pair for all its columns, as the
+        # computeElo scripts do
+        for pair in dict.fromkeys((m["defense"], m["offense"]) for m in teamMetrics):
+            metrics = [m for m in teamMetrics if (m["defense"], m["offense"]) == pair]
+            outcomes = {}
+            for m in metrics:
+                stat = arrays[m["stat"]]
+                outcomes[m["column"]] = (np.abs(stat - m["drawline"]) / m["divisor"], stat < m["drawline"])
+            brier = {m["column"]: np.zeros(len(us)) for m in metrics}
+            before = {m["column"]: [] for m in metrics}
+            for rows in conflict_batches(us, them):
+                for c, (_, win) in outcomes.items():
+                    elo = teamRatings.ratings[c]
+                    brier[c][rows] = [
+                        (w - eu.probability(o, d)) ** 2
+                        for w, o, d in zip(win[rows].tolist(), elo[pair[1]][them[rows]].tolist(), elo[pair[0]][us[rows]].tolist())
+                    ]
+                ratings = teamRatings.update(
+                    pair, us[rows], them[rows], {c: (d[rows], w[rows]) for c, (d, w) in outcomes.items()},
+                    K, True, date, last={m["column"]: m["last"] for m in metrics},
+                )
+                for c, values in ratings.items():
+                    before[c].append((rows, values))
+            for m in metrics:
+                for x in brier[m["column"]].tolist():
+                    scores[m["score"]][0] += x
+                scores[m["score"]][1] += len(us)
+                add_batches(teamCalibration, pair[0], m["column"], before[m["column"]], outcomes[m["column"]][1])
+
+    outputs = {"calibration": calibration.summary(), "reliability": calibration.reliability()}
+    for name, group in groups.items():
+        outputs[name] = group.history.to_frame()
+        outputs[f"{name} scores"] = group.scores
+        outputs[f"{name} errors"] = [(e["sqError"], e["count"]) for e in group.errors]
+    if engine != "timelines":
+        for name, unit in units.items():
+            outputs[name] = unit.to_frame()
+        outputs["team scores"] = scores
+        outputs["team calibration"] = teamCalibration.summary()
+        outputs["units"] = units
+    return outputs
+
+
+def check_games(dates=12, teams=10, players=40, seed=0):
+    """
+    Replay random games of every position group in elo_config.json (each
+    league's metrics) with the Python engine (PositionGroup.run and
+    TeamTable.update), with the compiled kernel and with the kernel against
+    the Python replay's team trajectories, and raise if any history, score or
+    calibration differs. Needs no statistics files.
+
+    Input
+    ----------
+        dates : integer
+            game dates per league
+        teams : integer
+            teams playing each date
+        players : integer
+            players per group (rows per group and date)
+        seed : integer
+    Returns
+    ----------
+        counts : dictionary
+            league -> player rows replayed
+    """
+    from pathlib import Path
+
+    config = eu.load_config(Path(__file__).with_name("elo_config.json"))
+    rng = np.random.default_rng(seed)
+    counts = {}
+    differ = []
+    for league, cfg in config["computeElo"].items():
+        if "positions" not in cfg:
+            continue
+        positions = cfg["positions"]
+        params, frames, teamgames = _synthetic(positions, dates, teams, players, rng)
+        python = _replay_games(positions, params, frames, teamgames, "python")
+        kernel = _replay_games(positions, params, frames, teamgames, "kernel")
+        cached = _replay_games(positions, params, frames, teamgames, "timelines", python.pop("units"))
+        kernel.pop("units")
+        for engine, outputs in (("kernel", kernel), ("timelines", cached)):
+            for name, value in outputs.items():
+                same = value.equals(python[name]) if isinstance(value, pd.DataFrame) else value == python[name]
+                if not same:
+                    differ.append(f"{league} {name} ({engine})")
+        counts[league] = sum(len(f) for f in frames.values())
+    if differ:
+        raise AssertionError(f"Python and compiled replays differ: {differ}")
+    return counts
+
+
+def check(league, seasons=None, **options):
+    """
+    Run a league's compute_elo with the Python engine and with the compiled
+    kernel and raise if any output differs
+
+    Input
+    ----------
+        league : string
+            "cfb", "nfl" or "fantasy"
+        seasons : iterable of integers [optional]
+            seasons to process (the league's default range if not given)
+        options : keyword arguments
+            passed on to compute_elo
+    Returns
+    ----------
+        names : list of strings
+            outputs compared
+    """
+    import eloPipeline
+
+    results = {}
+    summaries = {}
+    for backend in ("python", "numba"):
+        extra = dict(options, backend=backend)
+        if league == "nfl":
+            extra["summary"] = summaries[backend] = {}
+        results[backend] = eloPipeline.compute_elo(league, seasons, **extra)
+
+    python, numba = results["python"], results["numba"]
+    differ = [name for name in python if not python[name].equals(numba[name])]
+    if summaries and summaries["python"] != summaries["numba"]:
+        differ.append("summary")
+    if differ:
+        raise AssertionError(f"Python and compiled replays differ: {differ}")
+    return list(python)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or "=" in sys.argv[1]:
+        options = dict(x.split("=", 1) for x in sys.argv[1:] if "=" in x)
+        counts = check_games(**{k: int(v) for k, v in options.items()})
+        print("Identical outputs from both engines: " + ", ".join(f"{k} ({v} rows)" for k, v in counts.items()))
+        exit()
+    seasons = [int(x) for x in sys.argv[2:]] or None
+    names = check(sys.argv[1], seasons)
+    print(f"Identical {sys.argv[1]} outputs from both engines: {', '.join(names)}")
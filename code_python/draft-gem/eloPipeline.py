@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# PURPOSE: One entry point to compute and save Elo for any league, so notebooks and scripts can run (or reuse) a stage without importing the league scripts by hand.
+#
+# Usage:
+#     import eloPipeline
+#     results = eloPipeline.compute_elo("nfl", seasons=range(2010, 2019 + 1))
+#     eloPipeline.save_output("nfl", results)
+#
+# Run from the folder each league expects (cfb and nfl: the folder holding
+# code_python and data_raw; fantasy: the code folder).
+#
+# All leagues at once, each in its own process (from the folder holding
+# code_python, data_raw and code):
+#     python3 code_python/draft-gem/eloPipeline.py [cfb nfl fantasy] [nosave]
+import importlib
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import eloUtilities as eu
+from eloShared import SharedTables
+
+
+LEAGUES = ("cfb", "nfl", "fantasy")
+
+# Folder each league runs from, under the top folder
+FOLDERS = {"cfb": ".", "nfl": ".", "fantasy": "code"}
+
+
+def _module(league, stage):
+    if league not in LEAGUES:
+        raise ValueError(f"Unknown league {league!r} (expected one of {LEAGUES})")
+    return importlib.import_module(f"{league}_{stage}")
+
+
+def compute_elo(league, seasons=None, config=None, **options):
+    """
+    Compute a league's Elo ratings
+
+    Input
+    ----------
+        league : string
+            "cfb", "nfl" or "fantasy"
+        seasons : iterable of integers [optional]
+            seasons to process (the league's default range if not given)
+        config : dictionary [optional]
+            elo_config.json contents (eloUtilities.load_config)
+        options : keyword arguments
+            passed on to the league's compute_elo (e.g., update=True for cfb)
+    Returns
+    ----------
+        results : dictionary
+            name -> dataframe
+    """
+    if seasons is not None:
+        options["seasons"] = seasons
+    return _module(league, "computeElo").compute_elo(config=config, **options)
+
+
+def save_output(league, results, root=None):
+    """
+    Write a league's compute_elo results to files for UI use
+
+    Input
+    ----------
+        league : string
+            "cfb", "nfl" or "fantasy"
+        results : dictionary
+            as returned by compute_elo
+        root : string or path [optional]
+            output folder (the league's default if not given)
+    """
+    save = _module(league, "saveOutput").save_output
+    if root is None:
+        save(results)
+    else:
+        save(results, root)
+
+
+# SECTION: All leagues in parallel
+def read_tables(root, leagues=LEAGUES):
+    """
+    Every game statistics file of the leagues (data_raw/<league>), read once
+    into shared memory
+
+    Input
+    ----------
+        root : path
+            folder holding data_raw
+        leagues : list of strings
+    Returns
+    ----------
+        tables : SharedTables
+            keyed by resolved file path (as eloUtilities.read_game_file looks
+            them up)
+    """
+    frames = {}
+    for league in leagues:
+        for path in sorted(Path(root, "data_raw", league).glob("*-game-statistics*.csv")):
+            dtypes = eu.TEAM_DTYPES if "-team-" in path.name else eu.PLAYER_DTYPES
+            frames[str(path.resolve())] = eu.read_game_file(path, dtypes)
+    return SharedTables(frames)
+
+
+def _run(league, folder, spec, seasons, save):
+    """
+    Compute (and save) one league in this process, reading the game files
+    from the shared tables; returns its wall time and peak resident memory
+    """
+    start = time.perf_counter()
+    os.chdir(folder)
+    if spec is not None:
+        eu.shared_tables = SharedTables.attach(spec)
+    results = compute_elo(league, seasons)
+    if save:
+        save_output(league, results)
+    # (ru_maxrss is in kilobytes on Linux)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"league": league, "seconds": time.perf_counter() - start, "peakRSS": peak}
+
+
+def run_leagues(leagues=LEAGUES, root=".", seasons=None, save=True, shared=True):
+    """
+    Compute (and save) several leagues concurrently, one process per league
+
+    The leagues share nothing but their inputs: the parent reads each game
+    statistics file once into shared memory (`read_tables`) and every
+    league's readers take the tables from there instead of parsing the csv
+    files again (the runOldSeasons replays read some files more than once).
+
+    Input
+    ----------
+        leagues : list of strings
+            "cfb", "nfl" and/or "fantasy"
+        root : string or path
+            folder holding code_python, data_raw and code
+        seasons : dictionary [optional]
+            league -> seasons (each league's default range if not given)
+        save : boolean
+            write each league's output files (save_output)
+        shared : boolean
+            read the game files into shared memory first
+    Returns
+    ----------
+        report : dataframe
+            per league: wall time (seconds) and peak resident memory
+            (peakRSS, MB, of its process; the shared pages it read count in
+            every process that reads them), plus the wall time of the whole
+            run ("all", with the reading)
+    """
+    for league in leagues:
+        _module(league, "computeElo")
+    root = Path(root).resolve()
+    seasons = seasons or {}
+    start = time.perf_counter()
+    tables = read_tables(root, leagues) if shared else None
+    jobs = [
+        (league, root.joinpath(FOLDERS[league]), None if tables is None else tables.spec,
+         seasons.get(league), save)
+        for league in leagues
+    ]
+    try:
+        # One fresh process per league, so each peak is that league's own
+        context = multiprocessing.get_context("fork")
+        with context.Pool(len(jobs), maxtasksperchild=1) as pool:
+            rows = pool.starmap(_run, jobs, chunksize=1)
+    finally:
+        if tables is not None:
+            tables.close()
+    rows.append({"league": "all", "seconds": time.perf_counter() - start, "peakRSS": None})
+    return pd.DataFrame(rows).set_index("league")
+
+
+if __name__ == "__main__":
+    leagues = [x for x in sys.argv[1:] if x in LEAGUES] or list(LEAGUES)
+    report = run_leagues(leagues, save="nosave" not in sys.argv[1:])
+    print(report.to_string())
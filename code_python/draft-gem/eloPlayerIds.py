@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# PURPOSE: Persistent registry of player ID strings (unique_id / id_ncaa / id_nfl) to dense int32 IDs, so the engines and joins work on integers and strings only come back at the output files.
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+
+# Stand-in for a missing ID (NaN or empty) in encoded arrays
+MISSING = -1
+
+
+class PlayerIds:
+    """
+    Player ID strings mapped to dense int32 IDs (0, 1, 2, ... in order of
+    first appearance).
+
+    IDs are stripped of surrounding whitespace once, when encoded. The mapping
+    is kept in a two-column csv (`id`, `key`) so a player gets the same integer
+    in every run, and in checkpoints written by earlier runs. College
+    (`unique_id`/`id_ncaa`) and pro (`unique_id`/`id_nfl`, fantasy) IDs are
+    separate registries.
+
+    Usage:
+        ids = PlayerIds(Path("data_player", "player_ids_ncaa.csv"))
+        playerstats["unique_id"] = ids.encode(playerstats["unique_id"])
+        ...                                   # engines and merges on ints
+        frame["unique_id"] = ids.decode(frame["unique_id"])
+        ids.save()
+
+    Input
+    ----------
+        path : string or path [optional]
+            csv holding the registry (read if it exists; memory only if not given)
+    """
+
+    def __init__(self, path=None):
+        self.path = None if path is None else Path(path)
+        self.keys = []
+        self._index = pd.Index([], dtype=object)
+        if self.path is not None and self.path.exists():
+            table = pd.read_csv(self.path, dtype={"key": str}, keep_default_na=False)
+            if not (table["id"].to_numpy() == np.arange(len(table))).all():
+                raise ValueError(f"{self.path} is not a dense ID registry")
+            self.keys = table["key"].tolist()
+            self._index = pd.Index(self.keys, dtype=object)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return str(key).strip() in self._index
+
+    def encode(self, values, add=True):
+        """
+        Integer IDs of player ID strings
+
+        Input
+        ----------
+            values : array-like of strings
+                player IDs (NaN or empty strings are MISSING)
+            add : boolean
+                register IDs not seen before (otherwise they are MISSING)
+        Returns
+        ----------
+            ids : np.ndarray of int32
+        """
+        values = pd.Series(np.asarray(values, dtype=object))
+        missing = values.isna()
+        values = values.astype(str).str.strip()
+        missing = (missing | (values == "")).to_numpy()
+
+        codes = self._index.get_indexer(values)
+        new = (codes < 0) & ~missing
+        if add and new.any():
+            unseen = pd.unique(values[new])
+            self.keys.extend(unseen.tolist())
+            self._index = pd.Index(self.keys, dtype=object)
+            codes = self._index.get_indexer(values)
+        codes[missing | (codes < 0)] = MISSING
+        return codes.astype(np.int32)
+
+    def decode(self, ids):
+        """
+        Player ID strings of integer IDs (MISSING becomes NaN)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        keys = np.array(self.keys + [np.nan], dtype=object)
+        return keys[np.where(ids < 0, len(self.keys), ids)]
+
+    def save(self, path=None):
+        """
+        Write the registry to its csv (or to `path`)
+        """
+        path = self.path if path is None else Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(".tmp")
+        pd.DataFrame({"id": np.arange(len(self.keys)), "key": self.keys}).to_csv(
+            temp, index=False
+        )
+        os.replace(temp, path)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# PURPOSE: "Rating as of date" lookups over Elo output (histories, output frames or the data_elo json export), by binary search over each entity's sorted dates.
+#
+# Usage (one lookup from the DraftGeM export, from the folder holding data_elo):
+#     python3 code_python/draft-gem/eloQuery.py data_elo/nfl_elo.json QB eloC <unique_id> <YYYYMMDD>
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Dates are YYYYMMDD, so entity * SPAN + date orders rows by entity, then date
+SPAN = 10 ** 9
+
+
+def _as_list(value):
+    """
+    A history cell as a list: lists stay lists, csv strings ("[1300, 1310]")
+    are split, and missing cells are empty
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    if isinstance(value, str):
+        items = [x.strip().strip("'\"") for x in value.strip("[]").split(",")]
+        return [x for x in items if x != ""]
+    return []
+
+
+def _listed(cells):
+    """
+    Whether a column holds lists (or csv strings of lists)
+    """
+    for x in cells:
+        if isinstance(x, (list, tuple, np.ndarray)):
+            return True
+        if isinstance(x, str) and x != "":
+            return x.startswith("[")
+    return False
+
+
+class RatingIndex:
+    """
+    As-of index over Elo histories: what was an entity's rating (any history
+    column) on a date.
+
+    Every entity's rows are stored one after another, sorted by date, with one
+    sorted key per row (entity, then date). A lookup is a binary search
+    (`np.searchsorted`) for the last row on or before the date, so one call
+    answers any number of (entity, date) pairs and returns numpy arrays.
+
+    Usage:
+        index = RatingIndex.from_json("data_elo/nfl_elo.json", "QB")
+        index.rating("<unique_id>", 20181209, "eloC")      # one value
+        # every starter (games x 22 IDs) before each game's date (games,)
+        elos = index.ratings(starters, gamedates[:, None], "eloC", pregame=True)
+
+        units = RatingIndex.from_history(passD)               # engine output
+        units.ratings(codes, dates, "elo")
+
+    Input
+    ----------
+        keys : list
+            entity keys (player IDs or team codes), one per entity
+        entity : array of integers
+            row -> position of its entity in `keys`
+        dates : array of integers
+            row -> date (YYYYMMDD)
+        columns : dictionary
+            history column -> array of row values
+    """
+
+    def __init__(self, keys, entity, dates, columns):
+        entity = np.asarray(entity, dtype=np.int64)
+        dates = np.asarray(dates, dtype=np.int64)
+        # Entities' rows together, in date order (ties keep their order)
+        order = np.lexsort((dates, entity))
+        self.keys = list(keys)
+        self._index = pd.Index(self.keys)
+        self._entity = entity[order]
+        self.dates = dates[order]
+        self.columns = {c: np.asarray(v)[order] for c, v in columns.items()}
+        self._sorted = self._entity * SPAN + self.dates
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    # SECTION: Building
+    @classmethod
+    def from_history(cls, history, columns=None):
+        """
+        Index an EloHistory (keys are ID strings if it has a player ID registry)
+
+        Input
+        ----------
+            history : EloHistory
+                players or a team unit
+            columns : list of strings [optional]
+                history columns to index (default all but the date)
+        """
+        n = history._n
+        if columns is None:
+            columns = [c for c in history.columns if c != "date"]
+        keys = history.keys if history.ids is None else history.ids.decode(history.keys).tolist()
+        return cls(
+            keys,
+            history._entity[:n],
+            history._data["date"][:n],
+            {c: history._data[c][:n] for c in columns},
+        )
+
+    @classmethod
+    def from_frame(cls, frame, key, columns=None, date="date"):
+        """
+        Index a frame with one row per entity and list-valued history columns
+        (`EloHistory.to_frame` output, or its csv with the lists as strings)
+
+        Input
+        ----------
+            frame : dataframe
+            key : string
+                entity key column (e.g., "unique_id", "Team Code")
+            columns : list of strings [optional]
+                history columns to index (default every list-valued column but
+                the date)
+            date : string
+                date list column
+        """
+        dates = [_as_list(x) for x in frame[date]]
+        counts = np.array([len(x) for x in dates], dtype=np.int64)
+        if columns is None:
+            columns = [c for c in frame.columns if c not in (date, key) and _listed(frame[c])]
+        values = {}
+        for c in columns:
+            cells = [_as_list(x) for x in frame[c]]
+            if any(len(a) != n for a, n in zip(cells, counts.tolist())):
+                raise ValueError(f"{c} and {date} have different lengths")
+            values[c] = pd.to_numeric(pd.Series([v for a in cells for v in a], dtype=object))
+            values[c] = values[c].to_numpy()
+        return cls(
+            frame[key].tolist(),
+            np.repeat(np.arange(len(frame)), counts),
+            np.array([int(float(d)) for a in dates for d in a], dtype=np.int64),
+            values,
+        )
+
+    @classmethod
+    def from_records(cls, records, prefix, key="unique_id"):
+        """
+        Index one position of the DraftGeM export (records with
+        "<prefix>_<column>" lists, e.g. "QB_eloC" and "QB_date")
+
+        Input
+        ----------
+            records : list of dictionaries
+                contents of data_elo/<league>_elo.json
+            prefix : string
+                position ("QB", "RB", "WR", "DEF")
+            key : string
+                entity key
+        """
+        date = f"{prefix}_date"
+        rows = [r for r in records if len(_as_list(r.get(date))) > 0]
+        names = [
+            k for k in dict.fromkeys(k for r in rows for k in r)
+            if k.startswith(f"{prefix}_") and k != date and _listed(r.get(k) for r in rows)
+        ]
+        frame = pd.DataFrame(
+            {
+                key: [r[key] for r in rows],
+                "date": [r[date] for r in rows],
+                **{k[len(prefix) + 1:]: [r.get(k, []) for r in rows] for k in names},
+            }
+        )
+        columns = [k[len(prefix) + 1:] for k in names]
+        return cls.from_frame(frame, key, columns)
+
+    @classmethod
+    def from_json(cls, path, prefix, key="unique_id"):
+        """
+        `from_records` of a data_elo/<league>_elo.json file
+        """
+        with open(path) as file:
+            return cls.from_records(json.load(file), prefix, key)
+
+    # SECTION: Lookups
+    def _rows(self, keys, dates, pregame):
+        """
+        Row of each (key, date) pair's as-of value, and whether it has one
+        """
+        keys, dates = np.broadcast_arrays(np.asarray(keys), np.asarray(dates, dtype=np.int64))
+        entity = self._index.get_indexer(keys.ravel()).astype(np.int64)
+        query = entity * SPAN + dates.ravel()
+        # Last row before the date (pregame) or on it
+        side = "left" if pregame else "right"
+        pos = np.searchsorted(self._sorted, query, side=side) - 1
+        found = (entity >= 0) & (pos >= 0)
+        found[found] = self._entity[pos[found]] == entity[found]
+        return pos, found, keys.shape
+
+    def ratings(self, keys, dates, column, pregame=False, fill=np.nan):
+        """
+        Values of history columns as of dates, for many entities at once
+
+        Input
+        ----------
+            keys : array-like
+                entity keys
+            dates : array-like of integers
+                dates (YYYYMMDD), broadcast against `keys` (e.g., a (games x
+                22) array of starters with a (games x 1) array of game dates)
+            column : string or list of strings
+                history column(s)
+            pregame : boolean
+                the value before the date's games (otherwise after them)
+            fill : number
+                value for entities without a row by then (or unknown keys)
+        Returns
+        ----------
+            values : np.ndarray (or dictionary column -> np.ndarray)
+                the broadcast shape of `keys` and `dates`
+        """
+        pos, found, shape = self._rows(keys, dates, pregame)
+        names = [column] if isinstance(column, str) else list(column)
+        out = {}
+        for c in names:
+            values = self.columns[c][np.maximum(pos, 0)]
+            out[c] = np.where(found, values, fill).reshape(shape)
+        return out[column] if isinstance(column, str) else out
+
+    def rating(self, key, date, column, pregame=False, fill=np.nan):
+        """
+        One entity's value of a history column as of a date
+        """
+        return self.ratings([key], [date], column, pregame, fill)[0].item()
+
+    def history(self, key, column):
+        """
+        One entity's dates and values of a history column (date order)
+        """
+        i = self._index.get_loc(key)
+        start, end = np.searchsorted(self._entity, [i, i + 1])
+        return self.dates[start:end], self.columns[column][start:end]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 6:
+        print("Usage: eloQuery.py <league>_elo.json POSITION column unique_id YYYYMMDD")
+        exit()
+    path, prefix, column, key, date = sys.argv[1:6]
+    index = RatingIndex.from_json(path, prefix)
+    print(index.rating(key, int(date), column))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# PURPOSE: Cache replays (team unit trajectories, runOldSeasons baselines) keyed by a hash of only the settings they depend on, so tuning runs that change other settings skip them.
+import hashlib
+import json
+import os
+import pickle
+from copy import deepcopy
+from pathlib import Path
+
+
+def config_hash(*parts, **settings):
+    """
+    Stable hash of the settings a replay depends on
+
+    Input
+    ----------
+        parts : positional arguments
+            any JSON-able values (e.g., a kind name, data signature)
+        settings : keyword arguments
+            setting name -> value (order doesn't matter)
+    Returns
+    ----------
+        key : string
+            hex digest
+    """
+    text = json.dumps([parts, settings], sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def data_signature(paths):
+    """
+    Name, size and modification time of each input file (changes whenever a
+    file is rewritten, so cached replays of old data aren't reused)
+    """
+    signature = []
+    for path in paths:
+        path = Path(path)
+        if path.exists():
+            stat = path.stat()
+            signature.append([str(path), stat.st_size, stat.st_mtime_ns])
+        else:
+            signature.append([str(path), None, None])
+    return signature
+
+
+class ReplayCache:
+    """
+    Memory (and optionally disk) cache of replay results.
+
+    Values are deep-copied going in and out, so callers can keep updating
+    what they get back (e.g., EloHistory objects) without touching the cache.
+
+    Usage:
+        cache = ReplayCache(Path("data_cache"))
+        key = config_hash("nfl teams", teamK=teamK, rushDdrawline=rushDdrawline)
+        teams = cache.get(key)
+        if teams is None:
+            teams = replay()
+            cache.put(key, teams)
+
+    Input
+    ----------
+        directory : string or path [optional]
+            folder for pickled entries (memory only if not given)
+    """
+
+    def __init__(self, directory=None):
+        self.directory = None if directory is None else Path(directory)
+        self.entries = {}
+
+    def _path(self, key):
+        return self.directory.joinpath(f"{key}.pkl")
+
+    def __contains__(self, key):
+        if key in self.entries:
+            return True
+        return self.directory is not None and self._path(key).exists()
+
+    def get(self, key):
+        """
+        Copy of a cached value (None if not cached)
+        """
+        if key not in self.entries:
+            if self.directory is None or not self._path(key).exists():
+                return None
+            with open(self._path(key), "rb") as file:
+                self.entries[key] = pickle.load(file)
+        return deepcopy(self.entries[key])
+
+    def put(self, key, value):
+        """
+        Cache a copy of `value`
+        """
+        self.entries[key] = deepcopy(value)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+            with open(temp, "wb") as file:
+                pickle.dump(self.entries[key], file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self._path(key))
+
+    def fetch(self, key, compute):
+        """
+        Cached value of `key`, computing (and caching) it with `compute()` if needed
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# PURPOSE: Stream game statistics across season files in date order (a k-way merge by gamedate), one season at a time and only the columns asked for, so multi-season replays hold about one season in memory.
+#
+# Usage:
+#     players = season_files(Path("..", "data_raw", "fantasy"), "fantasy-player-game-statistics", range(1999, 2019 + 1))
+#     teams = season_files(Path("..", "data_raw", "fantasy"), "fantasy-team-game-statistics", range(1999, 2019 + 1))
+#     sources = {
+#         "players": (players, eu.readplayergamestats, ["Game Code", "unique_id", "Pos", "Rush Yard"]),
+#         "teams": (teams, lambda path, usecols: eu.readteamgamedata(path, True, usecols), None),
+#     }
+#     for season, frames in stream_seasons(sources):
+#         ...  # frames["players"], frames["teams"]: the season's rows, by date
+import heapq
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import eloUtilities as eu
+
+
+def season_files(folder, root, seasons, extension=".csv"):
+    """
+    (season, path) of each season's statistics file ("<root><season><extension>")
+    """
+    return [(season, Path(folder, f"{root}{season}{extension}")) for season in seasons]
+
+
+def date_chunks(path, read, usecols=None, key="gamedate"):
+    """
+    A file's rows one date at a time (rows keep their order within a date)
+
+    Input
+    ----------
+        path : path
+        read : function
+            read(path, usecols) -> dataframe with a `key` column (e.g.,
+            eloUtilities.readplayergamestats)
+        usecols : list [optional]
+            columns to read (all if not given)
+        key : string
+            date column
+    Returns
+    ----------
+        chunks : generator of (date, dataframe)
+    """
+    frame = read(path, usecols)
+    keys = frame[key].to_numpy()
+    order = np.argsort(keys, kind="stable")
+    frame = frame.iloc[order].reset_index(drop=True)
+    dates, starts = np.unique(keys[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+    for date, start, end in zip(dates.tolist(), starts.tolist(), ends.tolist()):
+        yield date, frame.iloc[start:end]
+
+
+def merge_dates(files, read, usecols=None, key="gamedate", cutoff=700):
+    """
+    Rows of several season files merged in date order (a k-way merge; rows of
+    one date from several files come in the order of the files)
+
+    A file is only read once the merge reaches the first day of its season
+    (`cutoff` as MMDD, see eloUtilities.season_of) and is dropped once its last
+    date is out, so only the files whose seasons overlap are in memory.
+
+    Input
+    ----------
+        files : list of (season, path)
+        read, usecols, key :
+            as in `date_chunks`
+        cutoff : integer
+            MMDD a season starts on
+    Returns
+    ----------
+        chunks : generator of (date, dataframe)
+    """
+    pending = deque(sorted(files, key=lambda f: f[0]))
+    heap = []
+    order = 0
+    while pending or heap:
+        # Open the files whose season may have started
+        while pending and (not heap or pending[0][0] * 10000 + cutoff <= heap[0][0]):
+            _, path = pending.popleft()
+            chunks = date_chunks(path, read, usecols, key)
+            first = next(chunks, None)
+            if first is not None:
+                heapq.heappush(heap, (first[0], order, first[1], chunks))
+            order += 1
+        if not heap:
+            continue
+        date, i, frame, chunks = heapq.heappop(heap)
+        yield date, frame
+        following = next(chunks, None)
+        if following is not None:
+            heapq.heappush(heap, (following[0], i, following[1], chunks))
+
+
+def seasons(chunks, cutoff=700):
+    """
+    Date chunks (from `merge_dates`) grouped into seasons
+
+    Returns
+    ----------
+        seasons : generator of (season, dataframe)
+            the season's rows in date order
+    """
+    season, parts = None, []
+    for date, frame in chunks:
+        this = int(eu.season_of(date, cutoff))
+        if parts and this != season:
+            yield season, pd.concat(parts, ignore_index=True)
+            parts = []
+        season = this
+        parts.append(frame)
+    if parts:
+        yield season, pd.concat(parts, ignore_index=True)
+
+
+def stream_seasons(sources, key="gamedate", cutoff=700):
+    """
+    Several streams of season files, season by season
+
+    Input
+    ----------
+        sources : dictionary
+            name -> (files, read, usecols), as in `merge_dates`
+        key : string
+            date column
+        cutoff : integer
+            MMDD a season starts on
+    Returns
+    ----------
+        stream : generator of (season, frames)
+            frames: name -> the season's rows in date order (sources without
+            rows that season are left out)
+    """
+    streams = {
+        name: seasons(merge_dates(files, read, usecols, key, cutoff), cutoff)
+        for name, (files, read, usecols) in sources.items()
+    }
+    heads = {name: next(stream, None) for name, stream in streams.items()}
+    while any(head is not None for head in heads.values()):
+        season = min(head[0] for head in heads.values() if head is not None)
+        frames = {}
+        for name, head in heads.items():
+            if head is not None and head[0] == season:
+                frames[name] = head[1]
+                heads[name] = next(streams[name], None)
+        yield season, frames
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# PURPOSE: Game data in shared memory: numpy arrays (and dataframes built on them) copied once by a parent process and read in place by its worker processes.
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+class SharedArrays:
+    """
+    Numpy arrays copied once into one shared memory block. Worker processes
+    attach to the block by name and read the arrays in place (read-only), so
+    the game data is neither pickled to every worker nor copied per process.
+
+    Usage:
+        shared = SharedArrays({"2019/teams/gamedate": dates, ...})
+        ...                                  # in a worker:
+        arrays = SharedArrays.attach(shared.spec).arrays
+        ...
+        shared.close()                       # (frees the block)
+
+    Input
+    ----------
+        arrays : dictionary
+            name -> numpy array (numbers or booleans)
+    """
+
+    def __init__(self, arrays=None, spec=None):
+        if spec is None:
+            layout = []
+            size = 0
+            for name, values in arrays.items():
+                values = np.asarray(values)
+                layout.append((name, values.dtype.str, values.shape, size))
+                # (each array starts on an 8-byte boundary)
+                size += -(-values.nbytes // 8) * 8
+            self.block = shared_memory.SharedMemory(create=True, size=max(size, 8))
+            self.owner = True
+            self.spec = (self.block.name, layout)
+            for (_, dtype, shape, start), values in zip(layout, arrays.values()):
+                np.ndarray(shape, dtype, self.block.buf, start)[...] = values
+        else:
+            self.block = shared_memory.SharedMemory(name=spec[0])
+            self.owner = False
+            self.spec = spec
+        self.arrays = {
+            name: np.ndarray(shape, dtype, self.block.buf, start)
+            for name, dtype, shape, start in self.spec[1]
+        }
+        if not self.owner:
+            # (readers can't change what the other processes see)
+            for values in self.arrays.values():
+                values.flags.writeable = False
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        The arrays of a block made by another process (its `spec`)
+        """
+        return cls(spec=spec)
+
+    def close(self):
+        """
+        Release the arrays (and free the block, in the process that made it)
+        """
+        self.arrays = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+
+class SharedTables:
+    """
+    Dataframes (e.g., raw game statistics files) in one SharedArrays block.
+
+    Number and boolean columns are stored as they are and come back as views
+    of the block; text columns are stored as fixed-width strings (with a
+    missing-value mask) and come back as Python strings, so a rebuilt frame
+    equals the original without parsing the file again.
+
+    Usage:
+        tables = SharedTables({path: pd.read_csv(path), ...})
+        ...                                  # in a worker:
+        frame = SharedTables.attach(tables.spec).frame(path)
+        ...
+        tables.close()
+
+    Input
+    ----------
+        frames : dictionary
+            key -> dataframe
+    """
+
+    def __init__(self, frames=None, spec=None):
+        if spec is None:
+            arrays = {}
+            layout = {}
+            for key, frame in frames.items():
+                columns = []
+                for i, c in enumerate(frame.columns):
+                    values = frame[c].to_numpy()
+                    if values.dtype.kind in "biuf":
+                        arrays[f"{key}|{i}"] = values
+                        columns.append((c, False))
+                    else:
+                        missing = frame[c].isna().to_numpy()
+                        text = frame[c].astype(object).where(~missing, "").map(str)
+                        arrays[f"{key}|{i}"] = text.to_numpy().astype(str)
+                        arrays[f"{key}|{i}|missing"] = missing
+                        columns.append((c, True))
+                layout[key] = columns
+            self.shared = SharedArrays(arrays)
+            self.spec = (self.shared.spec, layout)
+        else:
+            self.shared = SharedArrays.attach(spec[0])
+            self.spec = spec
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        The tables of a block made by another process (its `spec`)
+        """
+        return cls(spec=spec)
+
+    def __contains__(self, key):
+        return key in self.spec[1]
+
+    def frame(self, key):
+        """
+        The dataframe stored under `key`
+        """
+        arrays = self.shared.arrays
+        columns = {}
+        for i, (c, text) in enumerate(self.spec[1][key]):
+            values = arrays[f"{key}|{i}"]
+            if text:
+                values = values.astype(object)
+                values[arrays[f"{key}|{i}|missing"]] = np.nan
+            columns[c] = values
+        return pd.DataFrame(columns, copy=False)
+
+    def close(self):
+        """
+        Release the tables (and free the block, in the process that made it)
+        """
+        self.shared.close()
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# PURPOSE: Monte Carlo season simulator on team Elo: plays out a season's remaining schedule many times (every simulation at once, one sims x games step per date) and reports win-total distributions, conference title odds and playoff odds per team.
+#
+# Usage (from the folder holding data_raw and data_team, after saving Elo output):
+#     python3 code_python/draft-gem/eloSimulate.py cfb 2019 [sims=100000] [workers=8] [seed=0] [asof=YYYYMMDD]
+import multiprocessing
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import eloUtilities as eu
+from eloQuery import RatingIndex
+
+# Config section and schedule file name of each league
+LEAGUES = {"cfb": "college", "nfl": "nfl"}
+
+
+# SECTION: Inputs
+def read_schedule(league, season, root=Path("data_team", "schedules"), postseason=False):
+    """
+    A season's regular-season schedule (scrape_schedules.py output)
+
+    Input
+    ----------
+        league : string
+            schedule file name ("ncaa" or "nfl")
+        season : integer
+        root : path
+            folder of the schedule files
+        postseason : boolean
+            keep postseason games too
+    Returns
+    ----------
+        schedule : dataframe
+            one row per game (date order) with date, home/away team names,
+            codes and points (missing for unplayed games) and neutral_site
+    """
+    schedule = pd.read_csv(root.joinpath(f"schedule_{league}_{season}.csv"))
+    if "neutral_site" not in schedule.columns:
+        schedule["neutral_site"] = False
+    schedule["neutral_site"] = schedule["neutral_site"].fillna(False).astype(bool)
+
+    # Postseason games have named weeks (nfl) or restart at week 1 after the
+    # regular season has begun its second week (college bowls)
+    if not postseason:
+        week = pd.to_numeric(schedule["week"], errors="coerce")
+        second = schedule.loc[week == 2, "date"]
+        bowl = (week == 1) & (schedule["date"] > second.min()) if len(second) else False
+        schedule = schedule[week.notna() & ~bowl].copy()
+
+    # A game listed twice is played once
+    schedule = schedule.drop_duplicates(subset=["date", "home_code", "away_code"])
+    schedule = schedule.sort_values("date", kind="stable").reset_index(drop=True)
+    return schedule
+
+
+def team_ratings(units, weights, codes=None, asof=None):
+    """
+    Team strength from the team unit ratings: the weighted mean of each
+    team's unit Elos
+
+    Input
+    ----------
+        units : dictionary
+            unit name -> compute_elo output frame (or its saved csv), with
+            "Team Code", "last" and the "elo"/"date" lists
+        weights : dictionary
+            unit name -> weight (e.g., {"rushO": 1, "rushD": 1, ...})
+        codes : list of integers [optional]
+            teams to rate (default every team of the first unit)
+        asof : integer [optional]
+            rate teams as of this date's games (YYYYMMDD) instead of at the
+            end of the replay
+    Returns
+    ----------
+        ratings : series
+            team code -> rating (missing for teams without every unit)
+    """
+    total = sum(weights.values())
+    if codes is None:
+        codes = units[next(iter(weights))]["Team Code"].tolist()
+    rating = pd.Series(0.0, index=pd.Index(codes, name="Team Code"))
+    for name, weight in weights.items():
+        frame = units[name]
+        if asof is None:
+            values = frame.set_index("Team Code")["last"].reindex(rating.index)
+        else:
+            index = RatingIndex.from_frame(frame, "Team Code", ["elo"])
+            values = pd.Series(index.ratings(list(rating.index), asof, "elo"), index=rating.index)
+        rating += weight * values.astype(np.float64) / total
+    return rating
+
+
+def read_units(config, league, root=Path("data_raw")):
+    """
+    Saved team unit outputs named in a league's "simulate" config
+    """
+    files = config["computeElo"][LEAGUES[league]]["simulate"]["unitFiles"]
+    return {name: pd.read_csv(root.joinpath(f)) for name, f in files.items()}
+
+
+# SECTION: Simulation
+def _batches(rows, home, away):
+    """
+    Split a date's games so no team plays twice in a batch (a team listed in
+    two games of a date plays them one after the other)
+    """
+    if len(np.unique(np.r_[home, away])) == 2 * len(rows):
+        return [rows]
+    level = np.zeros(len(rows), dtype=np.int64)
+    latest = {}
+    for i, teams in enumerate(zip(home.tolist(), away.tolist())):
+        level[i] = max(latest.get(t, -1) for t in teams) + 1
+        for t in teams:
+            latest[t] = level[i]
+    return [rows[level == k] for k in range(level.max() + 1)]
+
+
+class SeasonSimulator:
+    """
+    Plays out a season's remaining games `sims` times over.
+
+    Each simulation carries its own copy of every team's rating and record.
+    A date's games are one step over a (sims x games) array: the home win
+    probability (`eloUtilities.probabilityBatch`, with home field), one
+    uniform draw per game, the wins, and (with K > 0) the Elo update of both
+    teams, so ratings move within a simulated season ("hot" simulation).
+    Simulations run in chunks (each with its own random stream, so results
+    don't depend on the number of workers), optionally across a process pool.
+
+    At the end of a simulated season:
+        - conference title: best conference record ("conference" title) or
+          best overall record ("overall") among a conference's teams
+        - playoff: the top `teams` by wins, across the league ("league") or
+          in each conference ("conference"), of the eligible teams
+    Ties are broken by the simulated end-of-season rating.
+
+    Usage:
+        sim = SeasonSimulator(schedule, ratings, conferences, homeField=65, K=20)
+        result = sim.simulate(100000, seed=0, workers=8)
+        result["teams"]                         # odds per team
+        result["wins"]                          # win-total distributions
+
+    Input
+    ----------
+        schedule : dataframe
+            `read_schedule` output
+        ratings : series
+            team code -> rating (`team_ratings`)
+        conferences : series [optional]
+            team code -> conference (teams without one don't play for a title)
+        homeField : number
+            Elo points added to the home team (not at neutral sites)
+        K : number
+            Elo K factor of the in-season updates (0 keeps ratings fixed)
+        playoff : dictionary [optional]
+            {"teams": n, "per": "league" or "conference"}
+        title : string
+            "conference" or "overall" record decides conference titles
+        eligible : list of integers [optional]
+            team codes that can make the playoff (default all)
+        missing : number
+            rating of scheduled teams without one (e.g., lower divisions)
+        asof : integer [optional]
+            games after this date are simulated even if they have a result
+            (default: every game with a result counts as played)
+    """
+
+    def __init__(
+        self,
+        schedule,
+        ratings,
+        conferences=None,
+        homeField=0,
+        K=0,
+        playoff=None,
+        title="conference",
+        eligible=None,
+        missing=1200,
+        asof=None,
+    ):
+        codes = np.unique(np.r_[schedule["home_code"], schedule["away_code"]]).astype(np.int64)
+        self.codes = codes
+        names = pd.concat(
+            [
+                schedule.set_index("home_code")["home_team"],
+                schedule.set_index("away_code")["away_team"],
+            ]
+        )
+        self.names = names[~names.index.duplicated()].reindex(codes)
+        self.ratings = ratings.reindex(codes).fillna(missing).to_numpy(np.float64)
+        if conferences is None:
+            conferences = pd.Series(dtype=object)
+        self.conferences = conferences.reindex(codes)
+        self.homeField = homeField
+        self.K = K
+        self.playoff = playoff
+        self.title = title
+        eligible = codes if eligible is None else eligible
+        self.eligible = np.isin(codes, eligible)
+
+        home = np.searchsorted(codes, schedule["home_code"].to_numpy())
+        away = np.searchsorted(codes, schedule["away_code"].to_numpy())
+        conf = self.conferences.to_numpy()
+        inConf = pd.notna(conf[home]) & (conf[home] == conf[away])
+        played = schedule["home_points"].notna() & schedule["away_points"].notna()
+        if asof is not None:
+            played &= schedule["date"] <= asof
+        played = played.to_numpy()
+
+        # Results so far
+        homeWin = (schedule["home_points"] > schedule["away_points"]).to_numpy()
+        awayWin = (schedule["away_points"] > schedule["home_points"]).to_numpy()
+        n = len(codes)
+        self.wins = (
+            np.bincount(home[played & homeWin], minlength=n)
+            + np.bincount(away[played & awayWin], minlength=n)
+        )
+        self.confWins = (
+            np.bincount(home[played & homeWin & inConf], minlength=n)
+            + np.bincount(away[played & awayWin & inConf], minlength=n)
+        )
+        self.confGames = np.bincount(home[inConf], minlength=n) + np.bincount(away[inConf], minlength=n)
+        self.games = np.bincount(home, minlength=n) + np.bincount(away, minlength=n)
+
+        # Remaining games, by date, in batches without a repeated team
+        self.steps = []
+        rest = schedule.index[~played].to_numpy()
+        dates = schedule["date"].to_numpy()[rest]
+        neutral = schedule["neutral_site"].to_numpy()
+        for date in np.unique(dates):
+            rows = rest[dates == date]
+            for r in _batches(rows, home[rows], away[rows]):
+                self.steps.append(
+                    (home[r], away[r], np.where(neutral[r], 0.0, homeField), inConf[r])
+                )
+
+        # Conference members (teams without a conference are left out)
+        self.groups = {
+            c: np.flatnonzero(conf == c) for c in pd.unique(conf[pd.notna(conf)])
+        }
+
+    def _play(self, sims, seed):
+        """
+        Simulate `sims` seasons with one random stream
+
+        Returns
+        ----------
+            counts : dictionary
+                "wins" (teams x win totals), "titles" and "playoffs" (teams)
+                counts over the simulations
+        """
+        rng = np.random.default_rng(seed)
+        n = len(self.codes)
+        # Teams x simulations, so a game's teams are contiguous rows
+        ratings = np.repeat(self.ratings[:, None], sims, axis=1)
+        wins = np.repeat(self.wins[:, None], sims, axis=1)
+        confWins = np.repeat(self.confWins[:, None], sims, axis=1)
+
+        for home, away, field, conf in self.steps:
+            prob = eu.probabilityBatch(ratings[away], ratings[home] + field[:, None])
+            homeWin = rng.random(prob.shape) < prob
+            wins[home] += homeWin
+            wins[away] += ~homeWin
+            confWins[home[conf]] += homeWin[conf]
+            confWins[away[conf]] += ~homeWin[conf]
+            if self.K:
+                change = self.K * (homeWin - prob)
+                ratings[home] += change
+                ratings[away] -= change
+
+        # Rank keys: the record first, then the end-of-season rating (plus
+        # less than a point of noise so equal ratings don't favour one team)
+        overall = wins + (ratings + rng.random(ratings.shape)) / 1e7
+        if self.title == "conference":
+            share = confWins / np.maximum(self.confGames, 1)[:, None]
+            record = share * 1000 + overall
+        else:
+            record = overall
+
+        counts = {
+            "wins": np.zeros((n, self.games.max() + 1), dtype=np.int64),
+            "titles": np.zeros(n, dtype=np.int64),
+            "playoffs": np.zeros(n, dtype=np.int64),
+        }
+        flat = (np.arange(n)[:, None] * counts["wins"].shape[1] + wins).ravel()
+        counts["wins"] += np.bincount(flat, minlength=counts["wins"].size).reshape(n, -1)
+
+        for members in self.groups.values():
+            if len(members) < 2:
+                continue
+            best = members[np.argmax(record[members], axis=0)]
+            counts["titles"] += np.bincount(best, minlength=n)
+
+        if self.playoff is not None:
+            if self.playoff["per"] == "conference":
+                pools = self.groups.values()
+            else:
+                pools = [np.arange(n)]
+            for members in pools:
+                members = members[self.eligible[members]]
+                top = min(self.playoff["teams"], len(members))
+                if top == 0:
+                    continue
+                picks = np.argpartition(-overall[members], top - 1, axis=0)[:top]
+                counts["playoffs"] += np.bincount(members[picks].ravel(), minlength=n)
+        return counts
+
+    def simulate(self, sims=10000, seed=None, workers=None, chunk=20000):
+        """
+        Simulate the rest of the season
+
+        Input
+        ----------
+            sims : integer
+                number of simulated seasons
+            seed : integer [optional]
+                random seed (same seed and chunk, same results)
+            workers : integer [optional]
+                processes to spread the chunks over (default: this process)
+            chunk : integer
+                simulations per chunk (bounds memory: sims x teams ratings)
+        Returns
+        ----------
+            result : dictionary
+                "teams": per team rating, mean wins, title and playoff odds
+                (best first); "wins": teams x win totals probabilities
+        """
+        sizes = [min(chunk, sims - i) for i in range(0, sims, chunk)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        if workers is not None and workers > 1 and len(sizes) > 1:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(workers) as pool:
+                parts = pool.starmap(self._play, zip(sizes, seeds))
+        else:
+            parts = [self._play(s, q) for s, q in zip(sizes, seeds)]
+        counts = {k: sum(p[k] for p in parts) for k in parts[0]}
+
+        index = pd.Index(self.codes, name="Team Code")
+        wins = pd.DataFrame(counts["wins"] / sims, index=index)
+        wins.columns.name = "wins"
+        teams = pd.DataFrame(
+            {
+                "team": self.names.to_numpy(),
+                "conference": self.conferences.to_numpy(),
+                "rating": self.ratings,
+                "games": self.games,
+                "wins": self.wins,
+                "meanWins": (counts["wins"] * np.arange(counts["wins"].shape[1])).sum(axis=1) / sims,
+                "title": counts["titles"] / sims,
+                "playoff": counts["playoffs"] / sims,
+            },
+            index=index,
+        )
+        teams = teams.sort_values(["playoff", "title", "meanWins"], ascending=False)
+        return {"teams": teams, "wins": wins.loc[teams.index]}
+
+
+def from_config(config, league, season, units, asof=None, root=Path("data_team")):
+    """
+    SeasonSimulator for a league's season with its "simulate" settings in
+    elo_config.json
+
+    Input
+    ----------
+        config : dictionary
+            elo_config.json contents
+        league : string
+            "cfb" or "nfl"
+        season : integer
+        units : dictionary
+            unit name -> compute_elo output frame (or `read_units`)
+        asof : integer [optional]
+            simulate from this date (ratings as of it, later games replayed)
+        root : path
+            folder of the team files and schedules
+    """
+    cfg = config["computeElo"][LEAGUES[league]]["simulate"]
+    schedule = read_schedule(cfg["schedule"], season, root.joinpath("schedules"))
+    codes = np.unique(np.r_[schedule["home_code"], schedule["away_code"]]).tolist()
+    ratings = team_ratings(units, cfg["units"], codes, asof)
+
+    if "conferences" in cfg:
+        # Team names per conference
+        names = pd.concat(
+            [
+                schedule.set_index("home_team")["home_code"],
+                schedule.set_index("away_team")["away_code"],
+            ]
+        )
+        names = names[~names.index.duplicated()]
+        conferences = pd.Series(
+            {names[t]: c for c, teams in cfg["conferences"].items() for t in teams if t in names}
+        )
+        eligible = None
+    else:
+        teams = pd.read_csv(root.joinpath(cfg["teamsfile"])).set_index("TeamCode")
+        conferences = teams["Conference"].where(~teams["Conference"].isin(cfg["independents"]))
+        eligible = teams.index[teams[cfg["eligible"]].astype(str) == "True"].tolist()
+
+    return SeasonSimulator(
+        schedule,
+        ratings,
+        conferences,
+        homeField=cfg["homeField"],
+        K=cfg["K"],
+        playoff=cfg["playoff"],
+        title=cfg["title"],
+        eligible=eligible,
+        missing=cfg["missingRating"],
+        asof=asof,
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: eloSimulate.py cfb|nfl season [sims=N] [workers=N] [seed=N] [asof=YYYYMMDD]")
+        exit()
+    league, season = sys.argv[1], int(sys.argv[2])
+    options = dict(x.split("=", 1) for x in sys.argv[3:] if "=" in x)
+    asof = int(options["asof"]) if "asof" in options else None
+    config = eu.load_config()
+    sim = from_config(config, league, season, read_units(config, league), asof)
+    result = sim.simulate(
+        int(options.get("sims", 100000)),
+        int(options["seed"]) if "seed" in options else None,
+        int(options["workers"]) if "workers" in options else None,
+    )
+    print(result["teams"].head(25).to_string())
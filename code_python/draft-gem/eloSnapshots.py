@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# PURPOSE: Weekly leaderboard snapshots (top-N players or team units by a rating) taken during the replay and stored per season, so a week's board is one indexed read instead of a rebuild from full histories.
+#
+# Usage (print a stored board, from the folder holding data_snapshots):
+#     python3 code_python/draft-gem/eloSnapshots.py nfl 2018 5 rushers_last [50]
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from eloDates import day_numbers
+
+
+def season_weeks(dates):
+    """
+    Week number of each of a season's game dates: week 1 is the 7 days from
+    the season's first date, week 2 the next 7, and so on
+
+    Input
+    ----------
+        dates : list of integers
+            the season's game dates (YYYYMMDD)
+    Returns
+    ----------
+        weeks : list of integers
+    """
+    if len(dates) == 0:
+        return []
+    days = day_numbers(dates)
+    return ((days - days.min()) // 7 + 1).tolist()
+
+
+def snapshot_path(directory, league, season):
+    """
+    File holding a league's boards for one season
+    """
+    return Path(directory, f"{league}_{season}.npz")
+
+
+class Leaderboards:
+    """
+    Takes weekly top-N boards during a replay and writes one compressed file
+    per season (`data_snapshots/<league>_<season>.npz`).
+
+    A board ranks the entities of one history (players of a position group or
+    a team unit) that have played in the season so far by one rating: a
+    record key (e.g., "last") or the latest value of a history column (e.g.,
+    "elo"). Rows are stored sorted by week, board and rank with an offset
+    table, so `SnapshotReader.top` reads a board with one lookup.
+
+    Usage:
+        boards = Leaderboards(cfg["leaderboards"], Path("data_snapshots"), "nfl")
+        for season in seasons:
+            boards.begin(season, dates)
+            for date in dates:
+                ...                                   # the date's updates
+                if boards.week_end(date):             # flush a compiled replay
+                    ...
+                boards.after(date, sources)           # name -> EloHistory
+
+    Input
+    ----------
+        specs : list of dictionaries
+            boards, each {"group", "metric", "top"} and optionally "name"
+            (default "<group>_<metric>") and "ascending" (lowest first)
+        directory : string or path
+            folder for the season files
+        league : string
+            file name prefix ("cfb", "nfl", ...)
+    """
+
+    def __init__(self, specs, directory=Path("data_snapshots"), league="nfl"):
+        self.specs = [dict(s, name=s.get("name", f"{s['group']}_{s['metric']}")) for s in specs]
+        self.names = [s["name"] for s in self.specs]
+        self.directory = Path(directory)
+        self.league = league
+        self.season = None
+        self._weeks = {}
+        self._rows = []
+
+    def begin(self, season, dates):
+        """
+        Start a season (all its game dates, for the week numbers)
+        """
+        self.season = season
+        dates = sorted(dates)
+        weeks = season_weeks(dates)
+        self._start = dates[0] if dates else 0
+        self._weeks = dict(zip(dates, weeks))
+        # Last date of each week, and of the season
+        self._ends = {d for d, w, n in zip(dates, weeks, weeks[1:] + [None]) if w != n}
+        self._last = dates[-1] if dates else None
+        self._rows = []
+
+    def week_end(self, date):
+        """
+        Whether `date` is the last game date of its week
+        """
+        return date in self._ends
+
+    def after(self, date, sources):
+        """
+        Take the boards if `date` ends a week (after its updates), and write
+        the season's file after its last date
+
+        Input
+        ----------
+            date : integer
+                processed game date (YYYYMMDD)
+            sources : dictionary
+                group name -> EloHistory
+        """
+        if self.week_end(date):
+            self.take(self._weeks[date], date, sources)
+        if date == self._last:
+            self.write()
+
+    def take(self, week, date, sources):
+        """
+        Rank every board's active entities as they stand now
+        """
+        for b, spec in enumerate(self.specs):
+            history = sources[spec["group"]]
+            if len(history) == 0:
+                continue
+            idx = np.arange(len(history))
+            # Entities with a game in the season so far
+            idx = idx[history.lasts(idx, "date") >= self._start]
+            if len(idx) == 0:
+                continue
+            keys = [history.keys[i] for i in idx.tolist()]
+            if spec["metric"] in history.scalars:
+                values = np.array([history.records[k][spec["metric"]] for k in keys])
+            else:
+                values = history.lasts(idx, spec["metric"])
+            names = keys if history.ids is None else history.ids.decode(keys).tolist()
+            names = np.array([str(x) for x in names])
+
+            # Best first (ties by key), competition ranks (1, 2, 2, 4, ...)
+            order = np.lexsort((names, values if spec.get("ascending") else -values))
+            values = values[order]
+            first = np.r_[True, values[1:] != values[:-1]]
+            rank = np.maximum.accumulate(np.where(first, np.arange(len(values)), 0)) + 1
+            top = spec["top"]
+            self._rows.append(
+                pd.DataFrame(
+                    {
+                        "week": week,
+                        "board": b,
+                        "date": date,
+                        "entity": names[order][:top],
+                        "rating": values[:top].astype(np.float64),
+                        "rank": rank[:top],
+                    }
+                )
+            )
+
+    def write(self):
+        """
+        Write the season's boards (weeks taken in an earlier run that this
+        run didn't retake are kept)
+        """
+        if self.season is None:
+            return
+        frame = pd.concat(self._rows, ignore_index=True) if self._rows else None
+        path = snapshot_path(self.directory, self.league, self.season)
+        if path.exists():
+            old = SnapshotReader(self.directory, self.league).frame(self.season)
+            old["board"] = [
+                self.names.index(n) if n in self.names else -1 for n in old["board"]
+            ]
+            old = old[old["board"] >= 0]
+            if frame is not None:
+                old = old[~old["week"].isin(frame["week"].unique())]
+            frame = pd.concat([old, frame], ignore_index=True)
+        if frame is None or len(frame) == 0:
+            return
+        frame = frame.sort_values(["week", "board", "rank"], kind="stable")
+
+        # Entity keys once per file; offsets of each (week, board) block
+        keys, entity = np.unique(frame["entity"].to_numpy().astype(str), return_inverse=True)
+        week = frame["week"].to_numpy()
+        board = frame["board"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, (week[1:] != week[:-1]) | (board[1:] != board[:-1])])
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(".tmp.npz")
+        np.savez_compressed(
+            temp,
+            names=np.array(self.names),
+            keys=keys,
+            entity=entity.astype(np.int32),
+            rating=frame["rating"].to_numpy(),
+            rank=frame["rank"].to_numpy().astype(np.int32),
+            blockWeek=week[starts].astype(np.int32),
+            blockBoard=board[starts].astype(np.int32),
+            blockDate=frame["date"].to_numpy()[starts].astype(np.int64),
+            blockStart=np.r_[starts, len(frame)].astype(np.int64),
+        )
+        os.replace(temp, path)
+
+
+class SnapshotReader:
+    """
+    Reads the boards written by `Leaderboards` (season files are loaded once)
+
+    Usage:
+        boards = SnapshotReader(Path("data_snapshots"), "nfl")
+        boards.top(2018, 5, "rushers_last", 50)
+
+    Input
+    ----------
+        directory : string or path
+            folder of the season files
+        league : string
+            file name prefix
+    """
+
+    def __init__(self, directory=Path("data_snapshots"), league="nfl"):
+        self.directory = Path(directory)
+        self.league = league
+        self._files = {}
+
+    def _load(self, season):
+        if season not in self._files:
+            with np.load(snapshot_path(self.directory, self.league, season)) as data:
+                self._files[season] = {k: data[k] for k in data.files}
+        return self._files[season]
+
+    def weeks(self, season):
+        """
+        Weeks with boards in a season
+        """
+        return np.unique(self._load(season)["blockWeek"]).tolist()
+
+    def top(self, season, week, board, n=None):
+        """
+        The top `n` (default all stored) of a board in a week
+
+        Returns
+        ----------
+            board : dataframe
+                rank, entity (player ID or team code, as strings) and rating,
+                best first
+        """
+        data = self._load(season)
+        names = data["names"].tolist()
+        if board not in names:
+            raise KeyError(f"No board {board!r} (boards: {names})")
+        key = np.int64(week) * len(names) + names.index(board)
+        blocks = data["blockWeek"].astype(np.int64) * len(names) + data["blockBoard"]
+        i = np.searchsorted(blocks, key)
+        if i == len(blocks) or blocks[i] != key:
+            raise KeyError(f"No {board} board for {season} week {week}")
+        start, end = data["blockStart"][i], data["blockStart"][i + 1]
+        if n is not None:
+            end = min(end, start + n)
+        return pd.DataFrame(
+            {
+                "rank": data["rank"][start:end],
+                "entity": data["keys"][data["entity"][start:end]],
+                "rating": data["rating"][start:end],
+            }
+        )
+
+    def frame(self, season):
+        """
+        Every stored row of a season (week, board name, date, entity, rating, rank)
+        """
+        data = self._load(season)
+        counts = np.diff(data["blockStart"])
+        return pd.DataFrame(
+            {
+                "week": np.repeat(data["blockWeek"], counts),
+                "board": data["names"][np.repeat(data["blockBoard"], counts)],
+                "date": np.repeat(data["blockDate"], counts),
+                "entity": data["keys"][data["entity"]],
+                "rating": data["rating"],
+                "rank": data["rank"],
+            }
+        )
+
+
+def from_config(config, league, name):
+    """
+    Leaderboards for a league's "leaderboards" in elo_config.json (None if
+    it has none)
+
+    Input
+    ----------
+        config : dictionary
+            elo_config.json contents
+        league : string
+            computeElo section ("college", "nfl", "fantasy")
+        name : string
+            file name prefix ("cfb", "nfl", "fantasy")
+    """
+    specs = config["computeElo"][league].get("leaderboards")
+    if not specs:
+        return None
+    return Leaderboards(specs, Path("data_snapshots"), name)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 5:
+        print("Usage: eloSnapshots.py league season week board [n]")
+        exit()
+    league, season, week, board = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), sys.argv[4]
+    n = int(sys.argv[5]) if len(sys.argv) > 5 else None
+    print(SnapshotReader(Path("data_snapshots"), league).top(season, week, board, n).to_string(index=False))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# PURPOSE: Dense, Team Code-indexed table of the team units' current ratings, so the team loops read and write ratings by array indexing instead of per-team history lookups.
+import numpy as np
+
+from eloUtilities import updateEloBatch
+
+
+def conflict_batches(us, them):
+    """
+    Split a date's team game rows into batches that can be updated in one
+    vectorized step: no two rows of a batch share a defense team (`us`) or an
+    offense team (`them`), and every row comes after the earlier rows it
+    shares a team with. Updating batch by batch then gives the ratings that
+    updating row by row does.
+
+    A team plays once a date, so this is almost always a single batch; a team
+    listed twice on a side (a repeated or doubled-up game) pushes its later
+    rows into later batches.
+
+    Input
+    ----------
+        us : array of integers
+            defending team codes, one per game row
+        them : array of integers
+            offensive team codes
+    Returns
+    ----------
+        batches : list of arrays
+            row positions of each batch (ascending), in update order
+    """
+    us = np.asarray(us)
+    them = np.asarray(them)
+    n = len(us)
+    if len(np.unique(us)) == n and len(np.unique(them)) == n:
+        return [np.arange(n)]
+
+    # A row goes one batch after the latest row it shares a team with
+    level = np.zeros(n, dtype=np.int64)
+    latest = {}
+    for r, (d, o) in enumerate(zip(us.tolist(), them.tolist())):
+        level[r] = max(latest.get(("us", d), -1), latest.get(("them", o), -1)) + 1
+        latest[("us", d)] = latest[("them", o)] = level[r]
+    return [np.flatnonzero(level == k) for k in range(level.max() + 1)]
+
+
+class TeamTable:
+    """
+    Current ratings of a set of team units (e.g., rushD, rushO, passD, passO)
+    in one array per unit and column, indexed directly by Team Code.
+
+    The unit EloHistory objects still keep the full histories (for output and
+    for the players' opponent lookups); the table mirrors their latest values.
+    Team codes are small integers, so the arrays are sized to the largest code
+    seen and grown by doubling. A Power-5 mask over the same codes replaces
+    the `code in power5teams` list checks.
+
+    Usage:
+        teams = TeamTable(units, columns=("elo",), power5=power5teams)
+        teams.add(codes, teams_default, boost={"elo": power5InitialTeamElo})
+        elo = teams.ratings["elo"]
+        rushDelo = elo["rushD"][us_id]                 # was rushD.last(us_id, "elo")
+        teams.record("rushD", us_id, elo=dElo, opp=them_id, date=date)
+        for rows in conflict_batches(us, them):        # a date's games at once
+            teams.update(("rushD", "rushO"), us[rows], them[rows],
+                         {"elo": (ptdiff[rows], win[rows])}, teamK, date=date)
+        teams.regress(("rushD", "rushO"), teamnum)     # season regression
+
+    Input
+    ----------
+        units : dictionary
+            unit name -> EloHistory keyed by Team Code (existing teams are
+            loaded from their latest rows)
+        columns : list of strings
+            rating columns to mirror (e.g., ["elo", "eloTD"] for fantasy)
+        power5 : iterable of integers
+            Power-5 team codes
+    """
+
+    def __init__(self, units, columns=("elo",), power5=()):
+        self.units = units
+        self.columns = list(columns)
+        self.ratings = {
+            c: {name: np.zeros(0, dtype=np.int64) for name in units} for c in self.columns
+        }
+        self.known = {name: np.zeros(0, dtype=bool) for name in units}
+        self.power5 = np.zeros(0, dtype=bool)
+
+        power5 = np.asarray(list(power5), dtype=np.int64)
+        codes = [power5]
+        for unit in units.values():
+            codes.append(np.asarray(unit.keys, dtype=np.int64))
+        self._grow(max([c.max() for c in codes if len(c) > 0], default=0))
+        self.power5[power5] = True
+
+        for name, unit in units.items():
+            if len(unit) == 0:
+                continue
+            keys = np.asarray(unit.keys, dtype=np.int64)
+            idx = unit.locate(unit.keys)
+            for c in self.columns:
+                self.ratings[c][name][keys] = unit.lasts(idx, c)
+            self.known[name][keys] = True
+
+    def _grow(self, code):
+        size = len(self.power5)
+        if code < size:
+            return
+        size = max(size, 64)
+        while size <= code:
+            size *= 2
+        for arrays in list(self.ratings.values()) + [self.known]:
+            for name, array in arrays.items():
+                grown = np.zeros(size, dtype=array.dtype)
+                grown[: len(array)] = array
+                arrays[name] = grown
+        power5 = np.zeros(size, dtype=bool)
+        power5[: len(self.power5)] = self.power5
+        self.power5 = power5
+
+    def add(self, codes, default=None, boost=None, names=None):
+        """
+        Register the teams in `codes` that a unit doesn't have yet (in order
+        of first appearance, like adding them one at a time)
+
+        Input
+        ----------
+            codes : iterable of integers
+                team codes (repeats are fine)
+            default : dictionary [optional]
+                default team dictionary (the units' own default if not given)
+            boost : dictionary [optional]
+                starting-value overrides for Power-5 teams
+            names : list of strings [optional]
+                units to add the teams to (default all)
+        """
+        codes = np.fromiter(codes, dtype=np.int64)
+        if len(codes) == 0:
+            return
+        _, first = np.unique(codes, return_index=True)
+        codes = codes[np.sort(first)]
+        self._grow(codes.max())
+        for name in self.units if names is None else names:
+            new = codes[~self.known[name][codes]]
+            if len(new) == 0:
+                continue
+            unit = self.units[name]
+            for code, boosted in zip(new.tolist(), self.power5[new].tolist()):
+                overrides = boost if boost is not None and boosted else {}
+                unit.add(code, default, **overrides)
+            idx = unit.locate(new.tolist())
+            for c in self.columns:
+                self.ratings[c][name][new] = unit.lasts(idx, c)
+            self.known[name][new] = True
+
+    def record(self, name, code, **values):
+        """
+        Append one history row for a team unit and make its rating columns
+        the team's current ratings
+
+        Input
+        ----------
+            name : string
+                unit name
+            code : integer
+                team code
+            values : keyword arguments
+                history columns (e.g., elo=dElo, opp=them_id, date=date)
+        """
+        for c in self.columns:
+            if c in values:
+                self.ratings[c][name][code] = values[c]
+        self.units[name].append(code, **values)
+
+    def update(self, names, us, them, outcomes, K, scale=True, date=0, last=None):
+        """
+        Update a defense unit and its offense unit for a batch of games in
+        which no team appears twice on a side (see `conflict_batches`), with
+        the same results as `updateElo` and `record` game by game
+
+        Input
+        ----------
+            names : (string, string)
+                defense unit (rated by `us`) and offense unit (rated by `them`)
+            us : array of integers
+                defending team codes
+            them : array of integers
+                offensive team codes
+            outcomes : dictionary
+                rating column -> (ptdiff, win) arrays, win meaning the
+                defense held the offense under the drawline
+            K : number
+                K-factor
+            scale : boolean
+                whether to scale wins by ptdiff (aka blowoutFactor)
+            date : integer
+                game date (YYYYMMDD)
+            last : dictionary [optional]
+                rating column -> record key holding its latest value (e.g.,
+                {"elo": "last"})
+        Returns
+        ----------
+            before : dictionary
+                rating column -> (defense, offense) ratings before the games
+        """
+        defense, offense = names
+        dValues, oValues = {}, {}
+        before = {}
+        for c, (ptdiff, win) in outcomes.items():
+            before[c] = (self.ratings[c][defense][us], self.ratings[c][offense][them])
+            dValues[c], oValues[c] = updateEloBatch(
+                before[c][0],
+                before[c][1],
+                ptdiff,
+                win,
+                scale,
+                K,
+                both=True,
+            )
+        for name, codes, opps, values in (
+            (defense, us, them, dValues),
+            (offense, them, us, oValues),
+        ):
+            unit = self.units[name]
+            unit.extend(unit.locate(codes.tolist()), **values, opp=opps, date=date)
+            for c, v in values.items():
+                self.ratings[c][name][codes] = v
+                if last is not None and c in last:
+                    for code, value in zip(codes.tolist(), v.tolist()):
+                        unit[code][last[c]] = value
+        return before
+
+    def regress(self, names, codes, weight=0.75, append=True):
+        """
+        Pull the current ratings of the teams in `codes` that have played (more
+        than their starting row in the first unit) toward the mean over those
+        teams: `round(weight * elo + (1 - weight) * round(mean))`
+
+        Input
+        ----------
+            names : list of strings
+                units regressed together (e.g., ["rushD", "rushO"])
+            codes : iterable of integers
+                team codes to consider
+            weight : float
+                share of the current rating that is kept
+            append : boolean
+                add the regressed ratings as a new history row (same date, no
+                opponent); otherwise overwrite the latest row
+        """
+        codes = np.fromiter(codes, dtype=np.int64)
+        codes = codes[codes < len(self.power5)]
+        codes = codes[self.known[names[0]][codes]]
+        first = self.units[names[0]]
+        codes = codes[first.counts(first.locate(codes.tolist())) > 1]
+        if len(codes) == 0:
+            return
+
+        for name in names:
+            unit = self.units[name]
+            idx = unit.locate(codes.tolist())
+            new = {}
+            for c in self.columns:
+                current = self.ratings[c][name][codes]
+                mean = np.rint(current.sum() / len(codes))
+                new[c] = np.rint(weight * current + (1 - weight) * mean).astype(np.int64)
+                self.ratings[c][name][codes] = new[c]
+            if append:
+                unit.extend(idx, **new, date=unit.lasts(idx, "date"), opp=0)
+            else:
+                for c in self.columns:
+                    unit.set_lasts(idx, c, new[c])
@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import json
+import os
 import numpy as np
 import pandas as pd
 
@@ -111,6 +113,163 @@ def updateElo(myCurrentElo, oppCurrentElo, ptdiff, win, scale, K, both=False):
         return myNewElo
 
 
+# SECTION: Batch (array) versions of the Elo functions above
+# Rounding ties closer than this are re-checked with the scalar functions
+TIE_TOLERANCE = 1e-9
+
+
+def probabilityBatch(rating1, rating2):
+    """
+    Array version of `probability`.
+
+    Input
+    ----------
+        rating1 : array-like
+            Elos of performer 1
+        rating2 : array-like
+            Elos of performer 2 -- this is the probability returned
+    Returns
+    -------
+        prob : np.ndarray (float64)
+            Probabilities of rating2 to "win"
+    """
+    rating1 = np.asarray(rating1, dtype=np.float64)
+    rating2 = np.asarray(rating2, dtype=np.float64)
+    prob = 1.0 / (1.0 + 10.0 ** ((rating1 - rating2) / 400))
+    return prob
+
+
+def checkPtdiff(ptdiff):
+    """
+    Raise ValueError unless every ptdiff is >= 0: the batch updates scale
+    by margins (abs() of a stat minus its drawline), and a ptdiff of -1 or
+    below would give nan or -inf Elos instead of an error
+    """
+    ptdiff = np.asarray(ptdiff, dtype=np.float64)
+    bad = ~(ptdiff >= 0)
+    if bad.any():
+        raise ValueError(f"ptdiff must be >= 0 to scale by the margin (got {ptdiff[bad].flat[0]})")
+
+
+def multiplierBatch(ptdiff, elodiff):
+    """
+    Array version of `multiplier` (fivethirtyeight.com scale factor for big win)
+    """
+    ptdiff = np.asarray(ptdiff, dtype=np.float64)
+    elodiff = np.asarray(elodiff, dtype=np.float64)
+    checkPtdiff(ptdiff)
+    factor = np.log(ptdiff + 1) * (2.2 / (elodiff * 0.001 + 2.2))
+    return factor
+
+
+def _nearTie(raw):
+    """
+    Flag raw (unrounded) Elos that sit within `TIE_TOLERANCE` of a .5 boundary
+    """
+    return np.abs(np.abs(raw - np.trunc(raw)) - 0.5) < TIE_TOLERANCE
+
+
+def eloBatch(Ra, Rb, K, win):
+    """
+    Array version of `elo`: compute the new Elo scores for every Ra
+
+    Input
+    ----------
+        Ra : array-like
+            Ra Elos
+        Rb : array-like
+            Rb Elos
+        K : number or array-like
+            Elo K factor(s)
+        win : array-like of booleans
+            True where Ra won
+    Returns
+    ----------
+        Ra : np.ndarray (int64)
+            new Elos for Ra
+    """
+    Ra, Rb, K, win = np.broadcast_arrays(
+        *np.atleast_1d(Ra, Rb, K, np.asarray(win, dtype=bool))
+    )
+    Pa = probabilityBatch(Rb, Ra)
+    raw = Ra + K * (win - Pa)
+    new = np.rint(raw)
+
+    # `np.rint` rounds half to even like `round`, but the vectorized `**` can
+    # differ from the scalar math by an ulp. Anything that lands that close to a
+    # .5 boundary is recomputed with `elo` so results stay bit-identical.
+    for i in zip(*np.nonzero(_nearTie(raw))):
+        new[i] = elo(Ra[i].item(), Rb[i].item(), K[i].item(), bool(win[i]))
+    return new.astype(np.int64)
+
+
+def updateEloBatch(myCurrentElo, oppCurrentElo, ptdiff, win, scale, K, both=False):
+    """
+    Array version of `updateElo`: one call updates every row, with the same
+    rounding as calling `updateElo` once per row.
+
+    Input
+    ----------
+        myCurrentElo : array-like
+            Elos my units start at
+        oppCurrentElo : array-like
+            Elos the opponents start at
+        ptdiff : array-like
+            differences in points
+        win : array-like of booleans
+            whether my unit won
+        scale : boolean
+            whether to scale wins based on `ptdiff` (aka blowoutFactor)
+        K : number or array-like
+            K-factor(s)
+        both : boolean
+            whether to also return the opponents' new Elos
+    Returns
+    ----------
+        myNewElo : np.ndarray (int64)
+            New Elo ratings of my units
+        oppNewElo : np.ndarray (int64) [if `both == True`]
+            New Elo ratings of the opponents
+    """
+    my, opp, ptdiff, win, K = np.broadcast_arrays(
+        *np.atleast_1d(
+            myCurrentElo,
+            oppCurrentElo,
+            np.asarray(ptdiff, dtype=np.float64),
+            np.asarray(win, dtype=bool),
+            K,
+        )
+    )
+    effK = K
+    if scale:
+        elodiff = np.where(win, my - opp, opp - my)
+        # Margin multiplier formula taken from fivethirtyeight.com
+        effK = multiplierBatch(ptdiff, elodiff) * K
+
+    # Compute new Elo(s)
+    myRaw = my + effK * (win - probabilityBatch(opp, my))
+    tie = _nearTie(myRaw)
+    myNewElo = np.rint(myRaw)
+    if both:
+        oppRaw = opp + effK * (~win - probabilityBatch(my, opp))
+        tie |= _nearTie(oppRaw)
+        oppNewElo = np.rint(oppRaw)
+
+    # Rows close to a rounding boundary are redone with the scalar `updateElo`
+    # (vectorized `log`/`**` may be an ulp off the scalar math)
+    for i in zip(*np.nonzero(tie)):
+        args = (my[i].item(), opp[i].item(), ptdiff[i].item(), bool(win[i]))
+        if both:
+            myNewElo[i], oppNewElo[i] = updateElo(*args, scale, K[i].item(), both=True)
+        else:
+            myNewElo[i] = updateElo(*args, scale, K[i].item())
+
+    if both:
+        return myNewElo.astype(np.int64), oppNewElo.astype(np.int64)
+    else:
+        return myNewElo.astype(np.int64)
+
+
 def convertToInt(x):
     return int(float(x))
 
@@ -122,7 +281,142 @@ def float_conv(x):
         return float(x[:-1])
 
 
-def readteamgamedata(filename, nfl=False):
+def load_config(path=Path("code_python", "elo_config.json")):
+    """
+    Read the elo_config.json configuration (the cfb and nfl scripts run from the
+    folder holding code_python, the fantasy scripts from the code folder)
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+# Column types of the team and player game statistics files (read by the C
+# parser; the other columns are inferred)
+TEAM_DTYPES = {"Rk": np.float64, "Game Code": str, "A": str, "School": str, "Team Code": np.int64}
+PLAYER_DTYPES = {"Game Code": str, "Player Code": np.int64, "Team Code": np.int64, "Team Code opp": np.int64}
+
+# Game statistics files a parent process already read into shared memory
+# (eloShared.SharedTables keyed by resolved path, see eloPipeline.run_leagues)
+shared_tables = None
+
+# Keep a binary copy of each game statistics file next to it ("<file>.npz"),
+# read instead of the csv while the csv's size and modification time match
+cache_game_files = True
+
+
+def decode_game_codes(codes):
+    """
+    Away team, home team and date of 16-digit game codes (AAAAHHHHYYYYMMDD)
+
+    Input
+    ----------
+        codes : array-like of strings or integers
+    Returns
+    ----------
+        awayteam, hometeam, gamedate : np.ndarray (int64)
+    """
+    codes = np.asarray(pd.Series(codes).astype(np.int64))
+    return codes // 10**12, codes // 10**8 % 10**4, codes % 10**8
+
+
+def _signature(filename, dtypes):
+    stat = Path(filename).stat()
+    return np.array([stat.st_size, stat.st_mtime_ns]), repr(sorted((k, str(v)) for k, v in dtypes.items()))
+
+
+def _read_sidecar(filename, dtypes, usecols):
+    """
+    A game file's columns from its binary copy (None if missing or out of date)
+    """
+    path = Path(f"{filename}.npz")
+    if not path.exists():
+        return None
+    sizes, types = _signature(filename, dtypes)
+    with np.load(path) as cache:
+        if not (np.array_equal(cache["signature"], sizes) and cache["dtypes"].item() == types):
+            return None
+        columns = {}
+        for i, (c, dtype) in enumerate(zip(cache["columns"].tolist(), cache["types"].tolist())):
+            if usecols is not None and c not in usecols:
+                continue
+            values = cache[str(i)]
+            if f"{i}|categories" in cache.files:
+                # (text: codes into the distinct values, -1 if missing)
+                categories = np.append(cache[f"{i}|categories"].astype(object), np.nan)
+                values = pd.Series(categories[values], dtype=object).astype(dtype)
+            columns[c] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def _write_sidecar(filename, dtypes, raw):
+    """
+    Save the binary copy of a game file (skipped if the folder isn't writable)
+    """
+    sizes, types = _signature(filename, dtypes)
+    arrays = {"signature": sizes, "dtypes": np.array(types), "columns": np.array(list(raw.columns), dtype=str)}
+    kinds = []
+    for i, c in enumerate(raw.columns):
+        values = raw[c].to_numpy()
+        kinds.append(str(raw[c].dtype))
+        if values.dtype.kind in "biuf":
+            arrays[str(i)] = values
+        else:
+            # (text as codes into its distinct values, which are few: IDs,
+            # positions, game codes)
+            codes, categories = pd.factorize(raw[c])
+            arrays[str(i)] = codes.astype(np.int32)
+            arrays[f"{i}|categories"] = np.asarray(categories, dtype=object).astype(str)
+    arrays["types"] = np.array(kinds, dtype=str)
+    path = Path(f"{filename}.npz")
+    part = path.with_name(f"{path.name}.{os.getpid()}.npz")
+    try:
+        np.savez(part, **arrays)
+        os.replace(part, path)
+    except OSError:
+        if part.exists():
+            part.unlink()
+
+
+def read_game_file(filename, dtypes, usecols=None):
+    """
+    Read a game statistics csv, or take it from `shared_tables` or its
+    binary copy if it's there
+
+    Input
+    ----------
+        filename : string or path
+        dtypes : dictionary
+            column types (TEAM_DTYPES or PLAYER_DTYPES)
+        usecols : list [optional]
+            columns to keep
+    Returns
+    ----------
+        raw : dataframe
+    """
+    if shared_tables is not None:
+        key = str(Path(filename).resolve())
+        if key in shared_tables:
+            raw = shared_tables.frame(key)
+            if usecols is not None:
+                raw = raw[[c for c in raw.columns if c in usecols]]
+            return raw
+    if cache_game_files:
+        raw = _read_sidecar(filename, dtypes, usecols)
+        if raw is not None:
+            return raw
+    raw = pd.read_csv(filename, dtype=dtypes, engine="c")
+    # Empty text fields stay empty strings (as the old str converters kept them)
+    for c, dtype in dtypes.items():
+        if dtype is str and c in raw:
+            raw[c] = raw[c].fillna("")
+    if cache_game_files:
+        _write_sidecar(filename, dtypes, raw)
+    if usecols is not None:
+        raw = raw[[c for c in raw.columns if c in usecols]]
+    return raw
+
+
+def readteamgamedata(filename, nfl=False, usecols=None):
     """
     Read in a season's worth of team game data from cfbstats
         `Format`: team-game-statistics.csv - from cfbstats
@@ -131,22 +425,17 @@ def readteamgamedata(filename, nfl=False):
     ----------
         filename : string
             filename to read in
+        usecols : list [optional]
+            columns to keep (with "Game Code", "Team Code" and "Team Code opp")
     Returns
     ----------
         team2 : dataframe
             sorted-by-date version of the season's games
     """
     print(filename)
-    raw = pd.read_csv(
-        filename,
-        converters={
-            "Rk": float,
-            "Game Code": str,
-            "A": str,
-            "School": str,
-            "Team Code": int,
-        },
-    )
+    if usecols is not None:
+        usecols = list(dict.fromkeys(["Game Code", "Team Code", "Team Code opp"] + list(usecols)))
+    raw = read_game_file(filename, TEAM_DTYPES, usecols)
 #    testJoin = raw
 #    if nfl:
 #        testJoin = raw
@@ -155,9 +444,7 @@ def readteamgamedata(filename, nfl=False):
 #    team = testJoin[testJoin["Team Code"] != testJoin["Team Code opp"]].copy()
     team = raw[raw["Team Code"] != raw["Team Code opp"]].copy()
 
-    team["awayteam"] = team["Game Code"].str[0:4].astype(int)
-    team["hometeam"] = team["Game Code"].str[4:8].astype(int)
-    team["gamedate"] = team["Game Code"].str[8:16].astype(int)
+    team["awayteam"], team["hometeam"], team["gamedate"] = decode_game_codes(team["Game Code"])
 
     team2 = team.sort_values("gamedate")
     return team2
@@ -177,22 +464,9 @@ def readplayergamestats(playerstatsfilename, limit_cols=None):
         playerstat : dataframe
             sorted-by-date version of the season's games
     """
-    playerstat = pd.read_csv(
-        playerstatsfilename,
-        converters=(
-            {
-                "Game Code": str,
-                "Player Code": int,
-                "Team Code": int,
-                "Team Code opp": int,
-            }
-        ),
-        usecols=limit_cols,
-    )
+    playerstat = read_game_file(playerstatsfilename, PLAYER_DTYPES, limit_cols)
     # playerstat = merge(raw, playerLookup, by="Player.Code")
-    playerstat["awayteam"] = playerstat["Game Code"].str[0:4].astype(int)
-    playerstat["hometeam"] = playerstat["Game Code"].str[4:8].astype(int)
-    playerstat["gamedate"] = playerstat["Game Code"].str[8:16].astype(int)
+    playerstat["awayteam"], playerstat["hometeam"], playerstat["gamedate"] = decode_game_codes(playerstat["Game Code"])
     #    for row in 1:nrow(playerstat):
     #        if(playerstat$Team.Code[row] == playerstat$hometeam[row])
     #            playerstat$Team.Code.opp[row] = playerstat$awayteam[row]
@@ -260,6 +534,15 @@ def get_start_date(date):
     return int(startdate)
 
 
+def season_of(dates, cutoff=700):
+    """
+    Season (year it started) of YYYYMMDD dates: dates before `cutoff` (MMDD)
+    belong to the previous season
+    """
+    dates = np.asarray(dates, dtype=np.int64)
+    return dates // 10000 - (dates % 10000 < cutoff)
+
+
 def save_elo_output(
     frame, outfile, arranger_cols, arranger_asc, query=None, retdf=False
 ):
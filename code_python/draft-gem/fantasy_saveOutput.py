@@ -1,69 +1,82 @@
 # PURPOSE: Write processed data to files for UI use
+import json
 import pandas as pd
 from pathlib import Path
 
+import fantasy_convertPlayerGameStats
+import fantasy_convertTeamStats
 from eloUtilities import save_elo_output
-from fantasy_computeElo import (
-    fRBs,
-    fWRs,
-    fTEs,
-    fQBs,
-    # defense,
-    rushD,
-    rushO,
-    passD,
-    passO,
-)
+from fantasy_computeElo import compute_elo
 
-# Path to use for final data writing. Will create it if it doesn't already exist.
-root = Path("..", "data_elo_calculated")
-if not root.exists():
-    root.mkdir(parents=True)
 
-# Acscending "To" and descending "last"
-tl = [["lastYPG", "unique_id"], [False, True]]
+def save_output(results, root=Path("..", "data_elo_calculated")):
+    """
+    Write fantasy_computeElo.compute_elo() results to files for UI use
 
-# # Potential restrictor query for rushers/receivers/passers/defense
-# # e.g., query=rc_0, query=rc_10, etc.
-rc_0 = "count > 0"
+    Input
+    ----------
+        results : dictionary
+            name -> dataframe, as returned by compute_elo
+        root : string or path
+            folder to write to (created if it doesn't already exist)
+    """
+    root = Path(root)
+    if not root.exists():
+        root.mkdir(parents=True)
 
-frb = save_elo_output(
-    fRBs, root.joinpath("fantasy_RB.csv"), tl[0], tl[1], rc_0, retdf=True
-)
-fwr = save_elo_output(
-    fWRs, root.joinpath("fantasy_WR.csv"), tl[0], tl[1], rc_0, retdf=True
-)
-fte = save_elo_output(
-    fTEs, root.joinpath("fantasy_TE.csv"), tl[0], tl[1], rc_0, retdf=True
-)
-fqb = save_elo_output(
-    fQBs, root.joinpath("fantasy_QB.csv"), tl[0], tl[1], rc_0, retdf=True
-)
-# save_elo_output(
-#     defense, root.joinpath("fantasyD.csv"), ["lastTackles", "unique_id"], tl[1], rc_0
-# )
-save_elo_output(rushD, root.joinpath("fantasyRushDefense.csv"), ["last"], [False])
-save_elo_output(rushO, root.joinpath("fantasyRushOffense.csv"), ["last"], [False])
-save_elo_output(passD, root.joinpath("fantasyPassDefense.csv"), ["last"], [False])
-save_elo_output(passO, root.joinpath("fantasyPassOffense.csv"), ["last"], [False])
+    # Acscending "To" and descending "last"
+    tl = [["lastYPG", "unique_id"], [False, True]]
 
-# SECTION: Make json files for fantasy visualization
-# Read in the player file (version: 2019-08-12)
-player_data = pd.read_csv(
-    Path("..", "data_elo_calculated", "FantasyLines", "nflPlayers_pg.csv")
-)
-# Merge the player_data (specifically, the college_id and pro_id) together with Elo output, then jsonify
-import json
+    # # Potential restrictor query for rushers/receivers/passers/defense
+    # # e.g., query=rc_0, query=rc_10, etc.
+    rc_0 = "count > 0"
 
-for k, v in zip([frb, fwr, fte, fqb], ["RBs", "WRs", "TEs", "QBs"]):
-    outfile = str(
-        Path("..", "data_elo_calculated", "FantasyLines", f"combo_fantasy{v}.json")
+    frb = save_elo_output(
+        results["fRBs"], root.joinpath("fantasy_RB.csv"), tl[0], tl[1], rc_0, retdf=True
+    )
+    fwr = save_elo_output(
+        results["fWRs"], root.joinpath("fantasy_WR.csv"), tl[0], tl[1], rc_0, retdf=True
+    )
+    fte = save_elo_output(
+        results["fTEs"], root.joinpath("fantasy_TE.csv"), tl[0], tl[1], rc_0, retdf=True
     )
-    outdata = (
-        pd.merge(k, player_data, how="inner", left_on="unique_id", right_on="pro_id")
-        .fillna("")
-        .set_index("master_id", drop=False)
-        .to_dict(orient="index")
+    fqb = save_elo_output(
+        results["fQBs"], root.joinpath("fantasy_QB.csv"), tl[0], tl[1], rc_0, retdf=True
     )
-    with open(outfile, "w") as f:
-        json.dump(outdata, f)
+    # save_elo_output(
+    #     results["defense"], root.joinpath("fantasyD.csv"), ["lastTackles", "unique_id"], tl[1], rc_0
+    # )
+    for name, file in (
+        ("rushD", "fantasyRushDefense.csv"),
+        ("rushO", "fantasyRushOffense.csv"),
+        ("passD", "fantasyPassDefense.csv"),
+        ("passO", "fantasyPassOffense.csv"),
+    ):
+        save_elo_output(results[name], root.joinpath(file), ["last"], [False])
+
+    # Prediction scores of the replay (see eloCalibration.py)
+    for name in ("calibration", "reliability"):
+        if name in results:
+            results[name].to_csv(root.joinpath(f"fantasy_{name}.csv"), index=False)
+
+    # SECTION: Make json files for fantasy visualization
+    # Read in the player file (version: 2019-08-12)
+    player_data = pd.read_csv(root.joinpath("FantasyLines", "nflPlayers_pg.csv"))
+    # Merge the player_data (specifically, the college_id and pro_id) together with Elo output, then jsonify
+    for k, v in zip([frb, fwr, fte, fqb], ["RBs", "WRs", "TEs", "QBs"]):
+        outfile = root.joinpath("FantasyLines", f"combo_fantasy{v}.json")
+        outdata = (
+            pd.merge(k, player_data, how="inner", left_on="unique_id", right_on="pro_id")
+            .fillna("")
+            .set_index("master_id", drop=False)
+            .to_dict(orient="index")
+        )
+        with open(outfile, "w") as f:
+            json.dump(outdata, f)
+
+
+if __name__ == "__main__":
+    # Convert the scraped stats, then compute and save Elo
+    fantasy_convertPlayerGameStats.convert()
+    fantasy_convertTeamStats.convert()
+    save_output(compute_elo())
@@ -20,12 +20,16 @@ Created on Tue Apr  9 16:18:13 2019
 #==============================================================================
 import datetime
 import json
+import numpy as np
 import os  
 import pandas as pd
 import pathlib
 import tqdm
 #from ast import literal_eval
 
+from eloDates import last_dates
+from eloPlayerIds import MISSING, PlayerIds
+
 #==============================================================================
 # Reference Variable Declaration
 #==============================================================================
@@ -58,6 +62,10 @@ def merge_elo_data():
         df_master : Pandas DataFrame
             A dataframe containing all ELO data spanning all 4 categories
     '''
+    # player IDs are merged as int32s from the registry written by computeElo
+    #   (and turned back into strings before the export)
+    ids = PlayerIds(pathlib.Path('data_raw', 'cfb', 'player_ids.csv'))
+
     # create a master dataframe for storing the data
     df_master = pd.DataFrame()
     for pos in tqdm.tqdm(['QB', 'RB', 'WR', 'DEF']):
@@ -72,6 +80,7 @@ def merge_elo_data():
         # read in the data, correctly, this time
         df = pd.read_csv('data_raw/cfb_%s.csv' % pos, 
                                  converters = dict_converters)
+        df['unique_id'] = ids.encode(df['unique_id'])
         
         # rename variables to separate variables across position types
         list_columns = []
@@ -178,37 +187,13 @@ def merge_elo_data():
     df_master = df_master[list_cols_keep]
 
     # create a `last_year` flag for players who have played a game within the last year
-    list_last_year = []
-    for index, row in tqdm.tqdm(df_master.iterrows()):
-        # get the last date played for each position
-        if row['QB_date'] != '':
-            date_QB = datetime.datetime.strptime(row['QB_date'][-1], '%Y%m%d')
-        else:
-            date_QB = datetime.datetime(1900,1,1)
-        if row['RB_date'] != '':
-            date_RB = datetime.datetime.strptime(row['RB_date'][-1], '%Y%m%d')
-        else:
-            date_RB = datetime.datetime(1900,1,1)
-        if row['WR_date'] != '':
-            date_WR = datetime.datetime.strptime(row['WR_date'][-1], '%Y%m%d')
-        else:
-            date_WR = datetime.datetime(1900,1,1)
-        if row['DEF_date'] != '':
-            date_DEF = datetime.datetime.strptime(row['DEF_date'][-1], '%Y%m%d') 
-        else:
-            date_DEF = datetime.datetime(1900,1,1)
-        
-        # get the most recent of all dates
-        date_recent = pd.Series(
-                [date_QB, date_RB, date_WR, date_DEF]).sort_values(
-                        ascending = False).iloc[0]
-        
-        # if the player last played more than two season ago, they are not active
-        if ((datetime.datetime.today() - date_recent).days > 450):
-            list_last_year.append(False)
-        else:
-            list_last_year.append(True)
-    df_master['last_year']  = list_last_year
+    # (the most recent of each position's last date played, 1900-01-01 if none)
+    date_recent = np.maximum.reduce(
+            [last_dates(df_master[pos + '_date']) for pos in ['QB', 'RB', 'WR', 'DEF']])
+    
+    # if the player last played more than two season ago, they are not active
+    days = (np.datetime64(datetime.date.today(), 'D') - date_recent).astype(int)
+    df_master['last_year'] = days <= 450
                     
     # only retain players who have played 8 or more games or are active
     df_master = df_master[(df_master['DEF_count'] > 8) |
@@ -246,6 +231,10 @@ def merge_elo_data():
                                         'pos_ncaa':'position',
                                         'pos_ncaa_std':'position_std',
                                         'to_ncaa':'To'})
+    df_meta['unique_id'] = ids.encode(df_meta['unique_id'], add = False)
+    # players without Elo data (or without an ID) can't match any row, and
+    # would all share the MISSING ID, so drop them before merging
+    df_meta = df_meta[df_meta['unique_id'] != MISSING]
 
     # merge 'position', 'position_std' and 'to' into the elo data
     df_merged = pd.merge(df_master,
@@ -253,6 +242,7 @@ def merge_elo_data():
                          how = 'left',
                          left_on = 'unique_id',
                          right_on = 'unique_id')
+    df_merged['unique_id'] = ids.decode(df_merged['unique_id'])
 
     # fill in missing values with blanks rather than float NaNs
     df_merged = df_merged.fillna('')
@@ -20,12 +20,16 @@ Created on Tue Apr  9 16:18:13 2019
 #==============================================================================
 import datetime
 import json
+import numpy as np
 import os  
 import pandas as pd
 import pathlib
 import tqdm
 #from ast import literal_eval
 
+from eloDates import last_dates
+from eloPlayerIds import MISSING, PlayerIds
+
 #==============================================================================
 # Reference Variable Declaration
 #==============================================================================
@@ -59,6 +63,10 @@ def merge_elo_data():
         df_master : Pandas DataFrame
             A dataframe containing all ELO data spanning all 4 categories
     '''
+    # player IDs are merged as int32s from the registry written by computeElo
+    #   (and turned back into strings before the export)
+    ids = PlayerIds(pathlib.Path('data_raw', 'nfl', 'player_ids.csv'))
+
     # create a master dataframe for storing the data
     df_master = pd.DataFrame()
     for pos in tqdm.tqdm(['QB', 'RB', 'WR', 'DEF']):
@@ -73,6 +81,7 @@ def merge_elo_data():
         # read in the data, correctly, this time
         df = pd.read_csv('data_raw/nfl_%s.csv' % pos, 
                          converters = dict_converters)
+        df['unique_id'] = ids.encode(df['unique_id'])
         
         # rename variables to separate variables across position types
         list_columns = []
@@ -186,37 +195,13 @@ def merge_elo_data():
         df_master[column] = list_row
 
     # create a `last_year` flag for players who have played a game within the last year
-    list_last_year = []
-    for index, row in tqdm.tqdm(df_master.iterrows()):
-        # get the last date played for each position
-        if row['QB_date'] != []:
-            date_QB = datetime.datetime.strptime(row['QB_date'][-1], '%Y%m%d')
-        else:
-            date_QB = datetime.datetime(1900,1,1)
-        if row['RB_date'] != []:
-            date_RB = datetime.datetime.strptime(row['RB_date'][-1], '%Y%m%d')
-        else:
-            date_RB = datetime.datetime(1900,1,1)
-        if row['WR_date'] != []:
-            date_WR = datetime.datetime.strptime(row['WR_date'][-1], '%Y%m%d')
-        else:
-            date_WR = datetime.datetime(1900,1,1)
-        if row['DEF_date'] != []:
-            date_DEF = datetime.datetime.strptime(row['DEF_date'][-1], '%Y%m%d') 
-        else:
-            date_DEF = datetime.datetime(1900,1,1)
-        
-        # get the most recent of all dates
-        date_recent = pd.Series(
-                [date_QB, date_RB, date_WR, date_DEF]).sort_values(
-                        ascending = False).iloc[0]
-        
-        # if the player last played more than two season ago, they are not active
-        if ((datetime.datetime.today() - date_recent).days > 450):
-            list_last_year.append(False)
-        else:
-            list_last_year.append(True)
-    df_master['last_year']  = list_last_year
+    # (the most recent of each position's last date played, 1900-01-01 if none)
+    date_recent = np.maximum.reduce(
+            [last_dates(df_master[pos + '_date']) for pos in ['QB', 'RB', 'WR', 'DEF']])
+    
+    # if the player last played more than two season ago, they are not active
+    days = (np.datetime64(datetime.date.today(), 'D') - date_recent).astype(int)
+    df_master['last_year'] = days <= 450
     
     # only retain players who have played 8 or more games or are active
     df_master = df_master[(df_master['DEF_count'] > 8) |
@@ -251,6 +236,10 @@ def merge_elo_data():
                                         'pos_nfl':'position',
                                         'pos_nfl_std':'position_std',
                                         'to_nfl':'To'})
+    df_meta['unique_id'] = ids.encode(df_meta['unique_id'], add = False)
+    # players without Elo data (or without an ID) can't match any row, and
+    # would all share the MISSING ID, so drop them before merging
+    df_meta = df_meta[df_meta['unique_id'] != MISSING]
 
     # merge 'position', 'position_std' and 'to' into the elo data
     df_merged = pd.merge(df_master,
@@ -258,6 +247,7 @@ def merge_elo_data():
                          how = 'left',
                          left_on = 'unique_id',
                          right_on = 'unique_id')
+    df_merged['unique_id'] = ids.decode(df_merged['unique_id'])
     
     # export csv to disk
     df_merged.to_csv('data_elo/nfl_elo.csv', index = False)
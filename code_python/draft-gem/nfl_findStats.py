@@ -12,8 +12,16 @@ import sys
 import warnings
 from pathlib import Path
 
+from eloSeasonStream import season_files, stream_seasons
 from eloUtilities import readplayergamestats
 
+# Columns and positions the stats below use
+COLUMNS = [
+    "Game Code", "Pos", "Pass Att", "Pass Comp", "Pass Yard", "Pass TD", "Pass Int", "QBR",
+    "Rush Att", "Rush Yard", "Rush TD", "Rec", "Rec Yards", "Rec TD", "Targets",
+]
+POSITIONS = ["QB", "RB", "HB", "FB", "WR", "TE", "SE"]
+
 # Get filename from config file
 with open(Path("code_python/elo_config.json")) as file:
     cfg = json.load(file)["findStats"]["nfl"]
@@ -26,16 +34,17 @@ new_stats_bool = any(x.lower() == "new" for x in sys.argv)
 if new_stats_bool:
     # This must be run first to give the pickle files access to what they need.
     import nfl_convertPlayerGameStats
+    nfl_convertPlayerGameStats.convert()
 
-    # Make a playerstats file. Read in all seasons and then concatenate them vertically.
+    # Make a playerstats file. Stream the seasons (one in memory at a time,
+    # only the columns used below) and keep the rows of the positions used.
     # FIXME: Keeping this set to 2018 for now
     seasons = range(1999, 2018 + 1)
+    files = season_files(Path("data_raw", "nfl"), "nfl-player-game-statistics", seasons)
     outlist = []
-    for season in seasons:
-        playerstatfile = Path(
-            "data_raw", "nfl", f"nfl-player-game-statistics{season}.csv")
-        playerstats_season = readplayergamestats(playerstatfile)
-        outlist.append(playerstats_season)
+    for _, frames in stream_seasons({"players": (files, readplayergamestats, COLUMNS)}):
+        playerstats_season = frames["players"]
+        outlist.append(playerstats_season[playerstats_season["Pos"].isin(POSITIONS)])
     playerstats = pd.concat(outlist)
 else:
     playerstatfile = Path("data_raw", "nfl", cfg["playerstatfile"])
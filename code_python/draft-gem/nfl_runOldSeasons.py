@@ -1,15 +1,17 @@
 #!/usr/bin/env python3
 # PURPOSE: process passing and rushing statistics for first few seasons for the teams, to serve as initialized values that player Elo ratings build off from.
-import json
+import numpy as np
 import pandas as pd
-from copy import deepcopy
 from pathlib import Path
 
-from eloUtilities import get_start_date, readteamgamedata, updateElo
+from eloGameIndex import GameIndex
+from eloHistory import EloHistory
+from eloTeamTable import TeamTable, conflict_batches
+from eloReplayCache import ReplayCache, config_hash, data_signature
+from eloUtilities import load_config, readteamgamedata
 
-# Run the code to convert stats needed for runOldSeasons
-import nfl_convertPlayerGameStats
-import nfl_convertTeamStats
+# NOTE: the stats this reads come from nfl_convertPlayerGameStats and
+# nfl_convertTeamStats (run by nfl_saveOutput.py before computing Elo)
 
 
 # SECTION: Configuration
@@ -17,39 +19,73 @@ LEAGUE = "nfl"
 BOOST_POWER_5 = True
 blowoutFactor = True
 
-with open(Path("code_python/elo_config.json")) as file:
-    cfg = json.load(file)
-
 # To determine how to read in the teamgame files
-nfl = True
-if LEAGUE == "college":
-    config = cfg["run_old_seasons"]["college"]
-    nfl = False
-elif LEAGUE == "nfl":
-    config = cfg["run_old_seasons"]["nfl"]
-elif LEAGUE == "fantasy":
-    config = cfg["run_old_seasons"]["fantasy"]
+nfl = LEAGUE != "college"
+
+
+# Baseline replays are cached by their settings and input files
+cache = ReplayCache(Path("data_cache"))
+
+
+def get_config(cfg=None):
+    """
+    The league's run_old_seasons settings (cfg: elo_config.json contents)
+    """
+    if cfg is None:
+        cfg = load_config()
+    return cfg["run_old_seasons"][LEAGUE]
 
 
 # SECTION: Setup of default dictionaries
-# Starter values
-initialEloList = [config["initialTeamElo"]]
-initialDateList = [config["initialDate"]]
-initialOppList = [0]
+def get_teams_default(config):
+    # Starter values
+    initialEloList = [config["initialTeamElo"]]
+    initialDateList = [config["initialDate"]]
+    initialOppList = [0]
 
-teams_default = {
-    "last": config["initialTeamElo"],
-    "elo": initialEloList,
-    "date": initialDateList,
-    "opp": initialOppList,
-}
+    teams_default = {
+        "last": config["initialTeamElo"],
+        "elo": initialEloList,
+        "date": initialDateList,
+        "opp": initialOppList,
+    }
+    return teams_default
 
 
 # SECTION: Process games for rushing and passing
-def run_games(seasons, blowoutFactor, teamK, opp_perf_var, drawline, yardFactor):
-    # Dictionaries for defense and offense
-    D_dicts = {}
-    O_dicts = {}
+def run_games(
+    seasons, blowoutFactor, teamK, opp_perf_var, drawline, yardFactor, config=None
+):
+    teams_default = get_teams_default(get_config() if config is None else config)
+
+    # Reuse a replay with the same seasons, settings and files if there is one
+    # (entries are pickled EloHistory objects: bump the version whenever
+    # EloHistory's layout or the replay changes)
+    key = config_hash(
+        "nfl run_games",
+        2,
+        teams_default,
+        data_signature(
+            Path("data_raw", "nfl", f"nfl-team-game-statistics{season}.csv")
+            for season in seasons
+        ),
+        seasons=list(seasons),
+        blowoutFactor=blowoutFactor,
+        teamK=teamK,
+        opp_perf_var=opp_perf_var,
+        drawline=drawline,
+        yardFactor=yardFactor,
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Histories for defense and offense
+    D_dicts = EloHistory(teams_default, id_name="Team Code")
+    O_dicts = EloHistory(teams_default, id_name="Team Code")
+
+    # Current ratings by Team Code
+    teams_table = TeamTable({"D": D_dicts, "O": O_dicts})
 
     # Filename templates
     teamstatroot = "nfl-team-game-statistics"
@@ -63,81 +99,73 @@ def run_games(seasons, blowoutFactor, teamK, opp_perf_var, drawline, yardFactor)
         teamstats = readteamgamedata(teamgamefile, nfl=nfl)
 
         # Loop over each date within the season - update Elo after each game
-        dates = list(teamstats["gamedate"].unique())
-
-        for date in dates:
-            # List of the date's games (both teams' perspectives)
-            teams = teamstats[teamstats["gamedate"] == date].to_dict("records")
-
-            # Evaluate team rush D and rush O (overall)
-            for row in teams:
-                # Codes for the defensive and offensive teams
-                us_id = row["Team Code"]
-                them_id = row["Team Code opp"]
-
-                # Initialize team dictionary if not already present
-                if us_id not in D_dicts:
-                    D_dicts[us_id] = deepcopy(teams_default)
-                    D_dicts[us_id]["Team Code"] = us_id
-                if them_id not in O_dicts:
-                    O_dicts[them_id] = deepcopy(teams_default)
-                    O_dicts[them_id]["Team Code"] = them_id
-
-                # Get teams' latest Elo ratings
-                lastDelo = D_dicts[us_id]["elo"][-1]
-                lastOelo = O_dicts[them_id]["elo"][-1]
-
-                # Team performance based on yards per game
-                # Calculate point differential - in this case yards
-                opperf = row[opp_perf_var]
-                ptdiff = abs(opperf - drawline) / yardFactor
-                win = opperf < drawline
-
-                dElo, oElo = updateElo(
-                    lastDelo, lastOelo, ptdiff, win, blowoutFactor, teamK, both=True
+        games = GameIndex(teamstats)
+
+        for date in games.dates:
+            # The date's games (both teams' perspectives): codes for the
+            # defensive and offensive teams and the offense's performance
+            codes = games.arrays(date, ["Team Code", "Team Code opp", opp_perf_var])
+            us = codes["Team Code"]
+            them = codes["Team Code opp"]
+
+            # Initialize team histories not already present
+            teams_table.add(us, names=["D"])
+            teams_table.add(them, names=["O"])
+
+            # Team performance based on yards per game
+            # Calculate point differential - in this case yards
+            opperf = codes[opp_perf_var]
+            ptdiff = np.abs(opperf - drawline) / yardFactor
+            win = opperf < drawline
+
+            # Evaluate team rush D and rush O (overall): update Elo, last Elo,
+            # opponent and date histories for all the date's games at once
+            # (games sharing a team go in later batches, in order)
+            # (the first date is set to the day before the first game)
+            for rows in conflict_batches(us, them):
+                teams_table.update(
+                    ("D", "O"), us[rows], them[rows], {"elo": (ptdiff[rows], win[rows])},
+                    teamK, blowoutFactor, date, last={"elo": "last"},
                 )
 
-                # Update last Elo rating
-                D_dicts[us_id]["last"] = dElo
-                O_dicts[them_id]["last"] = oElo
-
-                # Update Elo array
-                D_dicts[us_id]["elo"] = D_dicts[us_id]["elo"] + [dElo]
-                O_dicts[them_id]["elo"] = O_dicts[them_id]["elo"] + [oElo]
-
-                # Update opponents array
-                D_dicts[us_id]["opp"] = D_dicts[us_id]["opp"] + [them_id]
-                O_dicts[them_id]["opp"] = O_dicts[them_id]["opp"] + [us_id]
-
-                # Update dates
-
-                # Add the date (if first time, add a date for the first date)
-                if len(D_dicts[us_id]["date"]) == 1:
-                    D_dicts[us_id]["date"][0] = get_start_date(date)
-                if len(O_dicts[them_id]["date"]) == 1:
-                    O_dicts[them_id]["date"][0] = get_start_date(date)
-                D_dicts[us_id]["date"] = D_dicts[us_id]["date"] + [date]
-                O_dicts[them_id]["date"] = O_dicts[them_id]["date"] + [date]
-
-    # Completed dictionaries
+    # Completed histories
+    cache.put(key, (D_dicts, O_dicts))
     return D_dicts, O_dicts
 
 
-# Make and save dataframes
-rushD, rushO = run_games(
-    range(1994, 1998 + 1),
-    blowoutFactor,
-    config["teamK"],
-    config["rushing"]["opp_perf_var"],
-    config["rushing"]["drawline"],
-    config["rushing"]["yardFactor"],
-)
-
-passD, passO = run_games(
-    range(1994, 1998 + 1),
-    blowoutFactor,
-    config["teamK"],
-    config["passing"]["opp_perf_var"],
-    config["passing"]["drawline"],
-    config["passing"]["yardFactor"],
-)
+def set_baselines(cfg=None):
+    """
+    Rush and pass D/O team histories from the 1994-1998 seasons
+
+    Input
+    ----------
+        cfg : dictionary [optional]
+            elo_config.json contents (read from file if not given)
+    Returns
+    ----------
+        rushD, rushO, passD, passO : EloHistory
+    """
+    config = get_config(cfg)
+
+    # Make and save dataframes
+    rushD, rushO = run_games(
+        range(1994, 1998 + 1),
+        blowoutFactor,
+        config["teamK"],
+        config["rushing"]["opp_perf_var"],
+        config["rushing"]["drawline"],
+        config["rushing"]["yardFactor"],
+        config,
+    )
+
+    passD, passO = run_games(
+        range(1994, 1998 + 1),
+        blowoutFactor,
+        config["teamK"],
+        config["passing"]["opp_perf_var"],
+        config["passing"]["drawline"],
+        config["passing"]["yardFactor"],
+        config,
+    )
+
+    return rushD, rushO, passD, passO
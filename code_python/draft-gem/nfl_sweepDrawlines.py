@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# PURPOSE: Evaluate many EloWithDrawlines configurations (a parameter grid or a random search) across a process pool and collect each run's summary metrics in a results table.
+#
+# Usage (from the folder holding code_python and data_raw, like the other scripts):
+#     python3 code_python/draft-gem/nfl_sweepDrawlines.py sweep.json [workers=8] [out=path.csv] [ensemble=64]
+#
+# The sweep file gives either a grid (every combination is run):
+#     {"grid": {"teamK": [15, 20, 25], "rushDdrawline": [100, 110, 120]}}
+# or a random search (values drawn uniformly from [low, high]; integers if
+# both bounds are integers):
+#     {"random": {"playerK": [10, 40], "tackleDrawline": [1.5, 3.0]},
+#      "samples": 200, "seed": 0}
+# Parameters not in the sweep keep their nfl_computeElo.default_parameters()
+# values (medians from nfl_findStats.py). Configurations that share the team
+# parameters (nfl_computeElo.TEAM_PARAMETERS) replay the team games only once.
+# With ensemble=N, each worker replays N configurations at once
+# (nfl_computeElo.EloEnsemble) instead of one at a time.
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+import nfl_computeElo
+import nfl_runOldSeasons
+from eloCalibration import Calibration
+from eloReplayCache import ReplayCache
+
+
+# SECTION: Configurations
+def configurations(spec):
+    """
+    Parameter overrides to evaluate
+
+    Input
+    ----------
+        spec : dictionary
+            {"grid": {name: [values]}} or
+            {"random": {name: [low, high]}, "samples": n, "seed": s}
+    Returns
+    ----------
+        configs : list of dictionaries
+            name -> value, one per run
+    """
+    if "grid" in spec:
+        names = list(spec["grid"].keys())
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(spec["grid"][n] for n in names))
+        ]
+    if "random" in spec:
+        rng = np.random.default_rng(spec.get("seed"))
+        configs = []
+        for _ in range(spec["samples"]):
+            config = {}
+            for name, (low, high) in spec["random"].items():
+                if isinstance(low, int) and isinstance(high, int):
+                    config[name] = int(rng.integers(low, high + 1))
+                else:
+                    config[name] = float(rng.uniform(low, high))
+            configs.append(config)
+        return configs
+    raise ValueError('Sweep spec needs a "grid" or a "random" section')
+
+
+# SECTION: Workers
+# Set in the parent before the pool starts; forked workers share them
+# copy-on-write instead of each reading every season's files (and the team
+# replays cached so far)
+_data = None
+_defaults = None
+_baselines = None
+_cache = ReplayCache()
+
+
+def evaluate(config):
+    """
+    Run EloWithDrawlines with one configuration
+
+    Returns
+    ----------
+        row : dictionary
+            the configuration, its summary metrics, log losses and run time
+        replays : dictionary
+            team replays this run added to the cache (sent back to the parent)
+    """
+    cached = set(_cache.entries)
+    summary = {}
+    calibration = Calibration()
+    start = time.perf_counter()
+    nfl_computeElo.EloWithDrawlines(
+        **dict(_defaults, **config),
+        data=_data,
+        summary=summary,
+        progress=False,
+        cache=_cache,
+        baselines=_baselines,
+        calibration=calibration,
+    )
+    row = dict(config)
+    row.update(summary)
+    row.update(calibration.scores())
+    row["seconds"] = time.perf_counter() - start
+    replays = {k: v for k, v in _cache.entries.items() if k not in cached}
+    return row, replays
+
+
+def evaluate_ensemble(configs):
+    """
+    Run several configurations in one EloEnsemble replay
+
+    Returns
+    ----------
+        rows : list of dictionaries
+            each configuration, its summary metrics and its share of the run time
+    """
+    start = time.perf_counter()
+    summaries, _ = nfl_computeElo.EloEnsemble(
+        [dict(_defaults, **config) for config in configs],
+        data=_data,
+        progress=False,
+        baselines=_baselines,
+    )
+    seconds = (time.perf_counter() - start) / len(configs)
+    rows = []
+    for config, summary in zip(configs, summaries):
+        row = dict(config)
+        row.update(summary)
+        row["seconds"] = seconds
+        rows.append(row)
+    return rows
+
+
+def sweep(configs, workers=None, out=None, ensemble=None):
+    """
+    Evaluate configurations across a process pool
+
+    Input
+    ----------
+        configs : list of dictionaries
+            parameter overrides (see `configurations`)
+        workers : integer [optional]
+            number of processes (default: all cores)
+        out : string or path [optional]
+            CSV the results are appended to as runs finish
+        ensemble : integer [optional]
+            number of configurations per EloEnsemble replay (one
+            EloWithDrawlines run per configuration if not given)
+    Returns
+    ----------
+        results : dataframe
+            one row per configuration: its parameters, Brier scores
+            ("brier_<unit or group>", lower is better), log losses
+            ("logloss_<unit or group>", except in ensemble mode), player
+            counts and run time, sorted by the mean player Brier score
+    """
+    global _data, _defaults, _baselines
+    if _defaults is None:
+        _defaults = nfl_computeElo.default_parameters()
+    if _data is None:
+        _data = nfl_computeElo.load_seasons()
+    if _baselines is None:
+        _baselines = nfl_runOldSeasons.set_baselines()
+
+    rows = []
+
+    def record(row):
+        rows.append(row)
+        if out is not None:
+            pd.DataFrame([row]).to_csv(
+                out, mode="a", header=not Path(out).exists(), index=False
+            )
+        print(f"{len(rows)}/{len(configs)} done ({row['seconds']:.0f}s)")
+
+    if ensemble is not None:
+        # Each replay carries `ensemble` configurations (team games included)
+        chunks = [configs[i:i + ensemble] for i in range(0, len(configs), ensemble)]
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            for chunk in pool.imap_unordered(evaluate_ensemble, chunks):
+                for row in chunk:
+                    record(row)
+        return _ranked(rows)
+
+    # First one run per distinct set of team parameters (these replay the team
+    # games), then the rest in a new pool that inherits those team replays
+    first = {}
+    for config in configs:
+        params = dict(_defaults, **config)
+        team = tuple(params[k] for k in nfl_computeElo.TEAM_PARAMETERS)
+        first.setdefault(team, config)
+    leaders = list(first.values())
+    rest = [c for c in configs if all(c is not x for x in leaders)]
+
+    context = multiprocessing.get_context("fork")
+    for batch in (leaders, rest):
+        if len(batch) == 0:
+            continue
+        with context.Pool(workers) as pool:
+            for row, replays in pool.imap_unordered(evaluate, batch):
+                _cache.entries.update(replays)
+                record(row)
+    return _ranked(rows)
+
+
+def _ranked(rows):
+    """
+    Results table sorted by the mean player Brier score
+    """
+    results = pd.DataFrame(rows)
+    groups = [c for c in results.columns if c.startswith("brier_")]
+    players = [c for c in groups if c not in ("brier_rush", "brier_pass")]
+    results["brier_players"] = results[players].mean(axis=1)
+    return results.sort_values("brier_players").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: nfl_sweepDrawlines.py sweep.json [workers=N] [out=results.csv] [ensemble=N]")
+        exit()
+    options = dict(x.split("=", 1) for x in sys.argv[2:] if "=" in x)
+    with open(sys.argv[1]) as file:
+        spec = json.load(file)
+    out = Path(options.get("out", Path("data_raw", "nfl", "sweep_results.csv")))
+    if out.exists():
+        os.remove(out)
+    workers = int(options["workers"]) if "workers" in options else None
+    ensemble = int(options["ensemble"]) if "ensemble" in options else None
+
+    results = sweep(configurations(spec), workers, out, ensemble)
+    results.to_csv(out, index=False)
+    print(results.head(10))